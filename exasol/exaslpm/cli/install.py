@@ -1,9 +1,12 @@
 import pathlib
+from inspect import cleandoc
 
 import click
 
 from exasol.exaslpm.cli.cli import cli
 from exasol.exaslpm.cli.make_context import make_context
+from exasol.exaslpm.pkg_mgmt.context.install_options import InstallOptions
+from exasol.exaslpm.pkg_mgmt.context.tracer import TraceFormat
 from exasol.exaslpm.pkg_mgmt.install_packages import package_install
 
 
@@ -15,9 +18,165 @@ from exasol.exaslpm.pkg_mgmt.install_packages import package_install
     help="Yaml file containing package details",
 )
 @click.option("--build-step", type=str, required=True, help="Name of the build deps")
+@click.option(
+    "--conda-lock-dir",
+    type=click.Path(exists=True, file_okay=False, path_type=pathlib.Path),
+    required=False,
+    envvar="EXASLPM_CONDA_LOCK_DIR",
+    help=cleandoc("""
+    Optional directory with explicit conda lock files.
+    Conda phases with a matching lock file get installed without solving,
+    for all other conda phases a lock file gets created after solving.
+    """),
+)
+@click.option(
+    "--download-cache-dir",
+    type=click.Path(file_okay=False, path_type=pathlib.Path),
+    required=False,
+    envvar="EXASLPM_DOWNLOAD_CACHE_DIR",
+    help=cleandoc("""
+    Optional directory for caching downloaded files, for example a Docker build cache mount.
+    If not set, all files are downloaded again.
+    """),
+)
+@click.option(
+    "--download-cache-max-size",
+    type=click.IntRange(min=0),
+    default=1024,
+    show_default=True,
+    envvar="EXASLPM_DOWNLOAD_CACHE_MAX_SIZE",
+    help="Maximum size of the download cache in MiB.",
+)
+@click.option(
+    "--download-parallel-ranges",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    envvar="EXASLPM_DOWNLOAD_PARALLEL_RANGES",
+    help=cleandoc("""
+    Number of parts, which large files get split into and downloaded in parallel,
+    if the server supports HTTP Range requests.
+    """),
+)
+@click.option(
+    "--command-report-file",
+    type=click.Path(dir_okay=False, path_type=pathlib.Path),
+    required=False,
+    envvar="EXASLPM_COMMAND_REPORT_FILE",
+    help=cleandoc("""
+    Optional file for a JSON report with wall time, CPU time, peak memory and output size
+    of all executed commands, tagged with build step, phase and installer.
+    """),
+)
+@click.option(
+    "--command-report-stream-file",
+    type=click.Path(dir_okay=False, path_type=pathlib.Path),
+    required=False,
+    envvar="EXASLPM_COMMAND_REPORT_STREAM_FILE",
+    help="Optional file, which the report of each command gets appended to as JSON line as soon as it finished.",
+)
+@click.option(
+    "--trace-file",
+    type=click.Path(dir_okay=False, path_type=pathlib.Path),
+    required=False,
+    envvar="EXASLPM_TRACE_FILE",
+    help=cleandoc("""
+    Optional file for a trace of the installation with nested spans for build step, phases,
+    installers, downloads, history loads and commands.
+    """),
+)
+@click.option(
+    "--trace-format",
+    type=click.Choice([f.value for f in TraceFormat], case_sensitive=False),
+    default=TraceFormat.Chrome.value,
+    show_default=True,
+    envvar="EXASLPM_TRACE_FORMAT",
+    help="Format of the trace file: Chrome trace-event format or OTLP JSON.",
+)
+@click.option(
+    "--madison-cache-file",
+    type=click.Path(dir_okay=False, path_type=pathlib.Path),
+    required=False,
+    envvar="EXASLPM_MADISON_CACHE_FILE",
+    help=cleandoc("""
+    Optional file for caching the available versions of apt packages with wildcard versions
+    between invocations. The cache is only used as long as the APT package lists do not change.
+    """),
+)
+@click.option(
+    "--resolve-apt-wildcards-from-lists/--resolve-apt-wildcards-with-madison",
+    default=False,
+    envvar="EXASLPM_RESOLVE_APT_WILDCARDS_FROM_LISTS",
+    help=cleandoc("""
+    Resolve wildcard versions of apt packages by reading the APT package lists directly,
+    instead of running apt-cache madison. APT pinning is not taken into account.
+    Falls back to apt-cache madison, if the package lists can't be read.
+    """),
+)
+@click.option(
+    "--apt-parallel-downloads",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    envvar="EXASLPM_APT_PARALLEL_DOWNLOADS",
+    help=cleandoc("""
+    Number of apt archives, which get downloaded in parallel before apt-get install.
+    With 1, apt-get install downloads the archives itself.
+    """),
+)
+@click.option(
+    "--pip-wheelhouse-dir",
+    type=click.Path(file_okay=False, path_type=pathlib.Path),
+    required=False,
+    envvar="EXASLPM_PIP_WHEELHOUSE_DIR",
+    help=cleandoc("""
+    Optional directory, which pip packages get built or downloaded into as wheels
+    and installed from, for example a Docker build cache mount.
+    Wheels in the directory are reused instead of being built again.
+    Unless the directory is a mount point, it gets removed at the end of the build step.
+    """),
+)
+@click.option(
+    "--pip-parallel-builds",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    envvar="EXASLPM_PIP_PARALLEL_BUILDS",
+    help=cleandoc("""
+    Number of pip source distributions, which get built as wheels concurrently
+    in phases with install_build_tools_ephemerally. Unless MAKEFLAGS is set,
+    each build gets an equal share of the CPU cores as make jobs.
+    """),
+)
+@click.option(
+    "--ccache-dir",
+    type=click.Path(file_okay=False, path_type=pathlib.Path),
+    required=False,
+    envvar="EXASLPM_CCACHE_DIR",
+    help=cleandoc("""
+    Persistent ccache directory, typically a cache mount. If set, ccache gets
+    installed together with the ephemeral build tools of pip phases,
+    and C and C++ sources of pip source distributions get compiled through it,
+    so that rebuilds of the image hit the compiler cache.
+    """),
+)
 def install_command(
     package_file: pathlib.Path,
     build_step: str,
+    conda_lock_dir: pathlib.Path | None,
+    download_cache_dir: pathlib.Path | None,
+    download_cache_max_size: int,
+    download_parallel_ranges: int,
+    command_report_file: pathlib.Path | None,
+    command_report_stream_file: pathlib.Path | None,
+    trace_file: pathlib.Path | None,
+    trace_format: str,
+    madison_cache_file: pathlib.Path | None,
+    resolve_apt_wildcards_from_lists: bool,
+    apt_parallel_downloads: int,
+    pip_wheelhouse_dir: pathlib.Path | None,
+    pip_parallel_builds: int,
+    ccache_dir: pathlib.Path | None,
 ):
     """
     This command installs the specified packages described in the given package file.
@@ -27,5 +186,22 @@ def install_command(
     package_install(
         package_file,
         build_step,
-        make_context(),
+        make_context(
+            InstallOptions(
+                conda_lock_dir=conda_lock_dir,
+                download_cache_dir=download_cache_dir,
+                download_cache_max_size_mb=download_cache_max_size,
+                download_parallel_ranges=download_parallel_ranges,
+                command_report_file=command_report_file,
+                command_report_stream_file=command_report_stream_file,
+                trace_file=trace_file,
+                trace_format=TraceFormat(trace_format),
+                madison_cache_file=madison_cache_file,
+                resolve_apt_wildcards_from_lists=resolve_apt_wildcards_from_lists,
+                apt_parallel_downloads=apt_parallel_downloads,
+                pip_wheelhouse_dir=pip_wheelhouse_dir,
+                pip_parallel_builds=pip_parallel_builds,
+                ccache_dir=ccache_dir,
+            )
+        ),
     )
@@ -1,22 +1,52 @@
 from exasol.exaslpm.pkg_mgmt.context.cmd_executor import CommandExecutor
 from exasol.exaslpm.pkg_mgmt.context.cmd_logger import StdLogger
+from exasol.exaslpm.pkg_mgmt.context.command_recorder import CommandRecorder
 from exasol.exaslpm.pkg_mgmt.context.context import Context
+from exasol.exaslpm.pkg_mgmt.context.download_cache import DownloadCache
 from exasol.exaslpm.pkg_mgmt.context.file_access import FileAccess
 from exasol.exaslpm.pkg_mgmt.context.file_downloader import FileDownloader
 from exasol.exaslpm.pkg_mgmt.context.history_file_manager import HistoryFileManager
+from exasol.exaslpm.pkg_mgmt.context.install_options import InstallOptions
+from exasol.exaslpm.pkg_mgmt.context.madison_cache import MadisonCache
 from exasol.exaslpm.pkg_mgmt.context.temp_file_provider import TempFileProvider
+from exasol.exaslpm.pkg_mgmt.context.tracer import Tracer
 
 
-def make_context() -> Context:
+def make_context(install_options: InstallOptions = InstallOptions()) -> Context:
 
     logger = StdLogger()
-    cmd_executor = CommandExecutor(logger)
+    command_recorder = CommandRecorder(
+        report_file=install_options.command_report_file,
+        stream_file=install_options.command_report_stream_file,
+    )
+    tracer = Tracer(
+        trace_file=install_options.trace_file,
+        trace_format=install_options.trace_format,
+    )
+    cmd_executor = CommandExecutor(logger, recorder=command_recorder, tracer=tracer)
+    download_cache = (
+        DownloadCache(
+            install_options.download_cache_dir,
+            install_options.download_cache_max_size_mb * 1024 * 1024,
+        )
+        if install_options.download_cache_dir is not None
+        else None
+    )
 
     return Context(
         cmd_logger=logger,
         cmd_executor=cmd_executor,
-        history_file_manager=HistoryFileManager(),
+        history_file_manager=HistoryFileManager(tracer=tracer),
         file_access=FileAccess(),
-        file_downloader=FileDownloader(),
+        file_downloader=FileDownloader(
+            cache=download_cache,
+            parallel_ranges=install_options.download_parallel_ranges,
+            concurrent_downloads=install_options.apt_parallel_downloads,
+            tracer=tracer,
+        ),
         temp_file_provider=TempFileProvider(),
+        install_options=install_options,
+        command_recorder=command_recorder,
+        tracer=tracer,
+        madison_cache=MadisonCache(cache_file=install_options.madison_cache_file),
     )
@@ -65,6 +65,7 @@ class RPackage(Package):
 
 class AptRepo(BaseModel):
     key_url: HttpUrl = Field(frozen=True)
+    key_sha256: None | str = None
     entry: str
     out_file: str
     comment: None | str = None
@@ -106,10 +107,56 @@ class AptPackages(BaseModel):
         )
 
 
+class InstallStrategy(Enum):
+    """
+    Full: installs the packages of the current phase together with the packages
+          of all previous phases and build steps.
+    Delta: installs only the packages of the current phase, while the packages of all
+           previous phases and build steps are kept pinned
+           (pip: as constraints, conda: as frozen installed packages).
+    """
+
+    Full = "Full"
+    Delta = "Delta"
+
+
+class BuildToolsProfile(Enum):
+    """
+    Default: installs build-essential and pkg-config.
+    Scientific: additionally installs a Fortran compiler and the BLAS and LAPACK
+                development files, which numerical packages like scipy need to be built.
+                The Fortran, BLAS and LAPACK runtime libraries stay installed.
+    """
+
+    Default = "Default"
+    Scientific = "Scientific"
+
+
+class PipInstaller(Enum):
+    """
+    Pip: installs the packages with `python -m pip install`.
+    Uv: installs the packages with `python -m uv pip install`, which downloads
+        and resolves in parallel. The `uv` package must already be installed
+        in the interpreter, for example by a previous phase.
+    """
+
+    Pip = "Pip"
+    Uv = "Uv"
+
+
 class PipPackages(BaseModel):
     # we need to add here later different package indexes
     packages: list[PipPackage]
     install_build_tools_ephemerally: bool = False
+    # Only used with install_build_tools_ephemerally: the apt packages of the profile
+    # and the additional apt packages in build_tools get installed ephemerally.
+    build_tools_profile: BuildToolsProfile = BuildToolsProfile.Default
+    build_tools: list[str] = []
+    install_strategy: InstallStrategy = InstallStrategy.Full
+    # Only used with install_strategy Delta: previously declared packages, which
+    # are missing in the target interpreter, get installed again.
+    verify_installed_packages: bool = False
+    installer: PipInstaller = PipInstaller.Pip
     comment: None | str = None
 
     @overload
@@ -190,6 +237,7 @@ class CondaPackages(BaseModel):
     channels: None | list[str] = None
     packages: list[CondaPackage]
     binary: CondaBinary = CondaBinary.Micromamba
+    install_strategy: InstallStrategy = InstallStrategy.Full
     comment: None | str = None
 
     @overload
@@ -232,11 +280,13 @@ class Pip(BaseModel):
 class Micromamba(BaseModel):
     version: str
     root_prefix: Path = Path("/opt/conda/")
+    sha256: None | str = None
     comment: None | str = None
 
 
 class Bazel(BaseModel):
     version: str
+    sha256: None | str = None
     comment: None | str = None
 
 
@@ -70,6 +70,22 @@ def _check_unique_conda_channels(
         )
 
 
+def _check_build_tools(pip_packages: "PipPackages", model_path: list[str]) -> None:
+    # Imported here, because the model module imports this module
+    from exasol.exaslpm.model.package_file_config import BuildToolsProfile
+
+    if pip_packages.install_build_tools_ephemerally:
+        return
+    if (
+        pip_packages.build_tools
+        or pip_packages.build_tools_profile != BuildToolsProfile.Default
+    ):
+        raise PackageFileValidationError(
+            model_path,
+            "build_tools_profile and build_tools require install_build_tools_ephemerally.",
+        )
+
+
 def validate_apt_packages(
     apt_packages: "AptPackages",
     validation_cfg: "ValidationConfig",
@@ -108,6 +124,7 @@ def validate_pip_packages(
     _check_versions(
         validation_cfg, pip_packages.packages, _model_path, _pip_version_checker
     )
+    _check_build_tools(pip_packages, _model_path)
 
 
 def validate_r_packages(
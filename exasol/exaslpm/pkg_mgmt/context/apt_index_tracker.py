@@ -0,0 +1,74 @@
+import os
+from pathlib import Path
+
+_Fingerprint = list[tuple[str, int, int]]
+
+# Files and directories, which determine the content of the APT package lists
+APT_SOURCE_PATHS = [
+    "etc/apt/sources.list",
+    "etc/apt/sources.list.d",
+    "etc/apt/trusted.gpg",
+    "etc/apt/trusted.gpg.d",
+    "etc/apt/keyrings",
+    "usr/share/keyrings",
+    "etc/apt/apt.conf.d",
+]
+APT_LISTS_PATH = "var/lib/apt/lists"
+# Files and directories with the APT pinning configuration
+APT_PREFERENCES_PATHS = [
+    "etc/apt/preferences",
+    "etc/apt/preferences.d",
+]
+
+
+class AptIndexTracker:
+    """
+    Tracks whether the APT package lists are up to date,
+    so that redundant invocations of `apt-get update` can be skipped.
+
+    The package lists are considered up to date, if no source list, key or APT configuration
+    changed since the last `apt-get update`, and the package lists were not removed.
+
+    :param root: Root directory of the file system, which is only changed in tests.
+    """
+
+    def __init__(self, root: Path = Path("/")):
+        self.root = root
+        self._fingerprint_after_update: _Fingerprint | None = None
+
+    @staticmethod
+    def _stat_entry(path: Path) -> tuple[str, int, int] | None:
+        try:
+            st = path.stat()
+        except OSError:
+            return None
+        return str(path), st.st_size, st.st_mtime_ns
+
+    def _fingerprint(self) -> _Fingerprint:
+        fingerprint = []
+        for source_path in APT_SOURCE_PATHS:
+            path = self.root / source_path
+            if path.is_dir():
+                with os.scandir(path) as it:
+                    entries = sorted(it, key=lambda entry: entry.name)
+                for entry in entries:
+                    st = entry.stat()
+                    fingerprint.append((entry.path, st.st_size, st.st_mtime_ns))
+            elif entry_fingerprint := self._stat_entry(path):
+                fingerprint.append(entry_fingerprint)
+        # The modification time of the lists directory changes if the lists get removed
+        if lists_fingerprint := self._stat_entry(self.root / APT_LISTS_PATH):
+            fingerprint.append(lists_fingerprint)
+        return fingerprint
+
+    def is_up_to_date(self) -> bool:
+        return (
+            self._fingerprint_after_update is not None
+            and self._fingerprint_after_update == self._fingerprint()
+        )
+
+    def mark_updated(self) -> None:
+        self._fingerprint_after_update = self._fingerprint()
+
+    def invalidate(self) -> None:
+        self._fingerprint_after_update = None
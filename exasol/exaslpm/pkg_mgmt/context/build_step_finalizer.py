@@ -0,0 +1,33 @@
+from collections.abc import Callable
+
+
+class BuildStepFinalizer:
+    """
+    Collects idempotent housekeeping actions, for example `ldconfig`,
+    which installers require after changing the system, and runs each of them
+    at most once at the end of the build step.
+
+    Actions get deduplicated by their name: If several phases or installers
+    register an action with the same name, only the first registration is kept.
+    The actions run in the order of their first registration.
+    """
+
+    def __init__(self) -> None:
+        self._actions: dict[str, Callable[[], None]] = {}
+
+    @property
+    def pending(self) -> list[str]:
+        return list(self._actions)
+
+    def register(self, name: str, action: Callable[[], None]) -> None:
+        self._actions.setdefault(name, action)
+
+    def run(self) -> None:
+        """
+        Runs and removes all registered actions.
+        If an action fails, the remaining actions stay registered.
+        """
+        while self._actions:
+            name, action = next(iter(self._actions.items()))
+            action()
+            del self._actions[name]
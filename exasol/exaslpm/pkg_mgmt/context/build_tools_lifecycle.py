@@ -0,0 +1,76 @@
+import contextlib
+from collections.abc import (
+    Callable,
+    Iterator,
+)
+
+
+class BuildToolsLifecycle:
+    """
+    Tracks the build tools, which get installed ephemerally for building pip packages,
+    so that consecutive phases share one installation instead of installing
+    and removing the build tools again for each phase.
+
+    Each phase, which needs build tools, uses them with `use`,
+    which counts the references and installs only the packages, which are not yet installed.
+    Outside a session, the build tools get removed as soon as the last reference gets released.
+    Within a session, the removal is delayed until `remove_unused` gets called or the session ends,
+    also if the session ends with a failure.
+    """
+
+    def __init__(self) -> None:
+        self._references = 0
+        self._packages: list[str] = []
+        self._remove: Callable[[list[str]], None] | None = None
+        self._in_session = False
+
+    @property
+    def installed(self) -> bool:
+        return bool(self._packages)
+
+    @property
+    def packages(self) -> list[str]:
+        return list(self._packages)
+
+    @contextlib.contextmanager
+    def use(
+        self,
+        packages: list[str],
+        install: Callable[[list[str]], None],
+        remove: Callable[[list[str]], None],
+    ) -> Iterator[None]:
+        """
+        Installs the packages, which are not yet installed, with `install`,
+        and keeps them installed until the context exits.
+        `remove` removes all installed packages, also after a partially failed installation.
+        """
+        self._references += 1
+        try:
+            missing = [p for p in dict.fromkeys(packages) if p not in self._packages]
+            if missing:
+                self._remove = remove
+                self._packages += missing
+                install(missing)
+            yield
+        finally:
+            self._references -= 1
+            if not self._in_session:
+                self.remove_unused()
+
+    def remove_unused(self) -> None:
+        """
+        Removes the build tools, if they are installed and no longer used.
+        """
+        if self._references == 0 and self._remove is not None:
+            remove, packages = self._remove, self._packages
+            self._remove, self._packages = None, []
+            remove(packages)
+
+    @contextlib.contextmanager
+    def session(self) -> Iterator[None]:
+        self._in_session = True
+        try:
+            yield
+        finally:
+            self._in_session = False
+            self.remove_unused()
@@ -1,17 +1,33 @@
+import asyncio
+import codecs
+import io
+import locale
 import os
+import resource
+import selectors
 import subprocess  # nosec B404
 import sys
 import threading
+import time
 from collections.abc import (
     Callable,
     Iterator,
+    Sequence,
 )
 from typing import (
-    TextIO,
+    BinaryIO,
     cast,
 )
 
 from exasol.exaslpm.pkg_mgmt.context.cmd_logger import CommandLogger
+from exasol.exaslpm.pkg_mgmt.context.command_recorder import (
+    CommandRecord,
+    CommandRecorder,
+)
+from exasol.exaslpm.pkg_mgmt.context.tracer import (
+    Span,
+    Tracer,
+)
 
 
 class CommandFailedException(Exception):
@@ -78,9 +94,165 @@ class CommandResult:
         self._log.info(f"Return Code: {ret_code}")
 
 
+PIPE_READ_SIZE = 64 * 1024
+
+
+class _LineSplitter:
+    """
+    Decodes the chunks read from a pipe incrementally and splits them into lines.
+    Line endings get translated to "\n" as for subprocesses in text mode.
+    Each line keeps its line ending, an incomplete line is kept until the next chunk arrives.
+    """
+
+    def __init__(self, consume_lines: Callable[[list[str]], None]):
+        self._consume_lines = consume_lines
+        decoder = codecs.getincrementaldecoder(locale.getpreferredencoding(False))(
+            errors="replace"
+        )
+        self._decoder = io.IncrementalNewlineDecoder(decoder, translate=True)
+        self._pending = ""
+
+    def feed(self, data: bytes, final: bool = False) -> None:
+        text = self._pending + self._decoder.decode(data, final=final)
+        # Splits only at "\n", unlike str.splitlines()
+        lines = io.StringIO(text, newline="\n").readlines()
+        self._pending = lines.pop() if lines and not lines[-1].endswith("\n") else ""
+        if final and self._pending:
+            lines.append(self._pending)
+            self._pending = ""
+        if lines:
+            self._consume_lines(lines)
+
+
+class PipeCommandResult(CommandResult):
+    """
+    Result of a subprocess, whose stdout and stderr are binary pipes.
+    Instead of one thread per pipe, both pipes get drained from the calling thread
+    with a selector. The pipes are read in large chunks, which are split into lines in bulk.
+    When the subprocess finished, its timing and resource usage get passed to the recorder.
+    """
+
+    def __init__(
+        self,
+        process: subprocess.Popen,
+        logger: CommandLogger,
+        cmd_args: list[str] | None = None,
+        recorder: CommandRecorder | None = None,
+        tracer: Tracer | None = None,
+        span: Span | None = None,
+    ):
+        super().__init__(
+            fn_ret_code=process.wait, stdout=iter(()), stderr=iter(()), logger=logger
+        )
+        self._process = process
+        self._cmd_args = cmd_args or []
+        self._recorder = recorder
+        self._tracer = tracer
+        self._span = span
+        self._start_time = time.monotonic()
+        self._output_bytes = {"stdout": 0, "stderr": 0}
+        self._return_code: int | None = None
+
+    def return_code(self) -> int:
+        if self._return_code is None:
+            self._return_code = self._wait()
+        return self._return_code
+
+    def _wait(self) -> int:
+        """
+        Waits for the subprocess with os.wait4(), which also returns its resource usage.
+        """
+        rusage: resource.struct_rusage | None = None
+        if self._process.returncode is not None:
+            # Already reaped by Popen, its resource usage is not available anymore
+            return_code = self._process.returncode
+        else:
+            _, status, rusage = os.wait4(self._process.pid, 0)
+            return_code = os.waitstatus_to_exitcode(status)
+            # Tell Popen that the process has been reaped
+            self._process.returncode = return_code
+        if self._tracer is not None and self._span is not None:
+            self._span.set_attributes(
+                return_code=return_code,
+                stdout_bytes=self._output_bytes["stdout"],
+                stderr_bytes=self._output_bytes["stderr"],
+            )
+            self._tracer.end_span(self._span)
+        if self._recorder is not None:
+            self._recorder.record(
+                CommandRecord(
+                    cmd=self._cmd_args,
+                    return_code=return_code,
+                    wall_time_seconds=time.monotonic() - self._start_time,
+                    stdout_bytes=self._output_bytes["stdout"],
+                    stderr_bytes=self._output_bytes["stderr"],
+                    user_cpu_seconds=rusage.ru_utime if rusage else None,
+                    sys_cpu_seconds=rusage.ru_stime if rusage else None,
+                    max_rss_kb=rusage.ru_maxrss if rusage else None,
+                )
+            )
+        return return_code
+
+    def _drain(
+        self,
+        consume_stdout_lines: Callable[[list[str]], None],
+        consume_stderr_lines: Callable[[list[str]], None],
+    ) -> int:
+        pipes = [
+            ("stdout", cast(BinaryIO, self._process.stdout), consume_stdout_lines),
+            ("stderr", cast(BinaryIO, self._process.stderr), consume_stderr_lines),
+        ]
+        with selectors.DefaultSelector() as selector:
+            for name, pipe, consume_lines in pipes:
+                selector.register(
+                    pipe, selectors.EVENT_READ, (name, _LineSplitter(consume_lines))
+                )
+            while selector.get_map():
+                for key, _ in selector.select():
+                    name, splitter = key.data
+                    data = os.read(key.fd, PIPE_READ_SIZE)
+                    if data:
+                        self._output_bytes[name] += len(data)
+                        splitter.feed(data)
+                    else:
+                        splitter.feed(b"", final=True)
+                        selector.unregister(key.fileobj)
+                        cast(BinaryIO, key.fileobj).close()
+        return self.return_code()
+
+    def consume_results(
+        self,
+        consume_stdout: Callable[[str | bytes], None],
+        consume_stderr: Callable[[str | bytes], None],
+    ):
+        def line_by_line(consume: Callable[[str | bytes], None]):
+            def consume_lines(lines: list[str]) -> None:
+                for line in lines:
+                    consume(line)
+
+            return consume_lines
+
+        return self._drain(line_by_line(consume_stdout), line_by_line(consume_stderr))
+
+    def print_results(self):
+        # The logger receives all lines of a chunk at once, instead of each line separately
+        ret_code = self._drain(
+            lambda lines: self._log.info("".join(lines)),
+            lambda lines: self._log.err("".join(lines)),
+        )
+        self._log.info(f"Return Code: {ret_code}")
+
+
 class CommandExecutor:
-    def __init__(self, logger: CommandLogger):
+    def __init__(
+        self,
+        logger: CommandLogger,
+        recorder: CommandRecorder | None = None,
+        tracer: Tracer | None = None,
+    ):
         self._log = logger
+        self._recorder = recorder or CommandRecorder()
+        self._tracer = tracer or Tracer()
 
     @staticmethod
     def get_resource_path() -> str | None:
@@ -114,19 +286,137 @@ class CommandExecutor:
         cmd_str = " ".join(cmd_args)
         self._log.info(f"Executing: {cmd_str}")
 
+        span = self._tracer.start_span("subprocess", cmd=cmd_str)
         sub_process = subprocess.Popen(
             cmd_args,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
-            text=True,
             env=self._cleanup_ld_library_path(env),
         )  # nosec B603
-        std_out = cast(TextIO, sub_process.stdout)
-        std_err = cast(TextIO, sub_process.stderr)
 
-        return CommandResult(
-            fn_ret_code=sub_process.wait,
-            stdout=iter(std_out),
-            stderr=iter(std_err),
+        return PipeCommandResult(
+            sub_process,
             logger=self._log,
+            cmd_args=cmd_args,
+            recorder=self._recorder,
+            tracer=self._tracer,
+            span=span,
+        )
+
+    @staticmethod
+    async def _drain_stream(
+        stream: asyncio.StreamReader, splitter: _LineSplitter
+    ) -> int:
+        """
+        Returns the number of bytes read from the stream.
+        """
+        size = 0
+        while data := await stream.read(PIPE_READ_SIZE):
+            size += len(data)
+            splitter.feed(data)
+        splitter.feed(b"", final=True)
+        return size
+
+    async def execute_async(
+        self,
+        cmd_args: list[str],
+        env: dict[str, str] | None = None,
+        buffered: bool = False,
+    ) -> int:
+        """
+        Runs the command as asyncio subprocess and logs its output.
+
+        :param cmd_args: command with all its options as a list of individual str
+        :param env: environment variables to be set during execution
+        :param buffered: If False, the output is logged while it arrives.
+                         If True, the output is logged as one block after the command finished,
+                         so that output of concurrent commands does not interleave.
+        :return: The return code of the command
+        """
+        cmd_str = " ".join(cmd_args)
+        self._log.info(f"Executing: {cmd_str}")
+        start_time = time.monotonic()
+        span = self._tracer.start_span("subprocess", cmd=cmd_str)
+        process = await asyncio.create_subprocess_exec(
+            *cmd_args,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            env=self._cleanup_ld_library_path(env),
+        )  # nosec B603
+        stdout_lines: list[str] = []
+        stderr_lines: list[str] = []
+        consume_stdout_lines: Callable[[list[str]], None] = (
+            stdout_lines.extend
+            if buffered
+            else lambda lines: self._log.info("".join(lines))
+        )
+        consume_stderr_lines: Callable[[list[str]], None] = (
+            stderr_lines.extend
+            if buffered
+            else lambda lines: self._log.err("".join(lines))
+        )
+        stdout_bytes, stderr_bytes = await asyncio.gather(
+            self._drain_stream(
+                cast(asyncio.StreamReader, process.stdout),
+                _LineSplitter(consume_stdout_lines),
+            ),
+            self._drain_stream(
+                cast(asyncio.StreamReader, process.stderr),
+                _LineSplitter(consume_stderr_lines),
+            ),
         )
+        ret_code = await process.wait()
+        span.set_attributes(
+            return_code=ret_code, stdout_bytes=stdout_bytes, stderr_bytes=stderr_bytes
+        )
+        self._tracer.end_span(span)
+        # The resource usage is not available, because asyncio reaps the child process
+        self._recorder.record(
+            CommandRecord(
+                cmd=cmd_args,
+                return_code=ret_code,
+                wall_time_seconds=time.monotonic() - start_time,
+                stdout_bytes=stdout_bytes,
+                stderr_bytes=stderr_bytes,
+            )
+        )
+        if buffered:
+            self._log.info(f"Finished: {cmd_str}")
+            if stdout_lines:
+                self._log.info("".join(stdout_lines))
+            if stderr_lines:
+                self._log.err("".join(stderr_lines))
+        self._log.info(f"Return Code: {ret_code}")
+        return ret_code
+
+    async def run_many_async(
+        self,
+        cmds: Sequence[tuple[list[str], dict[str, str] | None]],
+        max_parallel: int | None = None,
+    ) -> list[int]:
+        """
+        Runs independent commands concurrently, at most `max_parallel` at the same time.
+
+        :param cmds: pairs of command arguments and environment variables
+        :param max_parallel: maximum number of concurrently running commands,
+                             defaults to the number of CPUs
+        :return: The return codes of the commands, in the order of the given commands
+        """
+        semaphore = asyncio.Semaphore(max_parallel or os.cpu_count() or 1)
+        buffered = len(cmds) > 1
+
+        async def run(cmd_args: list[str], env: dict[str, str] | None) -> int:
+            async with semaphore:
+                return await self.execute_async(cmd_args, env, buffered=buffered)
+
+        return list(await asyncio.gather(*(run(*cmd) for cmd in cmds)))
+
+    def run_many(
+        self,
+        cmds: Sequence[tuple[list[str], dict[str, str] | None]],
+        max_parallel: int | None = None,
+    ) -> list[int]:
+        """
+        Synchronous variant of run_many_async().
+        """
+        return asyncio.run(self.run_many_async(cmds, max_parallel))
@@ -0,0 +1,102 @@
+import contextlib
+import json
+import threading
+from collections.abc import Iterator
+from dataclasses import (
+    asdict,
+    dataclass,
+    field,
+)
+from pathlib import Path
+
+
+@dataclass
+class CommandRecord:
+    """
+    Timing and resource usage of a single command.
+
+    `user_cpu_seconds`, `sys_cpu_seconds` and `max_rss_kb` are None,
+    if the resource usage of the child process is not available.
+    `tags` contains the build step, phase and installer, which ran the command.
+    """
+
+    cmd: list[str]
+    return_code: int
+    wall_time_seconds: float
+    stdout_bytes: int
+    stderr_bytes: int
+    user_cpu_seconds: float | None = None
+    sys_cpu_seconds: float | None = None
+    max_rss_kb: int | None = None
+    tags: dict[str, str] = field(default_factory=dict)
+
+
+class CommandRecorder:
+    """
+    Collects a CommandRecord for each executed command.
+
+    The records get tagged with the tags of the enclosing `tagged()` contexts.
+    If neither `report_file` nor `stream_file` is given, the recorder is disabled and collects nothing.
+
+    :param report_file: File, which `write_report()` writes the JSON report to.
+    :param stream_file: File, which each record gets appended to as JSON line,
+                        as soon as the command finished.
+    """
+
+    def __init__(
+        self, report_file: Path | None = None, stream_file: Path | None = None
+    ):
+        self.report_file = report_file
+        self.stream_file = stream_file
+        self.records: list[CommandRecord] = []
+        self._tags: dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.report_file is not None or self.stream_file is not None
+
+    @contextlib.contextmanager
+    def tagged(self, **tags: str) -> Iterator[None]:
+        previous_tags = self._tags
+        self._tags = {**previous_tags, **tags}
+        try:
+            yield
+        finally:
+            self._tags = previous_tags
+
+    def record(self, record: CommandRecord) -> None:
+        if not self.enabled:
+            return
+        record.tags = {**self._tags, **record.tags}
+        with self._lock:
+            self.records.append(record)
+            if self.stream_file is not None:
+                with self.stream_file.open("a") as f:
+                    print(json.dumps(asdict(record)), file=f)
+
+    def report(self) -> dict:
+        totals: dict[str, dict[str, float]] = {}
+        for record in self.records:
+            installer = record.tags.get("installer", "")
+            total = totals.setdefault(
+                installer,
+                {
+                    "commands": 0,
+                    "wall_time_seconds": 0.0,
+                    "user_cpu_seconds": 0.0,
+                    "sys_cpu_seconds": 0.0,
+                },
+            )
+            total["commands"] += 1
+            total["wall_time_seconds"] += record.wall_time_seconds
+            total["user_cpu_seconds"] += record.user_cpu_seconds or 0.0
+            total["sys_cpu_seconds"] += record.sys_cpu_seconds or 0.0
+        return {
+            "commands": [asdict(record) for record in self.records],
+            "totals_by_installer": totals,
+        }
+
+    def write_report(self) -> None:
+        if self.report_file is not None:
+            self.report_file.write_text(json.dumps(self.report(), indent=2))
@@ -1,11 +1,22 @@
-from dataclasses import dataclass
+from dataclasses import (
+    dataclass,
+    field,
+)
 
+from exasol.exaslpm.pkg_mgmt.context.apt_index_tracker import AptIndexTracker
+from exasol.exaslpm.pkg_mgmt.context.build_step_finalizer import BuildStepFinalizer
+from exasol.exaslpm.pkg_mgmt.context.build_tools_lifecycle import BuildToolsLifecycle
 from exasol.exaslpm.pkg_mgmt.context.cmd_executor import CommandExecutor
 from exasol.exaslpm.pkg_mgmt.context.cmd_logger import CommandLogger
+from exasol.exaslpm.pkg_mgmt.context.command_recorder import CommandRecorder
+from exasol.exaslpm.pkg_mgmt.context.dpkg_status_index import DpkgStatusIndex
 from exasol.exaslpm.pkg_mgmt.context.file_access import FileAccess
 from exasol.exaslpm.pkg_mgmt.context.file_downloader import FileDownloader
 from exasol.exaslpm.pkg_mgmt.context.history_file_manager import HistoryFileManager
+from exasol.exaslpm.pkg_mgmt.context.install_options import InstallOptions
+from exasol.exaslpm.pkg_mgmt.context.madison_cache import MadisonCache
 from exasol.exaslpm.pkg_mgmt.context.temp_file_provider import TempFileProvider
+from exasol.exaslpm.pkg_mgmt.context.tracer import Tracer
 
 
 @dataclass(frozen=True)
@@ -16,3 +27,11 @@ class Context:
     file_access: FileAccess
     file_downloader: FileDownloader
     temp_file_provider: TempFileProvider
+    install_options: InstallOptions = InstallOptions()
+    command_recorder: CommandRecorder = field(default_factory=CommandRecorder)
+    tracer: Tracer = field(default_factory=Tracer)
+    apt_index_tracker: AptIndexTracker = field(default_factory=AptIndexTracker)
+    build_step_finalizer: BuildStepFinalizer = field(default_factory=BuildStepFinalizer)
+    dpkg_status_index: DpkgStatusIndex = field(default_factory=DpkgStatusIndex)
+    madison_cache: MadisonCache = field(default_factory=MadisonCache)
+    build_tools: BuildToolsLifecycle = field(default_factory=BuildToolsLifecycle)
@@ -0,0 +1,138 @@
+import contextlib
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from collections.abc import Iterator
+from pathlib import Path
+
+DOWNLOAD_CACHE_VERSION = 1
+_CHUNK_SIZE = 1024 * 1024
+
+
+def sha256_of_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        while chunk := f.read(_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class DownloadCache:
+    """
+    Content-addressed cache for downloaded files.
+
+    Layout of the cache directory:
+     - blobs/<sha256>: content of the downloaded files, named by their SHA-256 digest
+     - index.json: maps each URL to the digest and size of its content and the time of last use
+     - .lock: lock file, serializes access of concurrent processes sharing the cache directory
+
+    The least recently used entries get evicted if the total size of all blobs
+    exceeds the given maximum size.
+    """
+
+    def __init__(self, cache_dir: Path, max_size_in_bytes: int):
+        self.cache_dir = cache_dir
+        self.max_size_in_bytes = max_size_in_bytes
+        self._blobs_dir = cache_dir / "blobs"
+        self._index_file = cache_dir / "index.json"
+        self._blobs_dir.mkdir(parents=True, exist_ok=True)
+
+    @contextlib.contextmanager
+    def _locked(self) -> Iterator[None]:
+        with open(self.cache_dir / ".lock", "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read_index(self) -> dict[str, dict]:
+        try:
+            index = json.loads(self._index_file.read_text())
+        except (OSError, ValueError):
+            return {}
+        if (
+            not isinstance(index, dict)
+            or index.get("version") != DOWNLOAD_CACHE_VERSION
+        ):
+            return {}
+        return index.get("urls", {})
+
+    def _write_index(self, urls: dict[str, dict]) -> None:
+        fd, tmp_name = tempfile.mkstemp(dir=self.cache_dir, prefix=".index.json.")
+        with os.fdopen(fd, "w") as f:
+            json.dump({"version": DOWNLOAD_CACHE_VERSION, "urls": urls}, f)
+        os.replace(tmp_name, self._index_file)
+
+    def _blob(self, digest: str) -> Path:
+        return self._blobs_dir / digest
+
+    def _remove(self, urls: dict[str, dict], digest: str) -> None:
+        for url in [url for url, entry in urls.items() if entry["digest"] == digest]:
+            del urls[url]
+        self._blob(digest).unlink(missing_ok=True)
+
+    def fetch(self, url: str, target: Path) -> str | None:
+        """
+        Copies the cached content of the given URL to the target path and returns its SHA-256 digest.
+        Returns None if the URL is not cached or the cached content is corrupt.
+        """
+        with self._locked():
+            urls = self._read_index()
+            entry = urls.get(url)
+            if entry is None:
+                return None
+            digest = entry["digest"]
+            blob = self._blob(digest)
+            if not blob.exists() or sha256_of_file(blob) != digest:
+                self._remove(urls, digest)
+                self._write_index(urls)
+                return None
+            shutil.copyfile(blob, target)
+            entry["last_used"] = time.time()
+            self._write_index(urls)
+            return digest
+
+    def store(self, url: str, source: Path, digest: str) -> None:
+        """
+        Adds the given file as content of the URL to the cache
+        and evicts the least recently used entries if the cache got too large.
+        """
+        size = source.stat().st_size
+        if size > self.max_size_in_bytes:
+            return
+        with self._locked():
+            blob = self._blob(digest)
+            if not blob.exists():
+                fd, tmp_name = tempfile.mkstemp(dir=self._blobs_dir, prefix=".")
+                os.close(fd)
+                shutil.copyfile(source, tmp_name)
+                os.replace(tmp_name, blob)
+            urls = self._read_index()
+            previous = urls.get(url)
+            urls[url] = {"digest": digest, "size": size, "last_used": time.time()}
+            if previous is not None and not any(
+                entry["digest"] == previous["digest"] for entry in urls.values()
+            ):
+                # The content of the URL changed and the previous blob is not used anymore
+                self._blob(previous["digest"]).unlink(missing_ok=True)
+            self._evict(urls)
+            self._write_index(urls)
+
+    def _evict(self, urls: dict[str, dict]) -> None:
+        sizes = {entry["digest"]: entry["size"] for entry in urls.values()}
+        last_used: dict[str, float] = {}
+        for entry in urls.values():
+            last_used[entry["digest"]] = max(
+                entry["last_used"], last_used.get(entry["digest"], 0.0)
+            )
+        total_size = sum(sizes.values())
+        for digest in sorted(last_used, key=lambda d: last_used[d]):
+            if total_size <= self.max_size_in_bytes:
+                break
+            self._remove(urls, digest)
+            total_size -= sizes[digest]
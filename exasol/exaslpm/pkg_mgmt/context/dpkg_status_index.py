@@ -0,0 +1,67 @@
+from pathlib import Path
+
+DPKG_STATUS_PATH = "var/lib/dpkg/status"
+
+_Signature = tuple[int, int]
+
+
+class DpkgStatusIndex:
+    """
+    Index of the installed Debian packages and their versions,
+    parsed from the dpkg status file.
+
+    The status file gets parsed only once and again after it changed,
+    for example after `apt-get install`.
+    A missing status file results in an empty index.
+
+    :param root: Root directory of the file system, which is only changed in tests.
+    """
+
+    def __init__(self, root: Path = Path("/")):
+        self.root = root
+        self._signature: _Signature | None = None
+        self._versions: dict[str, str] = {}
+
+    @property
+    def status_file(self) -> Path:
+        return self.root / DPKG_STATUS_PATH
+
+    @staticmethod
+    def _parse(content: str) -> dict[str, str]:
+        versions = {}
+        for stanza in content.split("\n\n"):
+            fields = {}
+            for line in stanza.splitlines():
+                # Continuation lines of multi-line fields start with whitespace
+                if not line or line[0].isspace():
+                    continue
+                key, sep, value = line.partition(":")
+                if sep:
+                    fields[key] = value.strip()
+            name = fields.get("Package")
+            version = fields.get("Version")
+            status = fields.get("Status", "").split()
+            if not (name and version and status and status[-1] == "installed"):
+                continue
+            versions[name] = version
+            if architecture := fields.get("Architecture"):
+                versions[f"{name}:{architecture}"] = version
+        return versions
+
+    def _load(self) -> dict[str, str]:
+        try:
+            st = self.status_file.stat()
+        except OSError:
+            self._signature = None
+            self._versions = {}
+            return self._versions
+        signature = (st.st_size, st.st_mtime_ns)
+        if signature != self._signature:
+            self._versions = self._parse(
+                self.status_file.read_text(encoding="utf-8", errors="replace")
+            )
+            self._signature = signature
+        return self._versions
+
+    def installed_version(self, name: str) -> str | None:
+        return self._load().get(name)
@@ -1,19 +1,297 @@
 import contextlib
+import hashlib
+import os
 import tempfile
-from collections.abc import Iterator
+import threading
+from collections.abc import (
+    Iterable,
+    Iterator,
+)
+from concurrent.futures import (
+    Future,
+    ThreadPoolExecutor,
+)
+from dataclasses import dataclass
 from pathlib import Path
 
 import requests
+from requests.adapters import HTTPAdapter
+
+from exasol.exaslpm.pkg_mgmt.context.download_cache import (
+    DownloadCache,
+    sha256_of_file,
+)
+from exasol.exaslpm.pkg_mgmt.context.tracer import Tracer
+
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+PARALLEL_RANGES_MIN_SIZE = 8 * 1024 * 1024
+
+# Errors after which a download gets resumed, instead of failing immediately
+TRANSIENT_ERRORS = (
+    requests.ConnectionError,
+    requests.Timeout,
+    requests.exceptions.ChunkedEncodingError,
+)
+
+
+class DownloadVerificationException(Exception):
+    """
+    Raised when the SHA-256 digest of a downloaded file does not match the expected digest
+    """
+
+
+@dataclass(frozen=True)
+class Download:
+    """
+    A file, which an installer downloads with FileDownloader.download_file_to_tmp().
+    """
+
+    url: str
+    timeout_in_seconds: int = 30
+    cache: bool = True
+    sha256: str | None = None
 
 
 class FileDownloader:
+    """
+    Downloads files via HTTP.
+
+    :param cache: Optional download cache.
+    :param max_retries: Number of times a download gets resumed with an HTTP Range request
+                        after a transient error.
+    :param parallel_ranges: If greater than 1, files of at least `parallel_ranges_min_size` bytes
+                            get split into this number of ranges, which are downloaded in parallel.
+                            Requires that the server supports HTTP Range requests,
+                            otherwise the file is downloaded in a single stream.
+    :param parallel_ranges_min_size: Minimum size of files to be downloaded in parallel ranges.
+    :param max_parallel_downloads: Maximum number of files, which get prefetched concurrently.
+    :param concurrent_downloads: Number of files, which callers download concurrently
+                                 with download_file_to_tmp(), like the parallel apt archive downloads.
+    :param tracer: Optional tracer, which records a span for each download.
+    """
+
+    def __init__(
+        self,
+        cache: DownloadCache | None = None,
+        max_retries: int = 3,
+        parallel_ranges: int = 1,
+        parallel_ranges_min_size: int = PARALLEL_RANGES_MIN_SIZE,
+        max_parallel_downloads: int = 4,
+        concurrent_downloads: int = 1,
+        tracer: Tracer | None = None,
+    ):
+        self._cache = cache
+        self._tracer = tracer or Tracer()
+        self.max_retries = max_retries
+        self.parallel_ranges = parallel_ranges
+        self.parallel_ranges_min_size = parallel_ranges_min_size
+        self.max_parallel_downloads = max_parallel_downloads
+        # The session shares connections between all downloads, including concurrent ones
+        self._session = requests.Session()
+        pool_size = max(max_parallel_downloads, concurrent_downloads) * max(
+            parallel_ranges, 1
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        self._prefetched: dict[str, Future[Path]] = {}
+        self._prefetched_lock = threading.Lock()
+
+    def _get_range(
+        self, url: str, start: int, end: int | None, timeout_in_seconds: int
+    ) -> Iterator[bytes]:
+        """
+        Yields the content of the given URL from byte `start` to byte `end` (inclusive),
+        or to the end of the file if `end` is None.
+        After a transient error, the download gets resumed with an HTTP Range request
+        from the first missing byte.
+        """
+        position = start
+        retries = 0
+        while True:
+            headers = {}
+            if position > 0 or end is not None:
+                headers["Range"] = f"bytes={position}-{'' if end is None else end}"
+            try:
+                with self._session.get(
+                    url, headers=headers, timeout=timeout_in_seconds, stream=True
+                ) as r:
+                    r.raise_for_status()
+                    if headers and r.status_code != 206:
+                        raise requests.HTTPError(
+                            f"Server ignored range request for {url}", response=r
+                        )
+                    for chunk in r.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                        position += len(chunk)
+                        yield chunk
+                return
+            except TRANSIENT_ERRORS:
+                retries += 1
+                if retries > self.max_retries:
+                    raise
+
+    def _probe_range_support(self, url: str, timeout_in_seconds: int) -> int | None:
+        """
+        Returns the size of the file, if the server supports range requests for the given URL.
+        """
+        try:
+            r = self._session.head(
+                url, timeout=timeout_in_seconds, allow_redirects=True
+            )
+            r.raise_for_status()
+        except requests.RequestException:
+            return None
+        if r.headers.get("Accept-Ranges") != "bytes":
+            return None
+        size = r.headers.get("Content-Length")
+        return int(size) if size and size.isdigit() else None
+
+    def _download(self, url: str, target: Path, timeout_in_seconds: int) -> str:
+        """
+        Streams the content of the given URL chunk by chunk to the target path,
+        so that memory usage does not depend on the size of the file.
+        Returns the SHA-256 digest of the content.
+        """
+        if self.parallel_ranges > 1:
+            size = self._probe_range_support(url, timeout_in_seconds)
+            if size is not None and size >= self.parallel_ranges_min_size:
+                return self._download_parallel_ranges(
+                    url, target, size, timeout_in_seconds
+                )
+        digest = hashlib.sha256()
+        with target.open(mode="wb") as f:
+            for chunk in self._get_range(url, 0, None, timeout_in_seconds):
+                digest.update(chunk)
+                f.write(chunk)
+        return digest.hexdigest()
+
+    def _download_parallel_ranges(
+        self, url: str, target: Path, size: int, timeout_in_seconds: int
+    ) -> str:
+        range_size = -(-size // self.parallel_ranges)
+        ranges = [
+            (start, min(start + range_size, size) - 1)
+            for start in range(0, size, range_size)
+        ]
+
+        def download_range(start: int, end: int) -> None:
+            position = start
+            for chunk in self._get_range(url, start, end, timeout_in_seconds):
+                os.pwrite(fd, chunk, position)
+                position += len(chunk)
+            if position != end + 1:
+                raise requests.HTTPError(
+                    f"Incomplete range {start}-{end} of {url}, received {position - start} bytes"
+                )
+
+        fd = os.open(target, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        try:
+            os.ftruncate(fd, size)
+            with ThreadPoolExecutor(max_workers=len(ranges)) as executor:
+                futures = [executor.submit(download_range, *r) for r in ranges]
+                for future in futures:
+                    future.result()
+        finally:
+            os.close(fd)
+        # The ranges arrive out of order, so the digest can only be computed after assembly.
+        return sha256_of_file(target)
+
+    def _fetch(
+        self,
+        url: str,
+        target: Path,
+        timeout_in_seconds: int,
+        cache: bool,
+        sha256: str | None,
+    ) -> None:
+        with self._tracer.span("download", url=url) as span:
+            download_cache = self._cache if cache else None
+            digest = download_cache.fetch(url, target) if download_cache else None
+            if digest is not None and sha256 is not None and digest != sha256.lower():
+                # The content changed since it got cached, download it again
+                digest = None
+            downloaded = digest is None
+            if digest is None:
+                digest = self._download(url, target, timeout_in_seconds)
+            span.set_attributes(cache_hit=not downloaded, bytes=target.stat().st_size)
+            if sha256 is not None and digest != sha256.lower():
+                raise DownloadVerificationException(
+                    f"SHA-256 digest of {url} is {digest}, expected {sha256}"
+                )
+            if downloaded and download_cache is not None:
+                download_cache.store(url, target, digest)
+
+    def _take_prefetched(self, url: str, target: Path) -> bool:
+        """
+        Moves the prefetched file of the given URL to the target path.
+        Waits if the prefetch is still running.
+        Returns False if the URL was not prefetched or the prefetch failed.
+        """
+        with self._prefetched_lock:
+            future = self._prefetched.pop(url, None)
+        if future is None:
+            return False
+        try:
+            with self._tracer.span("wait_for_prefetch", url=url):
+                prefetched = future.result()
+        except Exception:
+            # A direct download retries and reports the error, if there is one
+            return False
+        os.replace(prefetched, target)
+        return True
 
     @contextlib.contextmanager
-    def download_file_to_tmp(self, url: str, timeout_in_seconds=30) -> Iterator[Path]:
+    def prefetch(self, downloads: Iterable[Download]) -> Iterator[None]:
+        """
+        Starts downloading the given files in the background, with at most `max_parallel_downloads`
+        concurrent downloads. Within the context, download_file_to_tmp() takes a prefetched file
+        instead of downloading it again.
+        Prefetched files not requested until the end of the context get discarded.
+        """
+        with tempfile.TemporaryDirectory() as tmpdir:
+            executor = ThreadPoolExecutor(max_workers=self.max_parallel_downloads)
+            try:
+                for index, download in enumerate(
+                    {d.url: d for d in downloads}.values()
+                ):
+                    target = Path(tmpdir) / str(index)
+
+                    def fetch(download: Download = download, target: Path = target):
+                        self._fetch(
+                            download.url,
+                            target,
+                            download.timeout_in_seconds,
+                            download.cache,
+                            download.sha256,
+                        )
+                        return target
+
+                    with self._prefetched_lock:
+                        self._prefetched[download.url] = executor.submit(fetch)
+                yield
+            finally:
+                with self._prefetched_lock:
+                    self._prefetched.clear()
+                executor.shutdown(wait=True, cancel_futures=True)
+
+    @contextlib.contextmanager
+    def download_file_to_tmp(
+        self,
+        url: str,
+        timeout_in_seconds=30,
+        cache: bool = True,
+        sha256: str | None = None,
+    ) -> Iterator[Path]:
+        """
+        Downloads the given URL to a temporary file.
+        If a download cache is configured and the `cache` argument is True,
+        the content is taken from, respectively stored to, the download cache.
+        Set `cache` to False for URLs whose content can change over time.
+        If `sha256` is given, the content must match this digest,
+        otherwise a DownloadVerificationException is raised.
+        """
         with tempfile.TemporaryDirectory() as tmpdir:
             p = Path(tmpdir) / "file"
-            r = requests.get(url, timeout=timeout_in_seconds)
-            r.raise_for_status()
-            with p.open(mode="wb") as f:
-                f.write(r.content)
+            if not self._take_prefetched(url, p):
+                self._fetch(url, p, timeout_in_seconds, cache, sha256)
             yield p
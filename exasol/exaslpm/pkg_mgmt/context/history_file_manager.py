@@ -1,21 +1,66 @@
+import json
+import os
+import tempfile
 from collections.abc import Iterator
 from pathlib import Path
 
 import yaml
+from pydantic import (
+    BaseModel,
+    ValidationError,
+)
 
 from exasol.exaslpm.model.package_file_config import (
     BuildStep,
     PackageFile,
 )
 from exasol.exaslpm.model.serialization import to_yaml_str
+from exasol.exaslpm.pkg_mgmt.context.tracer import Tracer
 from exasol.exaslpm.pkg_mgmt.package_file_session import PackageFileSession
 
+HISTORY_INDEX_VERSION = 1
+
+
+class _HistoryIndexEntry(BaseModel):
+    file_name: str
+    size: int
+    mtime_ns: int
+    build_step: BuildStep
+
+
+class _HistoryIndex(BaseModel):
+    """
+    Sidecar of the history path, which stores the already parsed build steps together
+    with the name, size and modification time of the history file they were read from.
+    """
+
+    version: int = HISTORY_INDEX_VERSION
+    entries: list[_HistoryIndexEntry]
+
+
+_Fingerprint = list[tuple[str, int, int]]
+
 
 class HistoryFileManager:
-    def __init__(self, history_path: Path = Path("/build_info/packages/history")):
+    def __init__(
+        self,
+        history_path: Path = Path("/build_info/packages/history"),
+        index_path: Path | None = None,
+        tracer: Tracer | None = None,
+    ):
         self.history_path = history_path
+        self._tracer = tracer or Tracer()
         if not history_path.exists():
             history_path.mkdir(parents=True)
+        # The index must not be stored inside the history path,
+        # as every file in there is considered to be a history file.
+        self.index_path = index_path or history_path.with_name(
+            f"{history_path.name}.index.json"
+        )
+        self.conda_lock_path = history_path.with_name("conda_lock_files")
+        self._cached_fingerprint: _Fingerprint | None = None
+        self._cached_build_steps: dict[str, BuildStep] = {}
+        self._serialized_build_steps: dict[str, str] = {}
 
     @staticmethod
     def _serialize_build_step(build_step: BuildStep) -> str:
@@ -36,6 +81,108 @@ class HistoryFileManager:
     def _history_files(self) -> Iterator[Path]:
         yield from (p for p in self.history_path.iterdir() if p.is_file())
 
+    @staticmethod
+    def _file_fingerprint(name: str, st: os.stat_result) -> tuple[str, int, int]:
+        return name, st.st_size, st.st_mtime_ns
+
+    def _fingerprint(self) -> _Fingerprint:
+        """
+        Returns name, size and modification time of all history files, sorted by name.
+        """
+        with os.scandir(self.history_path) as entries:
+            fingerprint = [
+                self._file_fingerprint(entry.name, entry.stat())
+                for entry in entries
+                if entry.is_file()
+            ]
+        fingerprint.sort()
+        return fingerprint
+
+    def _read_index(self, fingerprint: _Fingerprint) -> dict[str, BuildStep] | None:
+        """
+        Returns the build steps stored in the index file,
+        or None if the index file does not exist, is corrupt or is stale.
+        """
+        try:
+            index = _HistoryIndex.model_validate_json(self.index_path.read_bytes())
+        except (OSError, ValidationError):
+            return None
+        if index.version != HISTORY_INDEX_VERSION:
+            return None
+        index_fingerprint = [
+            (entry.file_name, entry.size, entry.mtime_ns) for entry in index.entries
+        ]
+        if index_fingerprint != fingerprint:
+            return None
+        return {entry.file_name: entry.build_step for entry in index.entries}
+
+    def _write_index(
+        self, fingerprint: _Fingerprint, build_steps: dict[str, BuildStep]
+    ) -> None:
+        """
+        Atomically replaces the index file: the new content is written to a temporary file
+        in the same directory, which then gets renamed to the index file.
+        """
+        # The entries get assembled from cached JSON fragments,
+        # so that adding a build step does not re-serialize the whole history.
+        entries = []
+        for file_name, size, mtime_ns in fingerprint:
+            if file_name not in self._serialized_build_steps:
+                self._serialized_build_steps[file_name] = build_steps[
+                    file_name
+                ].model_dump_json(exclude_none=True)
+            metadata = json.dumps(
+                {"file_name": file_name, "size": size, "mtime_ns": mtime_ns}
+            )
+            entries.append(
+                f'{metadata[:-1]}, "build_step": {self._serialized_build_steps[file_name]}}}'
+            )
+        content = (
+            f'{{"version": {HISTORY_INDEX_VERSION}, "entries": [{", ".join(entries)}]}}'
+        )
+        fd, tmp_name = tempfile.mkstemp(
+            dir=self.index_path.parent, prefix=f".{self.index_path.name}."
+        )
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(content)
+            os.replace(tmp_name, self.index_path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+    def _load_build_steps(self) -> tuple[_Fingerprint, dict[str, BuildStep]]:
+        """
+        Returns the build steps of all history files, keyed by file name.
+        The history files are only parsed if neither the in-memory cache
+        nor the index file match the current state of the history path.
+        """
+        with self._tracer.span("load_history") as span:
+            fingerprint = self._fingerprint()
+            source = "memory"
+            if fingerprint != self._cached_fingerprint:
+                self._serialized_build_steps = {}
+                build_steps = self._read_index(fingerprint)
+                source = "index"
+                if build_steps is None:
+                    source = "history_files"
+                    build_steps = {
+                        file_name: self._deserialize_build_step(
+                            (self.history_path / file_name).read_text()
+                        )
+                        for file_name, _, _ in fingerprint
+                    }
+                    try:
+                        self._write_index(fingerprint, build_steps)
+                    except OSError:
+                        # The index is only an optimization, reading the history
+                        # must still work if the index can't be written.
+                        pass
+                self._cached_fingerprint = fingerprint
+                self._cached_build_steps = build_steps
+            span.set_attributes(source=source, build_steps=len(fingerprint))
+            return fingerprint, self._cached_build_steps
+
     def raise_if_build_step_exists(self, build_step_name: str) -> None:
         """
         Check if a build step exists and raise an exception if so.
@@ -49,16 +196,40 @@ class HistoryFileManager:
         """
         Create a new history file and add it to the history path.
         The history file contains the given build step.
+        The index file gets updated accordingly.
         """
         self.raise_if_build_step_exists(build_step.name)
-        number_of_history_files = len(list(self._history_files))
+        previous_fingerprint, previous_build_steps = self._load_build_steps()
+        number_of_history_files = len(previous_fingerprint)
         if number_of_history_files > 999:
             raise RuntimeError("Maximum number of history files (999) exceeded.")
         build_step_file_name_prefix = f"{number_of_history_files:0{3}d}"
         build_step_file_name = f"{build_step_file_name_prefix}_{build_step.name}"
-        (self.history_path / build_step_file_name).write_text(
-            self._serialize_build_step(build_step)
+        build_step_file = self.history_path / build_step_file_name
+        build_step_file.write_text(self._serialize_build_step(build_step))
+        build_steps = previous_build_steps | {build_step_file_name: build_step}
+        fingerprint = sorted(
+            previous_fingerprint
+            + [self._file_fingerprint(build_step_file_name, build_step_file.stat())]
         )
+        try:
+            self._write_index(fingerprint, build_steps)
+        except OSError:
+            # The build step is already stored in the history file,
+            # a stale index only gets rebuilt by the next read.
+            pass
+        self._cached_fingerprint = fingerprint
+        self._cached_build_steps = build_steps
+
+    def add_conda_lock_file(self, lock_file_name: str, content: str) -> Path:
+        """
+        Store an explicit conda lock file alongside the history files.
+        Returns the path of the stored lock file.
+        """
+        self.conda_lock_path.mkdir(parents=True, exist_ok=True)
+        lock_file = self.conda_lock_path / lock_file_name
+        lock_file.write_text(content)
+        return lock_file
 
     @staticmethod
     def _remove_prefix(file_name: str) -> str:
@@ -70,7 +241,9 @@ class HistoryFileManager:
         Read all build step names from the history path.
         """
 
-        return {self._remove_prefix(p.name) for p in self._history_files}
+        return {
+            self._remove_prefix(file_name) for file_name, _, _ in self._fingerprint()
+        }
 
     def get_all_previous_build_steps(self) -> list[BuildStep]:
         """
@@ -78,27 +251,54 @@ class HistoryFileManager:
         Returns: sorted list of build steps found in history path.
 
         """
-        histore_files = list(self._history_files)
-        histore_files.sort(key=lambda p: p.name)
-        return [self._deserialize_build_step(p.read_text()) for p in histore_files]
+        fingerprint, build_steps = self._load_build_steps()
+        return [build_steps[file_name] for file_name, _, _ in fingerprint]
+
+    def _check_build_step_name(self, file_name: str, build_step_name: str) -> str:
+        if build_step_name != self._remove_prefix(file_name):
+            return f"Build-Step in File '{file_name}' has unexpected name '{build_step_name}'"
+        return ""
+
+    def _indexed_build_steps(self) -> dict[str, BuildStep] | None:
+        """
+        Returns the build steps of the in-memory cache or the index file,
+        if they match the current state of the history path, otherwise None.
+        """
+        fingerprint = self._fingerprint()
+        if fingerprint == self._cached_fingerprint:
+            return self._cached_build_steps
+        build_steps = self._read_index(fingerprint)
+        if build_steps is not None:
+            self._serialized_build_steps = {}
+            self._cached_fingerprint = fingerprint
+            self._cached_build_steps = build_steps
+        return build_steps
 
     def check_consistency(self) -> None:
         """
         Check if current history files are consistent.
+        The history files only get parsed, if the index does not match them.
+        Each indexed entry was parsed from a history file with exactly one build step.
         """
 
         def check_consistency_of_file(pkg_file: Path) -> str:
             session = PackageFileSession(pkg_file)
             if len(session.package_file_config.build_steps) != 1:
                 return f"File '{pkg_file.name}' has unexpected number of build steps '{len(session.package_file_config.build_steps)}'"
-            build_step_name = session.package_file_config.build_steps[0].name
-            if build_step_name != self._remove_prefix(pkg_file.name):
-                return f"Build-Step in File '{pkg_file.name}' has unexpected name '{build_step_name}'"
-            return ""
+            return self._check_build_step_name(
+                pkg_file.name, session.package_file_config.build_steps[0].name
+            )
 
-        found_inconsistencies = [
-            check_consistency_of_file(history) for history in self._history_files
-        ]
+        indexed_build_steps = self._indexed_build_steps()
+        if indexed_build_steps is not None:
+            found_inconsistencies = [
+                self._check_build_step_name(file_name, build_step.name)
+                for file_name, build_step in indexed_build_steps.items()
+            ]
+        else:
+            found_inconsistencies = [
+                check_consistency_of_file(history) for history in self._history_files
+            ]
         filtered_inconsistencies = [
             inconsistency for inconsistency in found_inconsistencies if inconsistency
         ]
@@ -0,0 +1,58 @@
+from dataclasses import dataclass
+from pathlib import Path
+
+from exasol.exaslpm.pkg_mgmt.context.tracer import TraceFormat
+
+
+@dataclass(frozen=True)
+class InstallOptions:
+    """
+    Options of a single exaslpm invocation, which are not part of the package file.
+
+    :param conda_lock_dir: Directory with explicit conda lock files. If set, conda phases
+                           install from a matching lock file without solving, or store a
+                           lock file after solving.
+    :param download_cache_dir: Directory of the content-addressed download cache.
+                               If not set, downloads are not cached.
+    :param download_cache_max_size_mb: Maximum size of the download cache in MiB.
+    :param download_parallel_ranges: Number of HTTP ranges, which large files get split into
+                                     and downloaded in parallel.
+    :param command_report_file: File for the JSON report with timing and resource usage
+                                of all executed commands.
+    :param command_report_stream_file: File, which the record of each command gets appended to
+                                       as JSON line, as soon as the command finished.
+    :param trace_file: File for the trace of the installation.
+    :param trace_format: Format of the trace file.
+    :param madison_cache_file: File, which persists the resolved versions of apt packages
+                               between invocations, as long as the APT package lists do not change.
+    :param resolve_apt_wildcards_from_lists: If True, wildcard versions of apt packages get resolved
+                                             by reading the APT package lists directly,
+                                             instead of running `apt-cache madison`.
+                                             APT pinning is not taken into account.
+    :param apt_parallel_downloads: If greater than 1, the archives of apt packages get downloaded
+                                   with this number of parallel connections before `apt-get install`.
+    :param pip_wheelhouse_dir: Directory, which pip packages get built or downloaded into as wheels
+                               and installed from. Unless it is a mount point, it gets removed
+                               at the end of the build step.
+    :param pip_parallel_builds: If greater than 1, pip phases with ephemeral build tools
+                                build the wheels of source distributions with this number
+                                of concurrent jobs, before installing them.
+    :param ccache_dir: Persistent ccache directory. If set, pip phases with ephemeral build tools
+                       also install ccache and compile C and C++ sources through it.
+                       The directory does not get removed, so it should be a mount point.
+    """
+
+    conda_lock_dir: Path | None = None
+    download_cache_dir: Path | None = None
+    download_cache_max_size_mb: int = 1024
+    download_parallel_ranges: int = 1
+    command_report_file: Path | None = None
+    command_report_stream_file: Path | None = None
+    trace_file: Path | None = None
+    trace_format: TraceFormat = TraceFormat.Chrome
+    madison_cache_file: Path | None = None
+    resolve_apt_wildcards_from_lists: bool = False
+    apt_parallel_downloads: int = 1
+    pip_wheelhouse_dir: Path | None = None
+    pip_parallel_builds: int = 1
+    ccache_dir: Path | None = None
@@ -0,0 +1,138 @@
+import json
+import os
+import tempfile
+from pathlib import Path
+
+from exasol.exaslpm.pkg_mgmt.context.apt_index_tracker import (
+    APT_LISTS_PATH,
+    APT_PREFERENCES_PATHS,
+    APT_SOURCE_PATHS,
+)
+
+_Fingerprint = list[list]
+
+# Sources of the cached lines, which are kept apart,
+# because only `apt-cache madison` takes APT pinning into account
+MADISON_SOURCE = "madison"
+APT_LISTS_SOURCE = "apt_lists"
+
+
+class MadisonCache:
+    """
+    Caches the `apt-cache madison` output lines of each package,
+    so that packages, which were already resolved, do not need to be queried again.
+
+    The cache is only valid for the current state of the APT package lists, sources and pinning,
+    which is determined by the names, sizes and modification times of the files in the lists directory
+    and of the APT source lists, keys, configuration and preferences.
+    If the lists directory does not exist, nothing gets cached.
+    The lines are cached separately for each source, so that lines read from the package lists,
+    which ignore APT pinning, are not returned as `apt-cache madison` output.
+
+    :param cache_file: Optional JSON file, which persists the cache between invocations.
+    :param root: Root directory of the file system, which is only changed in tests.
+    """
+
+    def __init__(self, cache_file: Path | None = None, root: Path = Path("/")):
+        self.cache_file = cache_file
+        self.root = root
+        self._fingerprint: _Fingerprint | None = None
+        self._lines_by_source: dict[str, dict[str, list[str]]] = {}
+        self._loaded = False
+
+    @property
+    def lists_dir(self) -> Path:
+        return self.root / APT_LISTS_PATH
+
+    def _config_fingerprint(self) -> _Fingerprint:
+        fingerprint = []
+        for config_path in APT_SOURCE_PATHS + APT_PREFERENCES_PATHS:
+            path = self.root / config_path
+            try:
+                if path.is_dir():
+                    with os.scandir(path) as it:
+                        entries = sorted(it, key=lambda entry: entry.name)
+                    stats = [
+                        (f"{config_path}/{entry.name}", entry.stat())
+                        for entry in entries
+                    ]
+                else:
+                    stats = [(config_path, path.stat())]
+            except OSError:
+                continue
+            fingerprint += [[name, st.st_size, st.st_mtime_ns] for name, st in stats]
+        return fingerprint
+
+    def _current_fingerprint(self) -> _Fingerprint | None:
+        try:
+            with os.scandir(self.lists_dir) as it:
+                entries = sorted(
+                    (entry for entry in it if entry.is_file()),
+                    key=lambda entry: entry.name,
+                )
+                stats = [(entry.name, entry.stat()) for entry in entries]
+        except OSError:
+            return None
+        lists_fingerprint = [[name, st.st_size, st.st_mtime_ns] for name, st in stats]
+        # apt-cache madison also depends on the sources and the APT pinning
+        return lists_fingerprint + self._config_fingerprint()
+
+    def _load(self) -> None:
+        self._loaded = True
+        if self.cache_file is None or not self.cache_file.exists():
+            return
+        try:
+            content = json.loads(self.cache_file.read_text())
+            self._fingerprint = content["fingerprint"]
+            self._lines_by_source = content["sources"]
+        except (OSError, ValueError, KeyError):
+            # A corrupt cache file only costs another madison call
+            self._fingerprint = None
+            self._lines_by_source = {}
+
+    def _save(self) -> None:
+        if self.cache_file is None:
+            return
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        content = {
+            "fingerprint": self._fingerprint,
+            "sources": self._lines_by_source,
+        }
+        with tempfile.NamedTemporaryFile(
+            "w", dir=self.cache_file.parent, delete=False
+        ) as f:
+            json.dump(content, f)
+        os.replace(f.name, self.cache_file)
+
+    def get(
+        self, packages: list[str], source: str = MADISON_SOURCE
+    ) -> dict[str, list[str]]:
+        """
+        Returns the cached madison output lines of the given packages from the given source.
+        Packages, which are not cached, are missing in the result.
+        """
+        if not self._loaded:
+            self._load()
+        fingerprint = self._current_fingerprint()
+        if fingerprint is None or fingerprint != self._fingerprint:
+            return {}
+        lines_by_package = self._lines_by_source.get(source, {})
+        return {
+            package: lines_by_package[package]
+            for package in packages
+            if package in lines_by_package
+        }
+
+    def put(
+        self, lines_by_package: dict[str, list[str]], source: str = MADISON_SOURCE
+    ) -> None:
+        if not self._loaded:
+            self._load()
+        fingerprint = self._current_fingerprint()
+        if fingerprint is None:
+            return
+        if fingerprint != self._fingerprint:
+            self._fingerprint = fingerprint
+            self._lines_by_source = {}
+        self._lines_by_source.setdefault(source, {}).update(lines_by_package)
+        self._save()
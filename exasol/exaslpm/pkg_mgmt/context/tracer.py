@@ -0,0 +1,185 @@
+import contextlib
+import json
+import os
+import secrets
+import threading
+import time
+from collections.abc import Iterator
+from dataclasses import (
+    dataclass,
+    field,
+)
+from enum import Enum
+from pathlib import Path
+
+AttributeValue = str | int | float | bool
+
+
+class TraceFormat(Enum):
+    """
+    File formats for exporting traces:
+     - Chrome: Chrome trace-event format, which can be opened in chrome://tracing or Perfetto
+     - Otlp: OpenTelemetry protocol in JSON encoding
+    """
+
+    Chrome = "Chrome"
+    Otlp = "Otlp"
+
+
+@dataclass
+class Span:
+    name: str
+    span_id: str
+    parent_id: str | None
+    thread_id: int
+    start_ns: int
+    end_ns: int | None = None
+    attributes: dict[str, AttributeValue] = field(default_factory=dict)
+
+    def set_attributes(self, **attributes: AttributeValue) -> None:
+        self.attributes.update(attributes)
+
+
+class Tracer:
+    """
+    Records nested spans and exports them to a trace file.
+
+    Spans opened with `span()` are nested in the enclosing span of the same thread.
+    Spans, which do not end in the scope they started, for example of a running subprocess,
+    get created with `start_span()` and finished with `end_span()`.
+    If no trace file is given, the tracer is disabled and records nothing.
+
+    :param trace_file: File, which `export()` writes the trace to.
+    :param trace_format: Format of the trace file.
+    """
+
+    def __init__(
+        self,
+        trace_file: Path | None = None,
+        trace_format: TraceFormat = TraceFormat.Chrome,
+    ):
+        self.trace_file = trace_file
+        self.trace_format = trace_format
+        self.trace_id = secrets.token_hex(16)
+        self.spans: list[Span] = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @property
+    def enabled(self) -> bool:
+        return self.trace_file is not None
+
+    def _stack(self) -> list[Span]:
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    def start_span(self, name: str, **attributes: AttributeValue) -> Span:
+        stack = self._stack()
+        return Span(
+            name=name,
+            span_id=secrets.token_hex(8),
+            parent_id=stack[-1].span_id if stack else None,
+            thread_id=threading.get_native_id(),
+            start_ns=time.time_ns(),
+            attributes=dict(attributes),
+        )
+
+    def end_span(self, span: Span) -> None:
+        span.end_ns = time.time_ns()
+        if self.enabled:
+            with self._lock:
+                self.spans.append(span)
+
+    @contextlib.contextmanager
+    def span(self, name: str, **attributes: AttributeValue) -> Iterator[Span]:
+        span = self.start_span(name, **attributes)
+        stack = self._stack()
+        stack.append(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.set_attributes(error=type(e).__name__)
+            raise
+        finally:
+            stack.pop()
+            self.end_span(span)
+
+    def _chrome_trace(self) -> dict:
+        pid = os.getpid()
+        return {
+            "traceEvents": [
+                {
+                    "name": span.name,
+                    "cat": "exaslpm",
+                    "ph": "X",
+                    "ts": span.start_ns / 1000,
+                    "dur": (span.end_ns or span.start_ns) / 1000 - span.start_ns / 1000,
+                    "pid": pid,
+                    "tid": span.thread_id,
+                    "args": span.attributes,
+                }
+                for span in self.spans
+            ],
+            "displayTimeUnit": "ms",
+        }
+
+    @staticmethod
+    def _otlp_value(value: AttributeValue) -> dict:
+        if isinstance(value, bool):
+            return {"boolValue": value}
+        if isinstance(value, int):
+            return {"intValue": str(value)}
+        if isinstance(value, float):
+            return {"doubleValue": value}
+        return {"stringValue": value}
+
+    def _otlp_trace(self) -> dict:
+        def otlp_span(span: Span) -> dict:
+            result = {
+                "traceId": self.trace_id,
+                "spanId": span.span_id,
+                "name": span.name,
+                "kind": 1,
+                "startTimeUnixNano": str(span.start_ns),
+                "endTimeUnixNano": str(span.end_ns or span.start_ns),
+                "attributes": [
+                    {"key": key, "value": self._otlp_value(value)}
+                    for key, value in span.attributes.items()
+                ],
+            }
+            if span.parent_id:
+                result["parentSpanId"] = span.parent_id
+            return result
+
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": [
+                            {
+                                "key": "service.name",
+                                "value": {"stringValue": "exaslpm"},
+                            }
+                        ]
+                    },
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": "exaslpm"},
+                            "spans": [otlp_span(span) for span in self.spans],
+                        }
+                    ],
+                }
+            ]
+        }
+
+    def export(self) -> None:
+        if self.trace_file is None:
+            return
+        with self._lock:
+            trace = (
+                self._chrome_trace()
+                if self.trace_format == TraceFormat.Chrome
+                else self._otlp_trace()
+            )
+        self.trace_file.write_text(json.dumps(trace))
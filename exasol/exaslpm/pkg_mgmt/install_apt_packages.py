@@ -1,3 +1,7 @@
+import re
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
 from exasol.exaslpm.model.package_file_config import (
     AptPackage,
     AptPackages,
@@ -5,12 +9,24 @@ from exasol.exaslpm.model.package_file_config import (
 from exasol.exaslpm.pkg_mgmt.context.context import Context
 from exasol.exaslpm.pkg_mgmt.install_common import (
     CommandExecInfo,
+    register_ldconfig,
     run_cmd,
+    run_cmd_with_output,
 )
 from exasol.exaslpm.pkg_mgmt.search.apt_madison_parser import (
     MadisonData,
     MadisonExecutor,
     MadisonParser,
+    version_matcher,
+)
+from exasol.exaslpm.pkg_mgmt.search.debian_version import DebianVersion
+
+APT_INSTALL_CMD = ["apt-get", "install", "-V", "-y", "--no-install-recommends"]
+APT_ARCHIVES_PATH = Path("/var/cache/apt/archives")
+
+# Line of `apt-get install --print-uris`: 'uri' file_name size hash
+_PRINT_URIS_REGEX = re.compile(
+    r"^'(?P<uri>[^']+)' (?P<file_name>\S+) \d+ (?P<hash>\S*)"
 )
 
 
@@ -23,16 +39,18 @@ def get_package_version(
         return pkg.version
     elif pkg.name in madison_dict:
         madison_variants = madison_dict[pkg.name]
+        is_match = version_matcher(pkg.version)
         filtered_versions = [
             variant.version
             for variant in madison_variants
-            if pkg.version and MadisonData.is_match(variant.version, pkg.version)
+            if variant.version and is_match(variant.version)
         ]
         if not filtered_versions:
             raise ValueError(
                 f"No matching version found for {pkg.name} with version {pkg.version} in {madison_variants}"
             )
-        pkg_ver = filtered_versions[0]
+        # The highest matching version, independent of the order of the madison output
+        pkg_ver = max(filtered_versions, key=DebianVersion)
         ctx.cmd_logger.info(
             f"Resolved version={pkg_ver} for {pkg.name} with wildcard: {pkg.version}"
         )
@@ -49,6 +67,18 @@ def update_cmd_and_err() -> CommandExecInfo:
     )
 
 
+def run_apt_update(ctx: Context) -> None:
+    """
+    Runs `apt-get update`, unless the package lists are still up to date
+    since the last update of this build step.
+    """
+    if ctx.apt_index_tracker.is_up_to_date():
+        ctx.cmd_logger.info("Skipping apt-get update, package lists are up to date")
+        return
+    run_cmd(update_cmd_and_err(), ctx)
+    ctx.apt_index_tracker.mark_updated()
+
+
 def clean_cmd_and_err() -> CommandExecInfo:
     return CommandExecInfo(
         cmd=["apt-get", "-y", "clean"], err="Failed while running apt clean"
@@ -75,17 +105,23 @@ def update_locale_cmd_and_err() -> CommandExecInfo:
     )
 
 
-def load_config_and_err() -> CommandExecInfo:
-    return CommandExecInfo(
-        cmd=["ldconfig"],
-        err="Failed while running ldconfig",
+def register_locale_and_ldconfig(ctx: Context) -> None:
+    """
+    Registers locale generation and the update of the shared library cache
+    with the build step finalizer, so that they run only once per build step.
+    """
+    finalizer = ctx.build_step_finalizer
+    finalizer.register("locale-gen", lambda: run_cmd(locale_gen_cmd_and_err(), ctx))
+    finalizer.register(
+        "update-locale", lambda: run_cmd(update_locale_cmd_and_err(), ctx)
     )
+    register_ldconfig(ctx)
 
 
 def install_cmd_and_err(all_pkgs: list[AptPackage], ctx: Context) -> CommandExecInfo:
     if all_pkgs is None:
         raise ValueError("no apt packages defined")
-    install_cmd = ["apt-get", "install", "-V", "-y", "--no-install-recommends"]
+    install_cmd = list(APT_INSTALL_CMD)
 
     wildcard_pkgs = [
         pkg for pkg in all_pkgs if pkg and pkg.version and "*" in pkg.version
@@ -102,22 +138,112 @@ def install_cmd_and_err(all_pkgs: list[AptPackage], ctx: Context) -> CommandExec
     )
 
 
+def is_installed(pkg: AptPackage, ctx: Context) -> bool:
+    """
+    Checks if the package is already installed in the requested version.
+    A wildcard version is satisfied by any installed version matching the wildcard.
+    """
+    installed_version = ctx.dpkg_status_index.installed_version(pkg.name)
+    if installed_version is None:
+        return False
+    if not pkg.version:
+        return True
+    return version_matcher(pkg.version)(installed_version)
+
+
+def mark_manual_cmd_and_err(names: list[str]) -> CommandExecInfo:
+    return CommandExecInfo(
+        cmd=["apt-mark", "manual"] + names,
+        err="Failed while marking apt packages as manually installed",
+    )
+
+
+def print_uris_cmd_and_err(package_specs: list[str]) -> CommandExecInfo:
+    return CommandExecInfo(
+        cmd=[
+            "apt-get",
+            "install",
+            "--print-uris",
+            "-qq",
+            "-y",
+            "--no-install-recommends",
+        ]
+        + package_specs,
+        err="Failed while listing apt archives",
+    )
+
+
+def _download_apt_archive(uri: str, file_name: str, sha256: str | None, ctx: Context):
+    # The archives end up in the APT archive cache,
+    # so a second copy in the download cache is not needed
+    with ctx.file_downloader.download_file_to_tmp(
+        url=uri, cache=False, sha256=sha256
+    ) as tmp:
+        ctx.file_access.copy_file(tmp, APT_ARCHIVES_PATH / file_name)
+
+
+def download_apt_archives(package_specs: list[str], ctx: Context) -> None:
+    """
+    Downloads the archives of the given packages and their dependencies
+    with parallel connections into the APT archive cache, before `apt-get install` runs.
+    `apt-get install` then only downloads the archives, which failed here.
+    """
+    lines = run_cmd_with_output(print_uris_cmd_and_err(package_specs), ctx)
+    archives = []
+    for line in lines:
+        if match := _PRINT_URIS_REGEX.match(line.strip()):
+            hash_type, _, digest = match["hash"].partition(":")
+            sha256 = digest if hash_type == "SHA256" else None
+            archives.append((match["uri"], match["file_name"], sha256))
+    if not archives:
+        return
+    max_parallel = ctx.install_options.apt_parallel_downloads
+    ctx.cmd_logger.info(
+        f"Downloading {len(archives)} apt archives with {max_parallel} parallel downloads"
+    )
+    with ThreadPoolExecutor(max_workers=max_parallel) as executor:
+        futures = [
+            executor.submit(_download_apt_archive, uri, file_name, sha256, ctx)
+            for uri, file_name, sha256 in archives
+        ]
+        for (uri, _, _), future in zip(archives, futures):
+            try:
+                future.result()
+            except Exception as e:
+                ctx.cmd_logger.warn(f"Failed to download {uri}, apt will retry: {e}")
+
+
 def install_apt_packages(apt_packages: AptPackages, ctx: Context) -> int:
     if len(apt_packages.packages) == 0:
         ctx.cmd_logger.warn("Got an empty list of AptPackages")
         return 1
 
-    run_cmd(update_cmd_and_err(), ctx)
-
-    run_cmd(install_cmd_and_err(apt_packages.packages, ctx), ctx)
+    missing_pkgs: list[AptPackage] = []
+    installed_names: list[str] = []
+    for pkg in apt_packages.packages:
+        if is_installed(pkg, ctx):
+            installed_names.append(pkg.name)
+        else:
+            missing_pkgs.append(pkg)
+    if installed_names:
+        ctx.cmd_logger.info(f"Skipping installed packages: {installed_names}")
+        # apt-get install would mark them as manually installed,
+        # which protects packages installed as dependency from autoremove
+        run_cmd(mark_manual_cmd_and_err(installed_names), ctx)
+    if not missing_pkgs:
+        ctx.cmd_logger.info("Skipping apt-get install, all packages are installed")
+        return 0
+
+    run_apt_update(ctx)
+
+    install_cmd = install_cmd_and_err(missing_pkgs, ctx)
+    if ctx.install_options.apt_parallel_downloads > 1:
+        download_apt_archives(install_cmd.cmd[len(APT_INSTALL_CMD) :], ctx)
+    run_cmd(install_cmd, ctx)
 
     run_cmd(clean_cmd_and_err(), ctx)
 
     run_cmd(autoremove_cmd_and_err(), ctx)
 
-    run_cmd(locale_gen_cmd_and_err(), ctx)
-
-    run_cmd(update_locale_cmd_and_err(), ctx)
-
-    run_cmd(load_config_and_err(), ctx)
+    register_locale_and_ldconfig(ctx)
     return 0
@@ -5,6 +5,8 @@ from exasol.exaslpm.model.package_file_config import (
     AptRepo,
 )
 from exasol.exaslpm.pkg_mgmt.context.context import Context
+from exasol.exaslpm.pkg_mgmt.context.file_downloader import Download
+from exasol.exaslpm.pkg_mgmt.install_apt_packages import run_apt_update
 from exasol.exaslpm.pkg_mgmt.install_common import (
     CommandExecInfo,
     run_cmd,
@@ -12,10 +14,8 @@ from exasol.exaslpm.pkg_mgmt.install_common import (
 
 
 def _run_apt_update(context: Context):
+    run_apt_update(context)
     apt_cmds = [
-        CommandExecInfo(
-            cmd=["apt-get", "-y", "update"], err="Failed while running apt-get update"
-        ),
         CommandExecInfo(
             cmd=["apt-get", "-y", "clean"], err="Failed while running apt-get clean"
         ),
@@ -28,8 +28,20 @@ def _run_apt_update(context: Context):
         run_cmd(cmd, context)
 
 
+def apt_key_download(repo: AptRepo) -> Download:
+    # Key URLs are not versioned, only a pinned key can be served from the cache
+    return Download(
+        url=str(repo.key_url),
+        cache=repo.key_sha256 is not None,
+        sha256=repo.key_sha256,
+    )
+
+
 def _install_key(context: Context, repo_name: str, repo: AptRepo):
-    with context.file_downloader.download_file_to_tmp(url=str(repo.key_url)) as tmp:
+    download = apt_key_download(repo)
+    with context.file_downloader.download_file_to_tmp(
+        url=download.url, cache=download.cache, sha256=download.sha256
+    ) as tmp:
         key_file = f"/usr/share/keyrings/{repo_name}.gpg"
         context.cmd_logger.info(f"Installing key of '{repo_name}' to {key_file}")
         gpg_cmd = CommandExecInfo(
@@ -56,4 +68,7 @@ def install_apt_repos(apt_packages: AptPackages, context: Context):
             context.cmd_logger.info(f"Installing APT repository '{repo_name}'")
             _install_key(context, repo_name, repo)
             _install_repository(context, repo_name, repo)
+        # The new list files may not be visible to the tracker,
+        # for example if they are copied into a container
+        context.apt_index_tracker.invalidate()
         _run_apt_update(context)
@@ -24,3 +24,60 @@ def run_cmd(cmd: CommandExecInfo, ctx: Context):
     cmd_res.print_results()
     if not check_error(cmd_res.return_code(), cmd.err, ctx.cmd_logger.err):
         raise CommandFailedException(cmd.err)
+
+
+def ldconfig_cmd_and_err() -> CommandExecInfo:
+    return CommandExecInfo(cmd=["ldconfig"], err="Failed while running ldconfig")
+
+
+def register_ldconfig(ctx: Context) -> None:
+    """
+    Registers the update of the shared library cache with the build step finalizer,
+    so that it runs only once per build step, after all phases installed their libraries.
+    """
+    ctx.build_step_finalizer.register(
+        "ldconfig", lambda: run_cmd(ldconfig_cmd_and_err(), ctx)
+    )
+
+
+def run_cmds_concurrently(
+    cmds: list[CommandExecInfo], ctx: Context, max_parallel: int | None = None
+):
+    """
+    Runs independent commands concurrently, at most `max_parallel` at the same time.
+    Raises a CommandFailedException for the first failed command, after all commands finished.
+    """
+    return_codes = ctx.cmd_executor.run_many(
+        [(cmd.cmd, cmd.env) for cmd in cmds], max_parallel=max_parallel
+    )
+    failed_cmds = [
+        cmd
+        for cmd, return_code in zip(cmds, return_codes)
+        if not check_error(return_code, cmd.err, ctx.cmd_logger.err)
+    ]
+    if failed_cmds:
+        raise CommandFailedException(failed_cmds[0].err)
+
+
+def run_cmd_with_output(cmd: CommandExecInfo, ctx: Context) -> list[str]:
+    """
+    Runs the given command and returns the lines printed to stdout.
+    Lines printed to stderr get logged as warnings.
+    """
+    cmd_res = ctx.cmd_executor.execute(cmd.cmd, env=cmd.env)
+    stdout_lines: list[str] = []
+
+    def consume_stdout(line: str | bytes, **kwargs) -> None:
+        if isinstance(line, bytes):
+            line = line.decode()
+        stdout_lines.append(line)
+
+    def consume_stderr(line: str | bytes, **kwargs) -> None:
+        if isinstance(line, bytes):
+            line = line.decode()
+        ctx.cmd_logger.warn(line)
+
+    ret_code = cmd_res.consume_results(consume_stdout, consume_stderr)
+    if not check_error(ret_code, cmd.err, ctx.cmd_logger.err):
+        raise CommandFailedException(cmd.err)
+    return stdout_lines
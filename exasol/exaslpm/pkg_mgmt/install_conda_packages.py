@@ -1,15 +1,25 @@
+import hashlib
 import pathlib
-from io import TextIOBase
+import platform
+import re
+from io import (
+    StringIO,
+    TextIOBase,
+)
 
 from exasol.exaslpm.model.package_file_config import (
     CondaBinary,
     CondaPackage,
+    CondaPackages,
+    InstallStrategy,
     Phase,
 )
 from exasol.exaslpm.pkg_mgmt.context.context import Context
 from exasol.exaslpm.pkg_mgmt.install_common import (
     CommandExecInfo,
+    register_ldconfig,
     run_cmd,
+    run_cmd_with_output,
 )
 from exasol.exaslpm.pkg_mgmt.micromamba_env import conda_cmd_from_history
 from exasol.exaslpm.pkg_mgmt.search.package_collectors import (
@@ -23,12 +33,20 @@ def _prepare_all_cmds(
     conda_package_file: pathlib.Path,
     all_channels: list[str],
     conda_binary: CondaBinary,
+    install_strategy: InstallStrategy,
     search_cache: SearchCache,
 ) -> list[CommandExecInfo]:
 
     # create a list of kind ["-c", "conda-forge", "-c", "nvidia",...] from list ["conda-forge", "nvidia"]
     channel_args = [x for ch in all_channels for x in ("-c", ch)]
 
+    # With the delta strategy, the spec file contains only the packages of the current phase.
+    # "--freeze-installed" pins all already installed packages, so the solver
+    # only needs to find a solution for the new packages.
+    strategy_args = (
+        ["--freeze-installed"] if install_strategy == InstallStrategy.Delta else []
+    )
+
     install_cmd = conda_cmd_from_history(
         search_cache=search_cache,
         conda_binary=conda_binary,
@@ -38,9 +56,33 @@ def _prepare_all_cmds(
             "--file",
             str(conda_package_file),
         ]
+        + strategy_args
         + channel_args,
         err="Failed while installing conda packages",
     )
+    return [install_cmd] + _prepare_post_install_cmds(conda_binary, search_cache)
+
+
+def _prepare_lock_file_cmds(
+    lock_file: pathlib.Path,
+    conda_binary: CondaBinary,
+    search_cache: SearchCache,
+) -> list[CommandExecInfo]:
+    # An explicit lock file contains the URLs of all packages,
+    # so no channels and no solving are required.
+    install_cmd = conda_cmd_from_history(
+        search_cache=search_cache,
+        conda_binary=conda_binary,
+        params=["install", "--yes", "--file", str(lock_file)],
+        err="Failed while installing conda packages from lock file",
+    )
+    return [install_cmd] + _prepare_post_install_cmds(conda_binary, search_cache)
+
+
+def _prepare_post_install_cmds(
+    conda_binary: CondaBinary,
+    search_cache: SearchCache,
+) -> list[CommandExecInfo]:
     clean_cmd = conda_cmd_from_history(
         search_cache=search_cache,
         conda_binary=conda_binary,
@@ -48,11 +90,7 @@ def _prepare_all_cmds(
         err="Failed while clearing cache - conda cmd",
     )
 
-    ldconfig_cmd = CommandExecInfo(
-        cmd=["ldconfig"], err="Failed while running ldconfig"
-    )
-
-    return [install_cmd, clean_cmd, ldconfig_cmd]
+    return [clean_cmd]
 
 
 def _write_conda_spec(
@@ -67,18 +105,106 @@ def _write_conda_spec(
         )
 
 
+def _lock_file_name(
+    phase: Phase,
+    all_packages: list[CondaPackage],
+    all_channels: list[str],
+    install_strategy: InstallStrategy,
+) -> str:
+    """
+    Returns the name of the lock file for the given phase. The name contains a digest of
+    all conda packages and channels of the current and all previous phases and of the machine
+    architecture, so a lock file is only reused on the same architecture if none of them has changed.
+    Explicit lock files contain the URLs of platform-specific packages.
+    """
+    spec = StringIO()
+    _write_conda_spec(spec, all_packages)
+    print(*all_channels, sep="\n", file=spec)
+    print(install_strategy.value, file=spec)
+    print(platform.machine(), file=spec)
+    digest = hashlib.sha256(spec.getvalue().encode("utf-8")).hexdigest()
+    phase_name = re.sub(r"[^A-Za-z0-9_.-]+", "_", phase.name)
+    return f"{phase_name}-{digest[:16]}.lock"
+
+
+def _store_lock_file(
+    lock_file_name: str,
+    lock_dir: pathlib.Path,
+    conda_binary: CondaBinary,
+    search_cache: SearchCache,
+    ctx: Context,
+) -> None:
+    """
+    Exports the solved environment as explicit lock file (package URLs with md5 hashes),
+    stores it alongside the history files and copies it into the lock directory.
+    """
+    export_cmd = conda_cmd_from_history(
+        search_cache=search_cache,
+        conda_binary=conda_binary,
+        params=["list", "--explicit", "--md5"],
+        err="Failed while exporting conda lock file",
+    )
+    lines = run_cmd_with_output(export_cmd, ctx)
+    content = "".join(line if line.endswith("\n") else f"{line}\n" for line in lines)
+    stored_lock_file = ctx.history_file_manager.add_conda_lock_file(
+        lock_file_name, content
+    )
+    ctx.cmd_logger.info(f"Stored conda lock file {stored_lock_file}")
+    try:
+        ctx.file_access.copy_file(stored_lock_file, lock_dir / lock_file_name)
+    except OSError as e:
+        ctx.cmd_logger.warn(
+            f"Failed to copy conda lock file to {lock_dir}: {e}",
+        )
+
+
+def _install_from_lock_file(
+    lock_file: pathlib.Path,
+    phase_conda: CondaPackages,
+    search_cache: SearchCache,
+    ctx: Context,
+) -> None:
+    ctx.cmd_logger.info(f"Installing conda packages from lock file {lock_file}")
+    for cmd in _prepare_lock_file_cmds(lock_file, phase_conda.binary, search_cache):
+        run_cmd(cmd, ctx)
+    register_ldconfig(ctx)
+
+
 def install_conda_packages(search_cache: SearchCache, phase: Phase, ctx: Context):
     if phase.conda and len(phase.conda.packages) > 0:
         all_packages = collect_conda_packages(search_cache.all_phases + [phase])
         all_channels = collect_conda_channels(search_cache.all_phases + [phase])
+        lock_dir = ctx.install_options.conda_lock_dir
+        lock_file_name = _lock_file_name(
+            phase, all_packages, all_channels, phase.conda.install_strategy
+        )
+        if lock_dir is not None and (lock_dir / lock_file_name).exists():
+            _install_from_lock_file(
+                lock_dir / lock_file_name, phase.conda, search_cache, ctx
+            )
+            return
+
+        if phase.conda.install_strategy == InstallStrategy.Delta:
+            packages = phase.conda.packages
+        else:
+            packages = all_packages
         with ctx.temp_file_provider.create() as temp_file:
             with temp_file.open() as f:
-                _write_conda_spec(f, all_packages)
+                _write_conda_spec(f, packages)
             cmds = _prepare_all_cmds(
-                temp_file.path, all_channels, phase.conda.binary, search_cache
+                temp_file.path,
+                all_channels,
+                phase.conda.binary,
+                phase.conda.install_strategy,
+                search_cache,
             )
 
             for cmd in cmds:
                 run_cmd(cmd, ctx)
+        register_ldconfig(ctx)
+        if lock_dir is not None:
+            _store_lock_file(
+                lock_file_name, lock_dir, phase.conda.binary, search_cache, ctx
+            )
     else:
         ctx.cmd_logger.warn("Got an empty list of CondaPackages")
@@ -1,9 +1,11 @@
 import platform
 
 from exasol.exaslpm.model.package_file_config import (
+    Micromamba,
     Phase,
 )
 from exasol.exaslpm.pkg_mgmt.context.context import Context
+from exasol.exaslpm.pkg_mgmt.context.file_downloader import Download
 from exasol.exaslpm.pkg_mgmt.install_common import (
     CommandExecInfo,
     run_cmd,
@@ -11,19 +13,25 @@ from exasol.exaslpm.pkg_mgmt.install_common import (
 from exasol.exaslpm.pkg_mgmt.micromamba_env import micromamba_cmd_from_micromamba
 
 
-def install_micromamba(phase: Phase, ctx: Context):
-    if phase.tools and phase.tools.micromamba:
-        micromamba = phase.tools.micromamba
+def micromamba_download(micromamba: Micromamba) -> Download:
+    micromamba_machine_mapping = {"x86_64": "64", "aarch64": "aarch64"}
+
+    micromamba_machine = micromamba_machine_mapping[platform.machine()]
 
-        micromamba_machine_mapping = {"x86_64": "64", "aarch64": "aarch64"}
+    download_url = f"https://github.com/mamba-org/micromamba-releases/releases/download/{micromamba.version}/micromamba-linux-{micromamba_machine}.tar.bz2"
+    return Download(url=download_url, timeout_in_seconds=120, sha256=micromamba.sha256)
 
-        micromamba_machine = micromamba_machine_mapping[platform.machine()]
 
-        download_url = f"https://github.com/mamba-org/micromamba-releases/releases/download/{micromamba.version}/micromamba-linux-{micromamba_machine}.tar.bz2"
+def install_micromamba(phase: Phase, ctx: Context):
+    if phase.tools and phase.tools.micromamba:
+        micromamba = phase.tools.micromamba
+        download = micromamba_download(micromamba)
 
-        ctx.cmd_logger.info(f"Downloading {download_url}")
+        ctx.cmd_logger.info(f"Downloading {download.url}")
         with ctx.file_downloader.download_file_to_tmp(
-            url=download_url, timeout_in_seconds=120
+            url=download.url,
+            timeout_in_seconds=download.timeout_in_seconds,
+            sha256=download.sha256,
         ) as get_micromamba_tar:
             extract_cmd = CommandExecInfo(
                 # Extract only "bin/micromamba" to target directory /
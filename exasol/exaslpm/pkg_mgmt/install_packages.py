@@ -1,47 +1,177 @@
+import contextlib
 import pathlib
+from collections.abc import Iterator
 
 from exasol.exaslpm.model.package_file_config import (
     BuildStep,
     Phase,
 )
 from exasol.exaslpm.pkg_mgmt.context.context import Context
+from exasol.exaslpm.pkg_mgmt.context.file_downloader import Download
 from exasol.exaslpm.pkg_mgmt.install_apt_packages import install_apt_packages
-from exasol.exaslpm.pkg_mgmt.install_apt_repos import install_apt_repos
-from exasol.exaslpm.pkg_mgmt.install_bazel import install_bazel
+from exasol.exaslpm.pkg_mgmt.install_apt_repos import (
+    apt_key_download,
+    install_apt_repos,
+)
+from exasol.exaslpm.pkg_mgmt.install_bazel import (
+    bazel_download,
+    install_bazel,
+)
 from exasol.exaslpm.pkg_mgmt.install_conda_packages import install_conda_packages
-from exasol.exaslpm.pkg_mgmt.install_micromamba import install_micromamba
-from exasol.exaslpm.pkg_mgmt.install_pip import install_pip
+from exasol.exaslpm.pkg_mgmt.install_micromamba import (
+    install_micromamba,
+    micromamba_download,
+)
+from exasol.exaslpm.pkg_mgmt.install_pip import (
+    GET_PIP_DOWNLOAD,
+    install_pip,
+)
 from exasol.exaslpm.pkg_mgmt.install_pip_packages import install_pip_packages
 from exasol.exaslpm.pkg_mgmt.install_r_packages import install_r_packages
 from exasol.exaslpm.pkg_mgmt.package_file_session import PackageFileSession
-from exasol.exaslpm.pkg_mgmt.search.search_cache import SearchCache
+from exasol.exaslpm.pkg_mgmt.search.search_cache import (
+    BuildStepSearch,
+    SearchCache,
+)
+
+
+def _collect_downloads(build_step: BuildStep) -> list[Download]:
+    """
+    Returns all files, which the installers will download while processing the build step.
+    """
+    downloads: list[Download] = []
+    for phase in build_step.phases:
+        if phase.apt and phase.apt.repos:
+            downloads.extend(
+                apt_key_download(repo) for repo in phase.apt.repos.values()
+            )
+        if phase.tools:
+            if phase.tools.pip:
+                downloads.append(GET_PIP_DOWNLOAD)
+            if phase.tools.micromamba:
+                downloads.append(micromamba_download(phase.tools.micromamba))
+            if phase.tools.bazel:
+                downloads.append(bazel_download(phase.tools.bazel))
+    return downloads
+
+
+@contextlib.contextmanager
+def _installer(context: Context, installer: str, **attributes: int) -> Iterator[None]:
+    """
+    Tags the commands of the installer for the command report
+    and traces the installer as span.
+    """
+    with context.command_recorder.tagged(installer=installer):
+        with context.tracer.span(f"install_{installer}", **attributes):
+            yield
 
 
 def _process_tools(context: Context, search_cache: SearchCache, phase: Phase):
     if phase.tools:
         tools = phase.tools
         if tools.pip:
-            install_pip(search_cache, phase, context)
+            with _installer(context, "pip"):
+                install_pip(search_cache, phase, context)
         if tools.micromamba:
-            install_micromamba(phase, context)
+            with _installer(context, "micromamba"):
+                install_micromamba(phase, context)
         if tools.bazel:
-            install_bazel(phase, context)
+            with _installer(context, "bazel"):
+                install_bazel(phase, context)
 
 
-def _process_phase(context: Context, build_step: BuildStep, phase: Phase) -> None:
-    search_cache = SearchCache(build_step, phase, context)
+def _process_phase(context: Context, search_cache: SearchCache, phase: Phase) -> None:
     if phase.apt and phase.apt.repos:
-        install_apt_repos(phase.apt, context)
+        with _installer(context, "apt_repos", repos=len(phase.apt.repos)):
+            install_apt_repos(phase.apt, context)
     if phase.apt and phase.apt.packages:
-        install_apt_packages(phase.apt, context)
+        with _installer(context, "apt_packages", packages=len(phase.apt.packages)):
+            install_apt_packages(phase.apt, context)
     if phase.tools is not None:
         _process_tools(context, search_cache, phase)
     if phase.pip is not None:
-        install_pip_packages(search_cache, phase, context)
+        with _installer(context, "pip_packages", packages=len(phase.pip.packages)):
+            install_pip_packages(search_cache, phase, context)
     if phase.conda is not None:
-        install_conda_packages(search_cache, phase, context)
+        with _installer(context, "conda_packages", packages=len(phase.conda.packages)):
+            install_conda_packages(search_cache, phase, context)
     if phase.r is not None:
-        install_r_packages(search_cache, phase, context)
+        with _installer(context, "r_packages", packages=len(phase.r.packages)):
+            install_r_packages(search_cache, phase, context)
+
+
+def _needs_build_tools(phase: Phase) -> bool:
+    return bool(phase.pip and phase.pip.install_build_tools_ephemerally)
+
+
+def _install_phase(
+    context: Context,
+    build_step_search: BuildStepSearch,
+    build_step: BuildStep,
+    phase: Phase,
+    package_file: pathlib.Path,
+) -> None:
+    logger = context.cmd_logger
+    if not _needs_build_tools(phase):
+        context.build_tools.remove_unused()
+    logger.info(f"Processing phase:'{phase.name}'")
+    try:
+        with (
+            context.command_recorder.tagged(phase=phase.name),
+            context.tracer.span("process_phase", phase=phase.name),
+        ):
+            _process_phase(context, build_step_search.search_cache(phase), phase)
+    except Exception as e:
+        logger.err(
+            f"Failed to process phase '{phase.name} of build-step '{build_step.name}''.",
+            package_file=package_file,
+            exception=e,
+        )
+        raise
+    build_step_search.advance(phase)
+
+
+def _finalize_build_step(
+    context: Context, build_step: BuildStep, package_file: pathlib.Path
+) -> None:
+    # Housekeeping, like ldconfig, runs once after all phases instead of after each phase
+    try:
+        with (
+            context.command_recorder.tagged(installer="finalizer"),
+            context.tracer.span("finalize_build_step"),
+        ):
+            context.build_step_finalizer.run()
+    except Exception as e:
+        context.cmd_logger.err(
+            f"Failed to finalize build-step '{build_step.name}'.",
+            package_file=package_file,
+            exception=e,
+        )
+        raise
+
+
+def _install_build_step(
+    context: Context, build_step: BuildStep, package_file: pathlib.Path
+) -> None:
+    build_step_search = BuildStepSearch(build_step, context)
+    # Downloads run in the background, while the installers of earlier phases are still running
+    with (
+        context.tracer.span(
+            "package_install",
+            build_step=build_step.name,
+            phases=len(build_step.phases),
+        ),
+        context.file_downloader.prefetch(_collect_downloads(build_step)),
+        context.command_recorder.tagged(build_step=build_step.name),
+    ):
+        # Consecutive phases, which need build tools, install them only once.
+        # The session removes them at the latest when the phases end, even after a failure.
+        with context.build_tools.session():
+            for phase in build_step.phases:
+                _install_phase(
+                    context, build_step_search, build_step, phase, package_file
+                )
+        _finalize_build_step(context, build_step, package_file)
 
 
 def package_install(package_file: pathlib.Path, build_step_name: str, context: Context):
@@ -72,16 +202,11 @@ def package_install(package_file: pathlib.Path, build_step_name: str, context: C
             exception=e,
         )
         raise
-    for phase in build_step.phases:
-        logger.info(f"Processing phase:'{phase.name}'")
-        try:
-            _process_phase(context, build_step, phase)
-        except Exception as e:
-            logger.err(
-                f"Failed to process phase '{phase.name} of build-step '{build_step.name}''.",
-                package_file=package_file,
-                exception=e,
-            )
-            raise
+    try:
+        _install_build_step(context, build_step, package_file)
+    finally:
+        # The report and trace are also written for failed build steps, to analyze the failure
+        context.command_recorder.write_report()
+        context.tracer.export()
 
     context.history_file_manager.add_build_step_to_history(build_step)
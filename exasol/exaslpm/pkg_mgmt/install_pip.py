@@ -2,18 +2,22 @@ from exasol.exaslpm.model.package_file_config import (
     Phase,
 )
 from exasol.exaslpm.pkg_mgmt.context.context import Context
+from exasol.exaslpm.pkg_mgmt.context.file_downloader import Download
 from exasol.exaslpm.pkg_mgmt.install_common import (
     CommandExecInfo,
     run_cmd,
 )
 from exasol.exaslpm.pkg_mgmt.search.search_cache import SearchCache
 
+# get-pip.py is not versioned, so it must not be taken from the download cache
+GET_PIP_DOWNLOAD = Download(url="https://bootstrap.pypa.io/get-pip.py", cache=False)
+
 
 def install_pip(search_cache: SearchCache, phase: Phase, ctx: Context):
     if phase.tools and phase.tools.pip:
         pip = phase.tools.pip
         with ctx.file_downloader.download_file_to_tmp(
-            url="https://bootstrap.pypa.io/get-pip.py"
+            url=GET_PIP_DOWNLOAD.url, cache=GET_PIP_DOWNLOAD.cache
         ) as get_pip:
             python_binary_path = search_cache.python_binary_path
             install_pip_cmd = CommandExecInfo(
@@ -1,36 +1,115 @@
+import contextlib
+import json
+import os
+import re
+from collections.abc import Iterator
+from io import TextIOBase
+from pathlib import Path
+
 from exasol.exaslpm.model.package_file_config import (
+    BuildToolsProfile,
+    InstallStrategy,
     Phase,
+    PipInstaller,
+    PipPackage,
+    PipPackages,
 )
+from exasol.exaslpm.pkg_mgmt.context.cmd_executor import CommandFailedException
 from exasol.exaslpm.pkg_mgmt.context.context import Context
+from exasol.exaslpm.pkg_mgmt.install_apt_packages import run_apt_update
 from exasol.exaslpm.pkg_mgmt.install_common import (
     CommandExecInfo,
     run_cmd,
+    run_cmd_with_output,
+    run_cmds_concurrently,
 )
 from exasol.exaslpm.pkg_mgmt.search.package_collectors import collect_pip_packages
 from exasol.exaslpm.pkg_mgmt.search.search_cache import SearchCache
 
+LIST_DISTRIBUTIONS_SCRIPT = (
+    "import importlib.metadata as m; "
+    "print(*(d.metadata['Name'] or '' for d in m.distributions()), sep='\\n')"
+)
+
+BUILD_TOOLS_PROFILES: dict[BuildToolsProfile, list[str]] = {
+    BuildToolsProfile.Default: ["build-essential", "pkg-config"],
+    BuildToolsProfile.Scientific: [
+        "build-essential",
+        "pkg-config",
+        "gfortran",
+        "libopenblas-dev",
+        "liblapack-dev",
+    ],
+}
 
-def _install_build_tools_ephemerally(ctx: Context):
-    apt_update_cmd = CommandExecInfo(
-        cmd=["apt-get", "-y", "update"], err="Failed while updating apt cmd"
+# Runtime libraries, which the packages built with the build tools profile link against.
+# They get installed explicitly, which marks them as manually installed,
+# so that they are kept when the build tools get purged and autoremoved.
+BUILD_TOOLS_RUNTIME_PACKAGES: dict[BuildToolsProfile, list[str]] = {
+    BuildToolsProfile.Default: [],
+    BuildToolsProfile.Scientific: ["libgfortran5", "libopenblas0", "liblapack3"],
+}
+
+
+def _build_tools_packages(pip_packages: PipPackages, ctx: Context) -> list[str]:
+    """
+    Returns the apt packages of the build tools profile, the additional build tools
+    and ccache, if a ccache directory is configured.
+    """
+    packages = (
+        BUILD_TOOLS_PROFILES[pip_packages.build_tools_profile]
+        + pip_packages.build_tools
     )
-    run_cmd(apt_update_cmd, ctx)
+    if ctx.install_options.ccache_dir is not None:
+        packages = packages + ["ccache"]
+    return list(dict.fromkeys(packages))
+
+
+def _build_env(pip_packages: PipPackages, ctx: Context) -> list[str]:
+    """
+    Returns the environment variables for building source distributions,
+    which let the C and C++ compilers run through ccache, if a ccache directory is configured.
+    """
+    ccache_dir = ctx.install_options.ccache_dir
+    if ccache_dir is None or not pip_packages.install_build_tools_ephemerally:
+        return []
+    return [f"CCACHE_DIR={ccache_dir}", "CC=ccache gcc", "CXX=ccache g++"]
+
+
+def _with_env(cmd: CommandExecInfo, env: list[str]) -> CommandExecInfo:
+    # CommandExecInfo.env would replace the whole environment
+    if env:
+        cmd.cmd = ["env", *env] + cmd.cmd
+    return cmd
+
+
+def _install_build_tools_ephemerally(packages: list[str], ctx: Context):
+    with (
+        ctx.command_recorder.tagged(installer="build_tools"),
+        ctx.tracer.span("install_build_tools", packages=len(packages)),
+    ):
+        _install_build_tools(packages, ctx)
+
+
+def _install_build_tools(packages: list[str], ctx: Context):
+    run_apt_update(ctx)
 
     apt_install_cmd = CommandExecInfo(
-        cmd=[
-            "apt-get",
-            "install",
-            "-y",
-            "--no-install-recommends",
-            "build-essential",
-            "pkg-config",
-        ],
-        err="Failed while installing build-essential and pkg-config",
+        cmd=["apt-get", "install", "-y", "--no-install-recommends", *packages],
+        err=f"Failed while installing build tools {packages}",
     )
     run_cmd(apt_install_cmd, ctx)
 
 
-def _uninstall_build_tools_ephemerally(ctx: Context):
+def _uninstall_build_tools_ephemerally(packages: list[str], ctx: Context):
+    with (
+        ctx.command_recorder.tagged(installer="build_tools"),
+        ctx.tracer.span("uninstall_build_tools", packages=len(packages)),
+    ):
+        _uninstall_build_tools(packages, ctx)
+
+
+def _uninstall_build_tools(packages: list[str], ctx: Context):
     """
     Remove build-tools.
     `build-essential` is a meta-package and with `apt-get purge` only the named package is removed,
@@ -38,7 +117,7 @@ def _uninstall_build_tools_ephemerally(ctx: Context):
     `apt-get autoremove` removes all packages that where not directly requested with apt install.
     """
     apt_purge_cmd = CommandExecInfo(
-        cmd=["apt-get", "purge", "-y", "build-essential", "pkg-config"],
+        cmd=["apt-get", "purge", "-y", *packages],
         err="Failed while running apt-get purge",
     )
     run_cmd(apt_purge_cmd, ctx)
@@ -50,37 +129,384 @@ def _uninstall_build_tools_ephemerally(ctx: Context):
     run_cmd(apt_purge_cmd, ctx)
 
 
-def install_pip_packages(search_cache: SearchCache, phase: Phase, ctx: Context):
+@contextlib.contextmanager
+def _ephemeral_build_tools(pip_packages: PipPackages, ctx: Context) -> Iterator[None]:
+    """
+    Keeps the build tools installed while the packages get installed.
+    The runtime libraries of the build tools profile get installed with them, but stay installed.
+    Within a session of the build tools lifecycle,
+    consecutive phases reuse the build tools installed by the first of them.
+    """
+    if not pip_packages.install_build_tools_ephemerally:
+        yield
+        return
+    runtime_packages = BUILD_TOOLS_RUNTIME_PACKAGES[pip_packages.build_tools_profile]
+    with ctx.build_tools.use(
+        _build_tools_packages(pip_packages, ctx),
+        install=lambda packages: _install_build_tools_ephemerally(
+            packages + runtime_packages, ctx
+        ),
+        remove=lambda packages: _uninstall_build_tools_ephemerally(packages, ctx),
+    ):
+        yield
+
+
+def _normalize_name(name: str) -> str:
+    """
+    Normalizes a distribution name as defined in PEP 503.
+    """
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def _write_requirements(output_file: TextIOBase, packages: list[PipPackage]) -> None:
+    for package in packages:
+        name = package.name
+        if package.extras:
+            name += f"[{','.join(package.extras)}]"
+        if not package.url:
+            print(f"{name} {package.version}", file=output_file)
+        else:
+            print(f"{name} @ {package.url}", file=output_file)
+
+
+def _write_constraints(output_file: TextIOBase, packages: list[PipPackage]) -> None:
+    """
+    Writes the packages in constraints file format, which allows neither extras
+    nor direct URL references. URL packages are only constrained by their version, if they have one.
+    """
+    for package in packages:
+        if package.version:
+            print(f"{package.name} {package.version}", file=output_file)
+
+
+def _installed_distributions(python_binary_path: Path, ctx: Context) -> set[str]:
+    """
+    Returns the normalized names of all distributions installed in the given interpreter,
+    found with a single scan of importlib.metadata.
+    """
+    list_cmd = CommandExecInfo(
+        cmd=[str(python_binary_path), "-c", LIST_DISTRIBUTIONS_SCRIPT],
+        err="Failed while listing installed pip packages",
+    )
+    return {
+        _normalize_name(line.strip())
+        for line in run_cmd_with_output(list_cmd, ctx)
+        if line.strip()
+    }
+
+
+def _split_delta(
+    search_cache: SearchCache, pip_packages: PipPackages, ctx: Context
+) -> tuple[list[PipPackage], list[PipPackage]]:
+    """
+    Returns the packages to install and the packages to be used as constraints.
+    """
+    requirements = list(pip_packages.packages)
+    previous_packages = collect_pip_packages(search_cache.all_phases)
+    if pip_packages.verify_installed_packages:
+        installed = _installed_distributions(search_cache.python_binary_path, ctx)
+        missing = [
+            package
+            for package in previous_packages
+            if _normalize_name(package.name) not in installed
+        ]
+        if missing:
+            ctx.cmd_logger.warn(
+                f"Previously installed pip packages are missing and will be installed again: {[p.name for p in missing]}"
+            )
+        requirements += missing
+    requirement_names = {_normalize_name(package.name) for package in requirements}
+    constraints = [
+        package
+        for package in previous_packages
+        if _normalize_name(package.name) not in requirement_names
+    ]
+    return requirements, constraints
+
+
+def _pip_install_cmd(
+    search_cache: SearchCache,
+    requirements_file: Path,
+    constraints_file: Path | None,
+    wheelhouse: Path | None = None,
+    find_links: Path | None = None,
+    installer: PipInstaller = PipInstaller.Pip,
+) -> CommandExecInfo:
+    python_binary = str(search_cache.python_binary_path)
+    if installer == PipInstaller.Uv:
+        # uv is not bound to the interpreter it runs in, so the target interpreter is passed explicitly
+        cmd = [python_binary, "-m", "uv", "pip", "install", "--python", python_binary]
+    else:
+        cmd = [python_binary, "-m", "pip", "install"]
+    install_pip_cmd = CommandExecInfo(
+        cmd=cmd + ["-r", str(requirements_file)],
+        err="Failed while installing pip packages",
+    )
+    if constraints_file is not None:
+        install_pip_cmd.cmd += ["-c", str(constraints_file)]
+    if wheelhouse is not None:
+        install_pip_cmd.cmd += ["--no-index", "--find-links", str(wheelhouse)]
+    elif find_links is not None:
+        install_pip_cmd.cmd += ["--find-links", str(find_links)]
+    if search_cache.pip.needs_break_system_packages:
+        install_pip_cmd.cmd.append("--break-system-packages")
+    return install_pip_cmd
+
+
+def _pip_wheel_cmd(
+    search_cache: SearchCache,
+    requirements_file: Path,
+    constraints_file: Path | None,
+    wheelhouse: Path,
+) -> CommandExecInfo:
+    """
+    Builds or downloads the wheels of all requirements and their dependencies into the wheelhouse.
+    Wheels, which are already in the wheelhouse, are reused instead of being built again.
+    """
+    wheel_cmd = CommandExecInfo(
+        cmd=[
+            str(search_cache.python_binary_path),
+            "-m",
+            "pip",
+            "wheel",
+            "--wheel-dir",
+            str(wheelhouse),
+            "--find-links",
+            str(wheelhouse),
+            "-r",
+            str(requirements_file),
+        ],
+        err="Failed while building pip wheels",
+    )
+    if constraints_file is not None:
+        wheel_cmd.cmd += ["-c", str(constraints_file)]
+    return wheel_cmd
+
+
+def _remove_wheelhouse_cmd(wheelhouse: Path) -> CommandExecInfo:
+    # A mounted wheelhouse, for example a BuildKit cache mount, is not part of the image
+    return CommandExecInfo(
+        cmd=[
+            "bash",
+            "-c",
+            'mountpoint -q "$1" || rm -rf "$1"',
+            "bash",
+            str(wheelhouse),
+        ],
+        err="Failed while removing pip wheelhouse",
+    )
+
+
+def _install_report_cmd(
+    search_cache: SearchCache,
+    requirements_file: Path,
+    constraints_file: Path | None,
+) -> CommandExecInfo:
+    """
+    Resolves the requirements without installing them,
+    and prints a JSON report with the distributions pip would install.
+    Distributions, which are already installed in a matching version, are not part of the report.
+    """
+    report_cmd = CommandExecInfo(
+        cmd=[
+            str(search_cache.python_binary_path),
+            "-m",
+            "pip",
+            "install",
+            "--dry-run",
+            "--quiet",
+            "--report",
+            "-",
+            "-r",
+            str(requirements_file),
+        ],
+        err="Failed while resolving pip packages",
+    )
+    if constraints_file is not None:
+        report_cmd.cmd += ["-c", str(constraints_file)]
+    if search_cache.pip.needs_break_system_packages:
+        report_cmd.cmd.append("--break-system-packages")
+    return report_cmd
+
 
+def _sdist_requirements(report: dict) -> list[str]:
+    """
+    Returns the requirements of all distributions in the pip install report,
+    which are not available as wheel and need to be built.
+    Direct URL references, like VCS or local directory requirements, are left to pip,
+    because the final install does not take their wheels from the wheel directory.
+    """
+    requirements = []
+    for item in report.get("install", []):
+        if item.get("is_direct"):
+            continue
+        url = item.get("download_info", {}).get("url", "")
+        if url.endswith(".whl"):
+            continue
+        metadata = item["metadata"]
+        requirements.append(f"{metadata['name']}=={metadata['version']}")
+    return requirements
+
+
+def _build_wheel_cmd(
+    search_cache: SearchCache,
+    requirement: str,
+    wheel_dir: Path,
+    jobs: int,
+    build_env: list[str],
+) -> CommandExecInfo:
+    cmd = [
+        str(search_cache.python_binary_path),
+        "-m",
+        "pip",
+        "wheel",
+        "--no-deps",
+        "--wheel-dir",
+        str(wheel_dir),
+        requirement,
+    ]
+    env = list(build_env)
+    if "MAKEFLAGS" not in os.environ:
+        # Share the CPU cores between the concurrent builds
+        make_jobs = max(1, (os.cpu_count() or 1) // jobs)
+        env.append(f"MAKEFLAGS=-j{make_jobs}")
+    return _with_env(
+        CommandExecInfo(cmd=cmd, err=f"Failed while building wheel of {requirement}"),
+        env,
+    )
+
+
+def _build_wheels_in_parallel(
+    search_cache: SearchCache,
+    requirements_file: Path,
+    constraints_file: Path | None,
+    wheel_dir: Path,
+    build_env: list[str],
+    ctx: Context,
+) -> bool:
+    """
+    Builds the wheels of all requirements, which are only available as source distribution,
+    concurrently into the wheel directory, because pip builds them one after another.
+    Returns True, if wheels got built.
+    """
+    try:
+        report_lines = run_cmd_with_output(
+            _install_report_cmd(search_cache, requirements_file, constraints_file), ctx
+        )
+        requirements = _sdist_requirements(json.loads("".join(report_lines)))
+    except (CommandFailedException, ValueError, KeyError) as e:
+        ctx.cmd_logger.warn(
+            f"Failed to find pip packages to build in parallel, pip builds them: {e}"
+        )
+        return False
+    if not requirements:
+        return False
+    jobs = ctx.install_options.pip_parallel_builds
+    ctx.cmd_logger.info(f"Building wheels with {jobs} parallel jobs: {requirements}")
+    run_cmds_concurrently(
+        [
+            _build_wheel_cmd(search_cache, requirement, wheel_dir, jobs, build_env)
+            for requirement in requirements
+        ],
+        ctx,
+        max_parallel=jobs,
+    )
+    return True
+
+
+def _run_pip_install(
+    search_cache: SearchCache,
+    requirements_file: Path,
+    constraints_file: Path | None,
+    pip_packages: PipPackages,
+    ctx: Context,
+):
+    wheelhouse = ctx.install_options.pip_wheelhouse_dir
+    build_env = _build_env(pip_packages, ctx)
+    find_links = None
+    with contextlib.ExitStack() as stack:
+        if (
+            pip_packages.install_build_tools_ephemerally
+            and ctx.install_options.pip_parallel_builds > 1
+        ):
+            if wheelhouse is not None:
+                wheel_dir = wheelhouse
+            else:
+                temp_file = stack.enter_context(ctx.temp_file_provider.create())
+                wheel_dir = Path(f"{temp_file.path}-wheels")
+            if _build_wheels_in_parallel(
+                search_cache,
+                requirements_file,
+                constraints_file,
+                wheel_dir,
+                build_env,
+                ctx,
+            ):
+                find_links = wheel_dir
+        if wheelhouse is not None:
+            run_cmd(
+                _with_env(
+                    _pip_wheel_cmd(
+                        search_cache, requirements_file, constraints_file, wheelhouse
+                    ),
+                    build_env,
+                ),
+                ctx,
+            )
+            ctx.build_step_finalizer.register(
+                "remove_pip_wheelhouse",
+                lambda: run_cmd(_remove_wheelhouse_cmd(wheelhouse), ctx),
+            )
+        run_cmd(
+            _with_env(
+                _pip_install_cmd(
+                    search_cache,
+                    requirements_file,
+                    constraints_file,
+                    wheelhouse,
+                    find_links,
+                    pip_packages.installer,
+                ),
+                build_env,
+            ),
+            ctx,
+        )
+
+
+def _install_all(
+    search_cache: SearchCache, phase: Phase, pip_packages: PipPackages, ctx: Context
+):
     packages_to_install = collect_pip_packages(search_cache.all_phases + [phase])
-    python_binary_path = search_cache.python_binary_path
+    with ctx.temp_file_provider.create() as temp_file:
+        with temp_file.open() as f:
+            _write_requirements(f, packages_to_install)
+        _run_pip_install(search_cache, temp_file.path, None, pip_packages, ctx)
+
+
+def _install_delta(search_cache: SearchCache, pip_packages: PipPackages, ctx: Context):
+    requirements, constraints = _split_delta(search_cache, pip_packages, ctx)
+    with ctx.temp_file_provider.create() as requirements_file:
+        with requirements_file.open() as f:
+            _write_requirements(f, requirements)
+        with ctx.temp_file_provider.create() as constraints_file:
+            with constraints_file.open() as f:
+                _write_constraints(f, constraints)
+            _run_pip_install(
+                search_cache,
+                requirements_file.path,
+                constraints_file.path,
+                pip_packages,
+                ctx,
+            )
+
+
+def install_pip_packages(search_cache: SearchCache, phase: Phase, ctx: Context):
 
     if not phase.pip or not phase.pip.packages:
         ctx.cmd_logger.warn("Got an empty list of pip packages")
     else:
-        if phase.pip.install_build_tools_ephemerally:
-            _install_build_tools_ephemerally(ctx)
-        with ctx.temp_file_provider.create() as temp_file:
-            with temp_file.open() as f:
-                for package in packages_to_install:
-                    if not package.url:
-                        print(f"{package.name} {package.version}", file=f)
-                    else:
-                        print(f"{package.name} @ {package.url}", file=f)
-
-            install_pip_cmd = CommandExecInfo(
-                cmd=[
-                    str(python_binary_path),
-                    "-m",
-                    "pip",
-                    "install",
-                    "-r",
-                    str(temp_file.path),
-                ],
-                err="Failed while installing pip packages",
-            )
-            if search_cache.pip.needs_break_system_packages:
-                install_pip_cmd.cmd.append("--break-system-packages")
-            run_cmd(install_pip_cmd, ctx)
-        if phase.pip.install_build_tools_ephemerally:
-            _uninstall_build_tools_ephemerally(ctx)
+        with _ephemeral_build_tools(phase.pip, ctx):
+            if phase.pip.install_strategy == InstallStrategy.Delta:
+                _install_delta(search_cache, phase.pip, ctx)
+            else:
+                _install_all(search_cache, phase, phase.pip, ctx)
@@ -0,0 +1,89 @@
+import bz2
+import gzip
+import io
+import lzma
+from collections.abc import (
+    Callable,
+    Iterable,
+)
+from pathlib import Path
+
+from exasol.exaslpm.pkg_mgmt.search.debian_version import DebianVersion
+
+_PACKAGES_SUFFIX = "_Packages"
+
+_OPENERS: dict[str, Callable[[Path], io.BufferedIOBase]] = {
+    "": lambda path: path.open("rb"),
+    ".gz": lambda path: gzip.open(path, "rb"),
+    ".xz": lambda path: lzma.open(path, "rb"),
+    ".lzma": lambda path: lzma.open(path, "rb"),
+    ".bz2": lambda path: bz2.open(path, "rb"),
+}
+_UNSUPPORTED_COMPRESSIONS = {".lz4", ".zst"}
+
+
+def _packages_files(lists_dir: Path) -> list[tuple[Path, str]] | None:
+    """
+    Returns the Packages files in the lists directory together with their compression suffix,
+    or None if one of them uses an unsupported compression, like lz4 or zstd.
+    """
+    files = []
+    for path in sorted(lists_dir.iterdir()):
+        name, sep, suffix = path.name.rpartition(_PACKAGES_SUFFIX)
+        if not (sep and name) or not path.is_file():
+            continue
+        if suffix in _UNSUPPORTED_COMPRESSIONS:
+            return None
+        if suffix in _OPENERS:
+            files.append((path, suffix))
+    return files
+
+
+def _read_versions(
+    path: Path, suffix: str, packages: set[str]
+) -> Iterable[tuple[str, str]]:
+    package = None
+    with _OPENERS[suffix](path) as f:
+        for raw_line in f:
+            if raw_line.startswith(b"Package:"):
+                name = raw_line[len(b"Package:") :].strip().decode()
+                package = name if name in packages else None
+            elif package is not None and raw_line.startswith(b"Version:"):
+                yield package, raw_line[len(b"Version:") :].strip().decode()
+                package = None
+
+
+def read_madison_lines(
+    packages: list[str], lists_dir: Path
+) -> dict[str, list[str]] | None:
+    """
+    Reads the available versions of the given packages directly from the APT package lists,
+    and returns them in the format of `apt-cache madison`, sorted from the highest to the lowest version.
+    Packages, which are not found, are missing in the result.
+    Returns None if the package lists cannot be read, so that the caller can fall back to madison.
+
+    Unlike `apt-cache madison`, APT pinning is not taken into account.
+    """
+    try:
+        files = _packages_files(lists_dir)
+        if files is None:
+            return None
+        wanted = set(packages)
+        versions: dict[str, list[tuple[str, str]]] = {}
+        for path, suffix in files:
+            for package, version in _read_versions(path, suffix, wanted):
+                entry = (version, path.name)
+                package_versions = versions.setdefault(package, [])
+                if entry not in package_versions:
+                    package_versions.append(entry)
+    except (OSError, EOFError, lzma.LZMAError, UnicodeDecodeError):
+        return None
+    return {
+        package: [
+            f"{package} | {version} | {source}\n"
+            for version, source in sorted(
+                entries, key=lambda entry: DebianVersion(entry[0]), reverse=True
+            )
+        ]
+        for package, entries in versions.items()
+    }
@@ -1,11 +1,15 @@
 import csv
+import functools
 import re
+from collections.abc import Callable
 from dataclasses import dataclass
 from io import StringIO
 
 from exasol.exaslpm.model.package_file_config import AptPackage
 from exasol.exaslpm.pkg_mgmt.context.cmd_executor import CommandFailedException
 from exasol.exaslpm.pkg_mgmt.context.context import Context
+from exasol.exaslpm.pkg_mgmt.context.madison_cache import APT_LISTS_SOURCE
+from exasol.exaslpm.pkg_mgmt.search.apt_lists_reader import read_madison_lines
 
 """
 This is how the apt-cache madison output looks
@@ -28,36 +32,45 @@ class MadisonData:
     def is_match(text: str, pattern: str) -> bool:
         if not (pattern and text):
             raise ValueError("Pattern and text must be non-empty strings")
-        # 1. Escape special regex characters so they are treated as literal text
-        # 2. Replace the escaped asterisk '\*' back to the regex wildcard '.*'
-        regex_pattern = re.escape(pattern).replace(r"\*", ".*")
-
-        # 3. Add anchors (^ and $) to ensure we match the ENTIRE string,
-        # not just a piece of it in the middle.
-        full_regex = f"^{regex_pattern}$"
-
-        # Use re.fullmatch for a clean boolean check
-        return bool(re.fullmatch(full_regex, text))
+        return version_matcher(pattern)(text)
+
+
+@functools.lru_cache(maxsize=1024)
+def version_matcher(pattern: str) -> Callable[[str], bool]:
+    """
+    Returns a function, which checks if a version matches the given pattern,
+    where "*" matches any sequence of characters.
+    Patterns with a single trailing or leading "*" are checked as prefix or suffix,
+    other wildcard patterns get compiled to a regex once.
+    """
+    wildcards = pattern.count("*")
+    if wildcards == 0:
+        return lambda text: text == pattern
+    if wildcards == 1 and pattern.endswith("*"):
+        prefix = pattern[:-1]
+        return lambda text: text.startswith(prefix)
+    if wildcards == 1 and pattern.startswith("*"):
+        suffix = pattern[1:]
+        return lambda text: text.endswith(suffix)
+    # Escape special regex characters so they are treated as literal text,
+    # then replace the escaped asterisk '\*' back to the regex wildcard '.*'
+    regex = re.compile(re.escape(pattern).replace(r"\*", ".*"))
+    return lambda text: regex.fullmatch(text) is not None
 
 
 class MadisonExecutor:
     @staticmethod
-    def execute_madison(pkg_list: list[AptPackage], ctx: Context) -> str:
-        # Call `apt update` before invoking this method so `apt-cache madison`
-        # reads current package index metadata and returns complete results.
-        if not pkg_list:
-            return ""
-        cmd = ["apt-cache", "-o", "quiet=0", "madison"]
-        for pkg in pkg_list:
-            cmd.append(pkg.name)
+    def _run_madison(packages: list[str], ctx: Context) -> dict[str, list[str]]:
+        cmd = ["apt-cache", "-o", "quiet=0", "madison"] + packages
         cmd_res = ctx.cmd_executor.execute(cmd)
 
-        stdout_lines: list[str] = []
+        lines_by_package: dict[str, list[str]] = {package: [] for package in packages}
 
         def consume_stdout(line: str | bytes, **kwargs) -> None:
             if isinstance(line, bytes):
                 line = line.decode()
-            stdout_lines.append(line)
+            package = line.split("|", 1)[0].strip()
+            lines_by_package.setdefault(package, []).append(line)
 
         def consume_stderr(_line: str | bytes, **kwargs) -> None:
             if isinstance(_line, bytes):
@@ -67,7 +80,46 @@ class MadisonExecutor:
         ret_code = cmd_res.consume_results(consume_stdout, consume_stderr)
         if ret_code != 0:
             raise CommandFailedException("Failed executing madison")
-        return " ".join(stdout_lines)
+        return lines_by_package
+
+    @staticmethod
+    def _read_apt_lists(packages: list[str], ctx: Context) -> dict[str, list[str]]:
+        lines_by_package = read_madison_lines(packages, ctx.madison_cache.lists_dir)
+        if lines_by_package is None:
+            ctx.cmd_logger.info(
+                "Failed to read the APT package lists, falling back to apt-cache madison"
+            )
+            return {}
+        return lines_by_package
+
+    @staticmethod
+    def execute_madison(pkg_list: list[AptPackage], ctx: Context) -> str:
+        # Call `apt update` before invoking this method so `apt-cache madison`
+        # reads current package index metadata and returns complete results.
+        if not pkg_list:
+            return ""
+        packages = list(dict.fromkeys(pkg.name for pkg in pkg_list))
+        from_lists = ctx.install_options.resolve_apt_wildcards_from_lists
+        lines_by_package = ctx.madison_cache.get(packages)
+        if from_lists:
+            # Lines from madison take APT pinning into account, so they take precedence
+            lines_by_package = {
+                **ctx.madison_cache.get(packages, source=APT_LISTS_SOURCE),
+                **lines_by_package,
+            }
+        missing = [package for package in packages if package not in lines_by_package]
+        if missing and from_lists:
+            resolved = MadisonExecutor._read_apt_lists(missing, ctx)
+            ctx.madison_cache.put(resolved, source=APT_LISTS_SOURCE)
+            lines_by_package.update(resolved)
+            missing = [package for package in missing if package not in resolved]
+        if missing:
+            resolved = MadisonExecutor._run_madison(missing, ctx)
+            ctx.madison_cache.put(resolved)
+            lines_by_package.update(resolved)
+        return " ".join(
+            line for package in packages for line in lines_by_package[package]
+        )
 
 
 class MadisonParser:
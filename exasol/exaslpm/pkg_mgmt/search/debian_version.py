@@ -0,0 +1,116 @@
+"""
+Comparison of Debian package versions, following the Debian policy manual:
+https://www.debian.org/doc/debian-policy/ch-controlfields.html#version
+"""
+
+import functools
+import re
+
+_DIGITS_REGEX = re.compile(r"(\d+)")
+
+_PartKey = tuple[int, ...]
+
+
+def _char_order(c: str) -> int:
+    # "~" sorts before everything, even the end of the string, letters sort before non-letters
+    if c == "~":
+        return -1
+    if c.isalpha():
+        return ord(c)
+    return ord(c) + 256
+
+
+# Orders of the ASCII characters, other characters get computed on demand
+_CHAR_ORDERS = {chr(c): _char_order(chr(c)) for c in range(128)}
+
+
+def _char_orders(non_digits: str) -> list[int]:
+    return [_CHAR_ORDERS.get(c) or _char_order(c) for c in non_digits]
+
+
+@functools.lru_cache(maxsize=4096)
+def _part_key(part: str) -> _PartKey:
+    """
+    Converts the upstream version or revision into a tuple of integers,
+    which compare like the parts themselves:
+    for each sequence of non-digits followed by a sequence of digits,
+    the order of each non-digit character, a 0 as terminator and the number.
+    A final 0 marks the end of the part.
+
+    The terminator and the end marker compare like the end of a string in dpkg:
+    lower than any character except "~".
+    """
+    key: list[int] = []
+    # Splitting by the digit sequences yields alternating non-digits and digits,
+    # starting and ending with a possibly empty sequence of non-digits
+    pieces = _DIGITS_REGEX.split(part)
+    for non_digits, digits in zip(pieces[0::2], pieces[1::2]):
+        key.extend(_char_orders(non_digits))
+        key.append(0)
+        key.append(int(digits))
+    # An empty part compares like a zero
+    if pieces[-1] or not key:
+        key.extend(_char_orders(pieces[-1]))
+        key.append(0)
+        key.append(0)
+    key.append(0)
+    return tuple(key)
+
+
+@functools.total_ordering
+class DebianVersion:
+    """
+    Sortable Debian version, which gets parsed once into a key of integer tuples,
+    so that sorting many versions only compares tuples.
+
+    >>> sorted(["1.0", "1.0~rc1", "1:0.9"], key=DebianVersion)
+    ['1.0~rc1', '1.0', '1:0.9']
+    """
+
+    __slots__ = ("version", "key")
+
+    def __init__(self, version: str):
+        self.version = version
+        epoch, sep, rest = version.partition(":")
+        if not sep:
+            epoch, rest = "0", version
+        upstream, sep, revision = rest.rpartition("-")
+        if not sep:
+            upstream, revision = rest, ""
+        self.key: tuple[int, _PartKey, _PartKey] = (
+            int(epoch) if epoch.isdigit() else 0,
+            _part_key(upstream),
+            _part_key(revision),
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, DebianVersion):
+            return NotImplemented
+        return self.key == other.key
+
+    def __lt__(self, other: "DebianVersion") -> bool:
+        return self.key < other.key
+
+    def __hash__(self) -> int:
+        return hash(self.key)
+
+    def __repr__(self) -> str:
+        return f"DebianVersion({self.version!r})"
+
+
+def compare_versions(a: str, b: str) -> int:
+    """
+    Returns a negative number if version `a` is lower than version `b`,
+    zero if they are equal, and a positive number if `a` is higher than `b`.
+    """
+    key_a = DebianVersion(a).key
+    key_b = DebianVersion(b).key
+    return (key_a > key_b) - (key_a < key_b)
+
+
+def sort_versions(versions: list[str], reverse: bool = False) -> list[str]:
+    """
+    Sorts the versions in Debian version order, from the lowest to the highest version,
+    or from the highest to the lowest version if `reverse` is True.
+    """
+    return sorted(versions, key=DebianVersion, reverse=reverse)
@@ -35,22 +35,50 @@ def find_phases_of_build_steps(
     return phases_of_previous_build_steps + phases_of_current_build_step
 
 
+def single_binary(binary_type: BinaryType, candidates: list[Path]) -> Path:
+    if len(candidates) > 1:
+        raise ValueError(f"Found more than one result for binary '{binary_type.value}'")
+    if len(candidates) == 0:
+        raise ValueError(f"Binary '{binary_type.value}' not found")
+    return candidates[0]
+
+
+def single_variable(variable_name: str, candidates: list[str]) -> str:
+    if len(candidates) > 1:
+        raise ValueError(f"Found more than one result for variable '{variable_name}'")
+    if len(candidates) == 0:
+        raise ValueError(f"Variable '{variable_name}' not found")
+    return candidates[0]
+
+
+def single_pip(candidates: list[Pip]) -> Pip:
+    if len(candidates) > 1:
+        raise ValueError(f"Found more than one result for pip: {candidates}")
+    if len(candidates) == 0:
+        raise ValueError("Pip not found")
+    return candidates[0]
+
+
+def single_micromamba(candidates: list[Micromamba]) -> Micromamba:
+    if len(candidates) > 1:
+        raise ValueError(f"Found more than one result for micromamba: {candidates}")
+    if len(candidates) == 0:
+        raise ValueError("Micromamba not found")
+    return candidates[0]
+
+
+def get_binary(binary_type: BinaryType, phase: Phase) -> Path | None:
+    if phase.tools:
+        return getattr(phase.tools, binary_type.value, None)
+    return None
+
+
 def find_binary(binary_type: BinaryType, phases: list[Phase]) -> Path:
     if binary_type == BinaryType.MICROMAMBA:
         return MICROMAMBA_PATH
 
-    def get_binary(phase: Phase) -> Path | None:
-        if phase.tools:
-            return getattr(phase.tools, binary_type.value, None)
-        return None
-
-    result = [get_binary(phase) for phase in phases]
-    filtered = [res for res in result if res is not None]
-    if len(filtered) > 1:
-        raise ValueError(f"Found more than one result for binary '{binary_type.value}'")
-    if len(filtered) == 0:
-        raise ValueError(f"Binary '{binary_type.value}' not found")
-    return filtered[0]
+    result = [get_binary(binary_type, phase) for phase in phases]
+    return single_binary(binary_type, [res for res in result if res is not None])
 
 
 def find_variable(variable_name: str, phases: list[Phase]) -> str:
@@ -59,20 +87,12 @@ def find_variable(variable_name: str, phases: list[Phase]) -> str:
         for phase in phases
         if phase.variables and variable_name in phase.variables
     ]
-    if len(result) > 1:
-        raise ValueError(f"Found more than one result for variable '{variable_name}'")
-    if len(result) == 0:
-        raise ValueError(f"Variable '{variable_name}' not found")
-    return result[0]
+    return single_variable(variable_name, result)
 
 
 def find_pip(phases: list[Phase]) -> Pip:
     result = [phase.tools.pip for phase in phases if phase.tools and phase.tools.pip]
-    if len(result) > 1:
-        raise ValueError(f"Found more than one result for pip: {result}")
-    if len(result) == 0:
-        raise ValueError("Pip not found")
-    return result[0]
+    return single_pip(result)
 
 
 def find_micromamba(phases: list[Phase]) -> Micromamba:
@@ -81,8 +101,4 @@ def find_micromamba(phases: list[Phase]) -> Micromamba:
         for phase in phases
         if phase.tools and phase.tools.micromamba
     ]
-    if len(result) > 1:
-        raise ValueError(f"Found more than one result for micromamba: {result}")
-    if len(result) == 0:
-        raise ValueError("Micromamba not found")
-    return result[0]
+    return single_micromamba(result)
@@ -0,0 +1,97 @@
+from collections.abc import Iterable
+from pathlib import Path
+from typing import TypeVar
+
+from exasol.exaslpm.model.package_file_config import (
+    Micromamba,
+    Phase,
+    Pip,
+)
+from exasol.exaslpm.pkg_mgmt.binary_types import BinaryType
+from exasol.exaslpm.pkg_mgmt.constants import MICROMAMBA_PATH
+from exasol.exaslpm.pkg_mgmt.search.find_in_build_steps import (
+    get_binary,
+    single_binary,
+    single_micromamba,
+    single_pip,
+    single_variable,
+)
+
+T = TypeVar("T")
+
+_INDEXED_BINARY_TYPES = [bt for bt in BinaryType if bt != BinaryType.MICROMAMBA]
+
+
+def _before(entries: list[tuple[int, T]], limit: int) -> list[T]:
+    return [value for position, value in entries if position < limit]
+
+
+class PhaseIndex:
+    """
+    Ordered list of phases with lookup tables for binaries, variables, pip and micromamba,
+    which get updated incrementally whenever a phase is added.
+    Every entry remembers the position of the phase it was declared in, so lookups can be
+    restricted to the first `limit` phases. This keeps results of earlier lookups stable
+    while later phases are being added.
+    """
+
+    def __init__(self, phases: Iterable[Phase] = ()):
+        self._phases: list[Phase] = []
+        self._binaries: dict[BinaryType, list[tuple[int, Path]]] = {
+            binary_type: [] for binary_type in _INDEXED_BINARY_TYPES
+        }
+        self._variables: dict[str, list[tuple[int, str]]] = {}
+        self._pips: list[tuple[int, Pip]] = []
+        self._micromambas: list[tuple[int, Micromamba]] = []
+        for phase in phases:
+            self.add_phase(phase)
+
+    def __len__(self) -> int:
+        return len(self._phases)
+
+    def add_phase(self, phase: Phase) -> None:
+        position = len(self._phases)
+        self._phases.append(phase)
+        if phase.tools:
+            for binary_type, entries in self._binaries.items():
+                binary_path = get_binary(binary_type, phase)
+                if binary_path is not None:
+                    entries.append((position, binary_path))
+            if phase.tools.pip:
+                self._pips.append((position, phase.tools.pip))
+            if phase.tools.micromamba:
+                self._micromambas.append((position, phase.tools.micromamba))
+        if phase.variables:
+            for key, value in phase.variables.items():
+                self._variables.setdefault(key, []).append((position, value))
+
+    def phases(self, limit: int) -> list[Phase]:
+        return self._phases[:limit]
+
+    def find_binary(self, binary_type: BinaryType, limit: int) -> Path:
+        if binary_type == BinaryType.MICROMAMBA:
+            return MICROMAMBA_PATH
+        return single_binary(binary_type, _before(self._binaries[binary_type], limit))
+
+    def find_variable(self, variable_name: str, limit: int) -> str:
+        return single_variable(
+            variable_name, _before(self._variables.get(variable_name, []), limit)
+        )
+
+    def find_pip(self, limit: int) -> Pip:
+        return single_pip(_before(self._pips, limit))
+
+    def find_micromamba(self, limit: int) -> Micromamba:
+        return single_micromamba(_before(self._micromambas, limit))
+
+    def variables(self, limit: int) -> dict[str, str]:
+        """
+        Returns all variables of the first `limit` phases.
+        If a variable was declared multiple times, the last declaration wins.
+        """
+        result = {}
+        for key, entries in self._variables.items():
+            values = _before(entries, limit)
+            if values:
+                result[key] = values[-1]
+        return result
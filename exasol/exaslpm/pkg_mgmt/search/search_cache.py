@@ -9,12 +9,9 @@ from exasol.exaslpm.model.package_file_config import (
 from exasol.exaslpm.pkg_mgmt.binary_types import BinaryType
 from exasol.exaslpm.pkg_mgmt.context.context import Context
 from exasol.exaslpm.pkg_mgmt.search.find_in_build_steps import (
-    find_binary,
-    find_micromamba,
     find_phases_of_build_steps,
-    find_pip,
-    find_variable,
 )
+from exasol.exaslpm.pkg_mgmt.search.phase_index import PhaseIndex
 
 
 class SearchCache:
@@ -24,9 +21,28 @@ class SearchCache:
         previous_build_steps = (
             context.history_file_manager.get_all_previous_build_steps()
         )
-        self._all_phases = find_phases_of_build_steps(
-            previous_build_steps, current_build_step, current_phase.name
+        phase_index = PhaseIndex(
+            find_phases_of_build_steps(
+                previous_build_steps, current_build_step, current_phase.name
+            )
         )
+        self._init(phase_index, context)
+
+    @classmethod
+    def from_phase_index(
+        cls, phase_index: PhaseIndex, context: Context
+    ) -> "SearchCache":
+        """
+        Creates a search cache over all phases currently contained in the given index.
+        Phases added to the index afterward are not visible to the search cache.
+        """
+        search_cache = cls.__new__(cls)
+        search_cache._init(phase_index, context)
+        return search_cache
+
+    def _init(self, phase_index: PhaseIndex, context: Context) -> None:
+        self._phase_index = phase_index
+        self._limit = len(phase_index)
         self._context = context
         self._binary_paths: dict[BinaryType, Path] = {}
         self._variables: dict[str, str] = {}
@@ -35,7 +51,7 @@ class SearchCache:
 
     def _find_binary(self, binary: BinaryType) -> Path:
         if binary not in self._binary_paths:
-            binary_path = find_binary(binary, self._all_phases)
+            binary_path = self._phase_index.find_binary(binary, self._limit)
             self._binary_paths[binary] = binary_path
             self._context.file_access.check_binary(binary_path)
         return self._binary_paths[binary]
@@ -62,32 +78,73 @@ class SearchCache:
 
     def variable(self, variable_name: str) -> str:
         if variable_name not in self._variables:
-            self._variables[variable_name] = find_variable(
-                variable_name, self._all_phases
+            self._variables[variable_name] = self._phase_index.find_variable(
+                variable_name, self._limit
             )
         return self._variables[variable_name]
 
     @property
     def pip(self) -> Pip:
         if self._pip is None:
-            self._pip = find_pip(self._all_phases)
+            self._pip = self._phase_index.find_pip(self._limit)
         return self._pip
 
     @property
     def micromamba(self) -> Micromamba:
         if self._micromamba is None:
-            self._micromamba = find_micromamba(self._all_phases)
+            self._micromamba = self._phase_index.find_micromamba(self._limit)
         return self._micromamba
 
     @property
     def all_phases(self) -> list[Phase]:
-        return self._all_phases
+        return self._phase_index.phases(self._limit)
 
     @property
     def all_variables(self) -> dict[str, str]:
-        return {
-            key: value
-            for phase in self.all_phases
-            if phase.variables is not None
-            for key, value in phase.variables.items()
-        }
+        return self._phase_index.variables(self._limit)
+
+
+class BuildStepSearch:
+    """
+    Provides the search caches for all phases of one build step.
+    The previous build steps are loaded only once; afterward the search
+    advances phase by phase, adding each processed phase to a shared index.
+    """
+
+    def __init__(self, current_build_step: BuildStep, context: Context):
+        previous_build_steps = (
+            context.history_file_manager.get_all_previous_build_steps()
+        )
+        self._phase_index = PhaseIndex(
+            phase
+            for previous_build_step in previous_build_steps
+            for phase in previous_build_step.phases
+        )
+        self._current_build_step = current_build_step
+        self._next_phase_idx = 0
+        self._context = context
+
+    def _check_next_phase(self, phase: Phase) -> None:
+        phases = self._current_build_step.phases
+        if (
+            self._next_phase_idx >= len(phases)
+            or phases[self._next_phase_idx].name != phase.name
+        ):
+            raise ValueError(
+                f"Phase '{phase.name}' is not the next phase of build step '{self._current_build_step.name}'"
+            )
+
+    def search_cache(self, phase: Phase) -> SearchCache:
+        """
+        Returns the search cache for the given phase, which must be the next phase to process.
+        """
+        self._check_next_phase(phase)
+        return SearchCache.from_phase_index(self._phase_index, self._context)
+
+    def advance(self, phase: Phase) -> None:
+        """
+        Marks the given phase as processed, making it visible to the search caches of all following phases.
+        """
+        self._check_next_phase(phase)
+        self._phase_index.add_phase(phase)
+        self._next_phase_idx += 1
@@ -1,6 +1,9 @@
 from collections.abc import Iterator
 from pathlib import Path
 from test.integration.cli_helper import CliHelper
+from test.integration.docker_test_environment.docker_apt_index_tracker import (
+    DockerAptIndexTracker,
+)
 from test.integration.docker_test_environment.docker_command_executor import (
     DockerCommandExecutor,
 )
@@ -25,7 +28,9 @@ from test.integration.docker_test_environment.test_logger import TestLogger
 import pytest
 
 from exasol.exaslpm.pkg_mgmt.context.context import Context
+from exasol.exaslpm.pkg_mgmt.context.dpkg_status_index import DpkgStatusIndex
 from exasol.exaslpm.pkg_mgmt.context.history_file_manager import HistoryFileManager
+from exasol.exaslpm.pkg_mgmt.context.madison_cache import MadisonCache
 
 pytest_plugins = ["test.integration.package_fixtures"]
 
@@ -132,7 +137,14 @@ def docker_executor_context(
     docker_file_downloader,
     docker_file_access,
     docker_temp_file_provider,
+    docker_container,
+    tmp_path,
 ):
+    # The files of the container are not visible to the indexes of the host,
+    # so they use an empty root directory.
+    # With an empty dpkg status index, no apt package gets skipped,
+    # and without APT package lists, no madison output gets cached.
+    # The APT index tracker inspects the files of the container instead.
     return Context(
         cmd_executor=docker_command_executor,
         history_file_manager=temp_history_file_manager,
@@ -140,4 +152,7 @@ def docker_executor_context(
         file_access=docker_file_access,
         file_downloader=docker_file_downloader,
         temp_file_provider=docker_temp_file_provider,
+        apt_index_tracker=DockerAptIndexTracker(docker_container),
+        dpkg_status_index=DpkgStatusIndex(root=tmp_path / "container_root"),
+        madison_cache=MadisonCache(root=tmp_path / "container_root"),
     )
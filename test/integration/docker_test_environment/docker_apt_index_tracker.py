@@ -0,0 +1,46 @@
+from decimal import Decimal
+from pathlib import Path
+from test.integration.docker_test_environment.docker_test_container import (
+    DockerTestContainer,
+)
+
+from exasol.exaslpm.pkg_mgmt.context.apt_index_tracker import (
+    APT_LISTS_PATH,
+    APT_SOURCE_PATHS,
+    AptIndexTracker,
+)
+
+
+class DockerAptIndexTracker(AptIndexTracker):
+    """
+    Tracks the APT package lists of the test container,
+    whose files are not visible to the file system of the host.
+    """
+
+    def __init__(self, docker_test_container: DockerTestContainer):
+        super().__init__(root=Path("/"))
+        self.docker_test_container = docker_test_container
+
+    def _find(self, paths: list[str], max_depth: int) -> list[str]:
+        # Missing paths let find fail, but the existing ones are still listed
+        _, output = self.docker_test_container.run(
+            ["find", *paths, "-maxdepth", str(max_depth), "-printf", r"%p %s %T@\n"],
+            check_exit_code=False,
+        )
+        return sorted(output.splitlines())
+
+    def _fingerprint(self) -> list[tuple[str, int, int]]:
+        source_paths = [str(self.root / path) for path in APT_SOURCE_PATHS]
+        lines = self._find(source_paths, max_depth=1) + self._find(
+            [str(self.root / APT_LISTS_PATH)], max_depth=0
+        )
+        fingerprint = []
+        for line in lines:
+            path, _, rest = line.partition(" ")
+            size, _, mtime = rest.partition(" ")
+            # Skips the error messages of find, which are part of the output
+            if size.isdigit() and mtime.replace(".", "", 1).isdigit():
+                fingerprint.append(
+                    (path, int(size), int(Decimal(mtime) * 1_000_000_000))
+                )
+        return fingerprint
@@ -1,6 +1,7 @@
 import threading
 import time
 from collections import deque
+from collections.abc import Sequence
 from test.integration.docker_test_environment.docker_test_container import (
     DockerTestContainer,
 )
@@ -97,3 +98,15 @@ class DockerCommandExecutor:
             stderr=stream_splitter.stderr_iter,
             logger=self._log,
         )
+
+    def run_many(
+        self,
+        cmds: Sequence[tuple[list[str], dict[str, str] | None]],
+        max_parallel: int | None = None,
+    ) -> list[int]:
+        return_codes = []
+        for cmd_args, env in cmds:
+            cmd_result = self.execute(cmd_args, env)
+            cmd_result.print_results()
+            return_codes.append(cmd_result.return_code())
+        return return_codes
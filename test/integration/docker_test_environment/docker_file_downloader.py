@@ -1,8 +1,12 @@
 import contextlib
+import hashlib
 import os
 import secrets
 import time
-from collections.abc import Iterator
+from collections.abc import (
+    Iterable,
+    Iterator,
+)
 from pathlib import Path
 from test.integration.docker_test_environment.docker_test_container import (
     DockerTestContainer,
@@ -10,6 +14,8 @@ from test.integration.docker_test_environment.docker_test_container import (
 
 import requests
 
+from exasol.exaslpm.pkg_mgmt.context.file_downloader import Download
+
 
 class DockerFileDownloader:
 
@@ -24,9 +30,21 @@ class DockerFileDownloader:
         return f"{prefix}{ts}-{pid}-{rnd}{suffix}"
 
     @contextlib.contextmanager
-    def download_file_to_tmp(self, url: str, timeout_in_seconds=30) -> Iterator[Path]:
+    def prefetch(self, downloads: Iterable[Download]) -> Iterator[None]:
+        yield
+
+    @contextlib.contextmanager
+    def download_file_to_tmp(
+        self,
+        url: str,
+        timeout_in_seconds=30,
+        cache: bool = True,
+        sha256: str | None = None,
+    ) -> Iterator[Path]:
         p = Path("/tmp") / self._make_unique_filename("download", "int-test")
         r = requests.get(url, timeout=timeout_in_seconds)
+        if sha256 is not None:
+            assert hashlib.sha256(r.content).hexdigest() == sha256.lower()
         self.docker_test_container.make_and_upload_file(
             target_path_in_container=p.parent,
             file_name=p.name,
@@ -0,0 +1,52 @@
+from test.integration.docker_test_environment.docker_test_container import (
+    DockerTestContainer,
+)
+from test.integration.docker_test_environment.test_logger import StringMatchCounter
+
+from exasol.exaslpm.pkg_mgmt.context.context import Context
+from exasol.exaslpm.pkg_mgmt.install_apt_packages import run_apt_update
+
+
+def test_up_to_date_after_update(
+    docker_container: DockerTestContainer, docker_executor_context: Context
+):
+    run_apt_update(docker_executor_context)
+    assert docker_executor_context.apt_index_tracker.is_up_to_date()
+
+
+def test_added_source_list_requires_update(
+    docker_container: DockerTestContainer, docker_executor_context: Context
+):
+    run_apt_update(docker_executor_context)
+    docker_container.make_and_upload_file(
+        "/etc/apt/sources.list.d",
+        "new.list",
+        b"deb http://archive.ubuntu.com/ubuntu noble universe\n",
+    )
+    assert not docker_executor_context.apt_index_tracker.is_up_to_date()
+
+
+def test_removed_lists_require_update(
+    docker_container: DockerTestContainer, docker_executor_context: Context
+):
+    run_apt_update(docker_executor_context)
+    docker_container.run(["bash", "-c", "rm -rf /var/lib/apt/lists/*"])
+    assert not docker_executor_context.apt_index_tracker.is_up_to_date()
+
+
+def test_second_update_after_repo_added(
+    docker_container: DockerTestContainer, docker_executor_context: Context
+):
+    skip_counter = StringMatchCounter("Skipping apt-get update")
+    docker_executor_context.cmd_logger.info_callback = skip_counter.log
+    run_apt_update(docker_executor_context)
+    run_apt_update(docker_executor_context)
+    assert skip_counter.result == 1
+    docker_container.make_and_upload_file(
+        "/etc/apt/sources.list.d",
+        "new.list",
+        b"deb http://archive.ubuntu.com/ubuntu noble universe\n",
+    )
+    run_apt_update(docker_executor_context)
+    assert skip_counter.result == 1
+    assert docker_executor_context.apt_index_tracker.is_up_to_date()
@@ -10,6 +10,8 @@ from _pytest.monkeypatch import MonkeyPatch
 
 import exasol.exaslpm.cli as cli
 import exasol.exaslpm.cli.install as install_cli_mod
+from exasol.exaslpm.pkg_mgmt.context.install_options import InstallOptions
+from exasol.exaslpm.pkg_mgmt.context.tracer import TraceFormat
 
 
 @pytest.fixture
@@ -63,3 +65,224 @@ def test_mock_all_options(
             mock_context,
         )
     ]
+
+
+@pytest.fixture
+def mock_make_context(monkeypatch: MonkeyPatch) -> MagicMock:
+    mock_function_to_mock = MagicMock()
+    monkeypatch.setattr(install_cli_mod, "make_context", mock_function_to_mock)
+    return mock_function_to_mock
+
+
+def test_conda_lock_dir(
+    cliRunner, mock_install_packages, some_package_file, mock_make_context, tmp_path
+):
+    ret = cliRunner.run(
+        "--package-file",
+        some_package_file,
+        "--build-step",
+        "udf_client",
+        "--conda-lock-dir",
+        str(tmp_path),
+    )
+    assert ret.succeeded
+
+    assert mock_make_context.mock_calls == [
+        mock.call(InstallOptions(conda_lock_dir=tmp_path))
+    ]
+
+
+def test_download_cache(
+    cliRunner, mock_install_packages, some_package_file, mock_make_context, tmp_path
+):
+    ret = cliRunner.run(
+        "--package-file",
+        some_package_file,
+        "--build-step",
+        "udf_client",
+        "--download-cache-dir",
+        str(tmp_path),
+        "--download-cache-max-size",
+        "10",
+    )
+    assert ret.succeeded
+
+    assert mock_make_context.mock_calls == [
+        mock.call(
+            InstallOptions(download_cache_dir=tmp_path, download_cache_max_size_mb=10)
+        )
+    ]
+
+
+def test_download_parallel_ranges(
+    cliRunner, mock_install_packages, some_package_file, mock_make_context
+):
+    ret = cliRunner.run(
+        "--package-file",
+        some_package_file,
+        "--build-step",
+        "udf_client",
+        "--download-parallel-ranges",
+        "4",
+    )
+    assert ret.succeeded
+
+    assert mock_make_context.mock_calls == [
+        mock.call(InstallOptions(download_parallel_ranges=4))
+    ]
+
+
+def test_command_report(
+    cliRunner, mock_install_packages, some_package_file, mock_make_context, tmp_path
+):
+    ret = cliRunner.run(
+        "--package-file",
+        some_package_file,
+        "--build-step",
+        "udf_client",
+        "--command-report-file",
+        str(tmp_path / "report.json"),
+        "--command-report-stream-file",
+        str(tmp_path / "report.jsonl"),
+    )
+    assert ret.succeeded
+
+    assert mock_make_context.mock_calls == [
+        mock.call(
+            InstallOptions(
+                command_report_file=tmp_path / "report.json",
+                command_report_stream_file=tmp_path / "report.jsonl",
+            )
+        )
+    ]
+
+
+@pytest.mark.parametrize(
+    "trace_format, expected_trace_format",
+    [("chrome", TraceFormat.Chrome), ("Otlp", TraceFormat.Otlp)],
+)
+def test_trace(
+    cliRunner,
+    mock_install_packages,
+    some_package_file,
+    mock_make_context,
+    tmp_path,
+    trace_format,
+    expected_trace_format,
+):
+    ret = cliRunner.run(
+        "--package-file",
+        some_package_file,
+        "--build-step",
+        "udf_client",
+        "--trace-file",
+        str(tmp_path / "trace.json"),
+        "--trace-format",
+        trace_format,
+    )
+    assert ret.succeeded
+
+    assert mock_make_context.mock_calls == [
+        mock.call(
+            InstallOptions(
+                trace_file=tmp_path / "trace.json",
+                trace_format=expected_trace_format,
+            )
+        )
+    ]
+
+
+def test_madison_cache(
+    cliRunner, mock_install_packages, some_package_file, mock_make_context, tmp_path
+):
+    ret = cliRunner.run(
+        "--package-file",
+        some_package_file,
+        "--build-step",
+        "udf_client",
+        "--madison-cache-file",
+        str(tmp_path / "madison.json"),
+        "--resolve-apt-wildcards-from-lists",
+    )
+    assert ret.succeeded
+
+    assert mock_make_context.mock_calls == [
+        mock.call(
+            InstallOptions(
+                madison_cache_file=tmp_path / "madison.json",
+                resolve_apt_wildcards_from_lists=True,
+            )
+        )
+    ]
+
+
+def test_apt_parallel_downloads(
+    cliRunner, mock_install_packages, some_package_file, mock_make_context
+):
+    ret = cliRunner.run(
+        "--package-file",
+        some_package_file,
+        "--build-step",
+        "udf_client",
+        "--apt-parallel-downloads",
+        "8",
+    )
+    assert ret.succeeded
+
+    assert mock_make_context.mock_calls == [
+        mock.call(InstallOptions(apt_parallel_downloads=8))
+    ]
+
+
+def test_pip_wheelhouse(
+    cliRunner, mock_install_packages, some_package_file, mock_make_context, tmp_path
+):
+    ret = cliRunner.run(
+        "--package-file",
+        some_package_file,
+        "--build-step",
+        "udf_client",
+        "--pip-wheelhouse-dir",
+        str(tmp_path),
+    )
+    assert ret.succeeded
+
+    assert mock_make_context.mock_calls == [
+        mock.call(InstallOptions(pip_wheelhouse_dir=tmp_path))
+    ]
+
+
+def test_pip_parallel_builds(
+    cliRunner, mock_install_packages, some_package_file, mock_make_context
+):
+    ret = cliRunner.run(
+        "--package-file",
+        some_package_file,
+        "--build-step",
+        "udf_client",
+        "--pip-parallel-builds",
+        "8",
+    )
+    assert ret.succeeded
+
+    assert mock_make_context.mock_calls == [
+        mock.call(InstallOptions(pip_parallel_builds=8))
+    ]
+
+
+def test_ccache_dir(
+    cliRunner, mock_install_packages, some_package_file, mock_make_context, tmp_path
+):
+    ret = cliRunner.run(
+        "--package-file",
+        some_package_file,
+        "--build-step",
+        "udf_client",
+        "--ccache-dir",
+        str(tmp_path),
+    )
+    assert ret.succeeded
+
+    assert mock_make_context.mock_calls == [
+        mock.call(InstallOptions(ccache_dir=tmp_path))
+    ]
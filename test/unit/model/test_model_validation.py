@@ -11,6 +11,7 @@ from exasol.exaslpm.model.package_file_config import (
     AptPackage,
     AptRepo,
     Bazel,
+    BuildToolsProfile,
     CondaBinary,
     Micromamba,
     PackageFile,
@@ -279,6 +280,69 @@ def test_valid_package_installer_pip_name():
     assert pip.install_build_tools_ephemerally is True
 
 
+def test_valid_package_installer_pip_build_tools():
+    yaml_file = """
+    build_steps:
+      - name: build_step_one
+        phases:
+          - name: phase_one
+            pip:
+                packages:
+                - name: scipy
+                  version: 1.13.0
+                install_build_tools_ephemerally: True
+                build_tools_profile: Scientific
+                build_tools:
+                - libhdf5-dev
+    """
+    yaml_data = yaml.safe_load(yaml_file)
+    model = PackageFile.model_validate(yaml_data)
+    pip = model.find_build_step("build_step_one").find_phase("phase_one").pip
+
+    assert pip.build_tools_profile == BuildToolsProfile.Scientific
+    assert pip.build_tools == ["libhdf5-dev"]
+
+
+def test_pip_build_tools_unknown_profile():
+    yaml_file = """
+    build_steps:
+      - name: build_step_one
+        phases:
+          - name: phase_one
+            pip:
+                packages:
+                - name: scipy
+                  version: 1.13.0
+                install_build_tools_ephemerally: True
+                build_tools_profile: Unknown
+    """
+    yaml_data = yaml.safe_load(yaml_file)
+    with pytest.raises(ValidationError, match="build_tools_profile"):
+        PackageFile.model_validate(yaml_data)
+
+
+@pytest.mark.parametrize(
+    "build_tools_entry",
+    ["build_tools_profile: Scientific", "build_tools: [gfortran]"],
+)
+def test_pip_build_tools_without_ephemeral_build_tools(build_tools_entry):
+    yaml_file = f"""
+    build_steps:
+      - name: build_step_one
+        phases:
+          - name: phase_one
+            pip:
+                packages:
+                - name: scipy
+                  version: 1.13.0
+                {build_tools_entry}
+    """
+    yaml_data = yaml.safe_load(yaml_file)
+    expected_error = "build_tools_profile and build_tools require install_build_tools_ephemerally. at [<PackageFile root> -> <Build-Step 'build_step_one'> -> <Phase 'phase_one'> -> <PipPackages>]"
+    with pytest.raises(PackageFileValidationError, match=re.escape(expected_error)):
+        PackageFile.model_validate(yaml_data)
+
+
 def test_valid_package_installer_pip_url():
     yaml_file = """
     build_steps:
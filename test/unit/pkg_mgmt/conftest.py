@@ -8,17 +8,20 @@ from unittest.mock import MagicMock
 
 import pytest
 
+from exasol.exaslpm.pkg_mgmt.context.apt_index_tracker import AptIndexTracker
 from exasol.exaslpm.pkg_mgmt.context.cmd_executor import (
     CommandExecutor,
     CommandResult,
 )
 from exasol.exaslpm.pkg_mgmt.context.cmd_logger import CommandLogger
 from exasol.exaslpm.pkg_mgmt.context.context import Context
+from exasol.exaslpm.pkg_mgmt.context.dpkg_status_index import DpkgStatusIndex
 from exasol.exaslpm.pkg_mgmt.context.file_access import FileAccess
+from exasol.exaslpm.pkg_mgmt.context.madison_cache import MadisonCache
 
 
 @pytest.fixture
-def context_mock():
+def context_mock(tmp_path):
     mock_logger = MagicMock(spec=CommandLogger)
     mock_executor = MagicMock(spec=CommandExecutor)
     mock_history_file_manager = HistoryFileManagerMock()
@@ -37,4 +40,7 @@ def context_mock():
         file_access=mock_file_access,
         file_downloader=mock_file_downloader,
         temp_file_provider=mock_temp_file_provider,
+        apt_index_tracker=AptIndexTracker(root=tmp_path / "root"),
+        dpkg_status_index=DpkgStatusIndex(root=tmp_path / "root"),
+        madison_cache=MadisonCache(root=tmp_path / "root"),
     )
@@ -1,5 +1,8 @@
 import contextlib
-from collections.abc import Iterator
+from collections.abc import (
+    Iterable,
+    Iterator,
+)
 from io import (
     StringIO,
     TextIOBase,
@@ -8,6 +11,7 @@ from pathlib import Path
 from unittest.mock import MagicMock
 
 from exasol.exaslpm.model.package_file_config import BuildStep
+from exasol.exaslpm.pkg_mgmt.context.file_downloader import Download
 
 
 class FileDownloaderMock:
@@ -19,11 +23,19 @@ class FileDownloaderMock:
 
     def __init__(self, path: Path) -> None:
         self.mock = MagicMock()
+        self.prefetch_mock = MagicMock()
         self.mock_path = path
 
     @contextlib.contextmanager
-    def download_file_to_tmp(self, url: str, timeout_in_seconds=30) -> Iterator[Path]:
-        self.mock(url=url, timeout_in_seconds=timeout_in_seconds)
+    def prefetch(self, downloads: Iterable[Download]) -> Iterator[None]:
+        self.prefetch_mock(list(downloads))
+        yield
+
+    @contextlib.contextmanager
+    def download_file_to_tmp(
+        self, url: str, timeout_in_seconds=30, **kwargs
+    ) -> Iterator[Path]:
+        self.mock(url=url, timeout_in_seconds=timeout_in_seconds, **kwargs)
         yield self.mock_path
 
 
@@ -43,6 +55,10 @@ class HistoryFileManagerMock:
     def add_build_step_to_history(self, build_step: BuildStep) -> None:
         self.mock.add_build_step_to_history(build_step)
 
+    def add_conda_lock_file(self, lock_file_name: str, content: str) -> Path:
+        self.mock.add_conda_lock_file(lock_file_name, content)
+        return Path("path/to/history/conda_lock_files") / lock_file_name
+
     def get_all_previous_build_step_names(self) -> set[str]:
         return {build_step.name for build_step in self.build_steps}
 
@@ -0,0 +1,105 @@
+import re
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+from exasol.exaslpm.model.package_file_config import (
+    AptPackages,
+    BuildStep,
+    Phase,
+    Pip,
+    Tools,
+)
+from exasol.exaslpm.pkg_mgmt.search.search_cache import (
+    BuildStepSearch,
+    SearchCache,
+)
+
+PREVIOUS_BUILD_STEP = BuildStep(
+    name="previous",
+    phases=[
+        Phase(
+            name="python",
+            tools=Tools(python_binary_path=Path("/usr/bin/python3")),
+            variables={"A": "1"},
+        ),
+    ],
+)
+
+CURRENT_BUILD_STEP = BuildStep(
+    name="current",
+    phases=[
+        Phase(name="phase-1", tools=Tools(pip=Pip(version="25.5"))),
+        Phase(name="phase-2", apt=AptPackages(packages=[]), variables={"B": "2"}),
+        Phase(name="phase-3", apt=AptPackages(packages=[])),
+    ],
+)
+
+
+@pytest.fixture
+def context_with_history(context_mock):
+    context_mock.history_file_manager.build_steps = [PREVIOUS_BUILD_STEP]
+    return context_mock
+
+
+def _process_all_phases(build_step_search: BuildStepSearch) -> list[SearchCache]:
+    search_caches = []
+    for phase in CURRENT_BUILD_STEP.phases:
+        search_caches.append(build_step_search.search_cache(phase))
+        build_step_search.advance(phase)
+    return search_caches
+
+
+def test_loads_history_once(context_with_history, monkeypatch):
+    history_file_manager = context_with_history.history_file_manager
+    get_all_previous_build_steps = MagicMock(
+        wraps=history_file_manager.get_all_previous_build_steps
+    )
+    monkeypatch.setattr(
+        history_file_manager,
+        "get_all_previous_build_steps",
+        get_all_previous_build_steps,
+    )
+
+    _process_all_phases(BuildStepSearch(CURRENT_BUILD_STEP, context_with_history))
+
+    assert get_all_previous_build_steps.call_count == 1
+
+
+@pytest.mark.parametrize("phase_idx", [0, 1, 2])
+def test_equals_search_cache(context_with_history, phase_idx):
+    search_caches = _process_all_phases(
+        BuildStepSearch(CURRENT_BUILD_STEP, context_with_history)
+    )
+    phase = CURRENT_BUILD_STEP.phases[phase_idx]
+    expected = SearchCache(CURRENT_BUILD_STEP, phase, context_with_history)
+
+    assert search_caches[phase_idx].all_phases == expected.all_phases
+    assert search_caches[phase_idx].all_variables == expected.all_variables
+    assert search_caches[phase_idx].python_binary_path == expected.python_binary_path
+
+
+def test_search_cache_does_not_see_later_phases(context_with_history):
+    search_caches = _process_all_phases(
+        BuildStepSearch(CURRENT_BUILD_STEP, context_with_history)
+    )
+
+    assert search_caches[0].all_variables == {"A": "1"}
+    assert search_caches[2].all_variables == {"A": "1", "B": "2"}
+    with pytest.raises(ValueError, match="Pip not found"):
+        search_caches[0].pip
+    assert search_caches[1].pip == Pip(version="25.5")
+
+
+@pytest.mark.parametrize("phase_idx", [1, 2])
+def test_raises_if_phase_is_not_next(context_with_history, phase_idx):
+    build_step_search = BuildStepSearch(CURRENT_BUILD_STEP, context_with_history)
+    phase = CURRENT_BUILD_STEP.phases[phase_idx]
+    with pytest.raises(
+        ValueError,
+        match=re.escape(
+            f"Phase '{phase.name}' is not the next phase of build step 'current'"
+        ),
+    ):
+        build_step_search.search_cache(phase)
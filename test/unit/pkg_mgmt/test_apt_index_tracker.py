@@ -0,0 +1,60 @@
+import shutil
+
+import pytest
+
+from exasol.exaslpm.pkg_mgmt.context.apt_index_tracker import AptIndexTracker
+
+
+@pytest.fixture
+def root(tmp_path):
+    root = tmp_path / "root"
+    (root / "etc" / "apt" / "sources.list.d").mkdir(parents=True)
+    (root / "etc" / "apt" / "sources.list").write_text("deb some_mirror")
+    (root / "usr" / "share" / "keyrings").mkdir(parents=True)
+    (root / "var" / "lib" / "apt" / "lists").mkdir(parents=True)
+    return root
+
+
+def test_not_up_to_date_before_update(root):
+    assert not AptIndexTracker(root).is_up_to_date()
+
+
+def test_up_to_date_after_update(root):
+    tracker = AptIndexTracker(root)
+    tracker.mark_updated()
+    assert tracker.is_up_to_date()
+
+
+def test_new_source_list(root):
+    tracker = AptIndexTracker(root)
+    tracker.mark_updated()
+    (root / "etc" / "apt" / "sources.list.d" / "some_ppa.list").write_text("deb ppa")
+    assert not tracker.is_up_to_date()
+
+
+def test_changed_source_list(root):
+    tracker = AptIndexTracker(root)
+    tracker.mark_updated()
+    (root / "etc" / "apt" / "sources.list").write_text("deb other_mirror")
+    assert not tracker.is_up_to_date()
+
+
+def test_new_key(root):
+    tracker = AptIndexTracker(root)
+    tracker.mark_updated()
+    (root / "usr" / "share" / "keyrings" / "some_ppa.gpg").write_text("key")
+    assert not tracker.is_up_to_date()
+
+
+def test_removed_lists(root):
+    tracker = AptIndexTracker(root)
+    tracker.mark_updated()
+    shutil.rmtree(root / "var" / "lib" / "apt" / "lists")
+    assert not tracker.is_up_to_date()
+
+
+def test_invalidate(root):
+    tracker = AptIndexTracker(root)
+    tracker.mark_updated()
+    tracker.invalidate()
+    assert not tracker.is_up_to_date()
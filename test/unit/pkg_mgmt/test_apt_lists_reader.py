@@ -0,0 +1,75 @@
+import gzip
+import lzma
+
+import pytest
+
+from exasol.exaslpm.pkg_mgmt.search.apt_lists_reader import read_madison_lines
+
+MAIN_PACKAGES = b"""Package: curl
+Architecture: amd64
+Version: 7.81.0-1
+Description: command line tool
+
+Package: gpg
+Architecture: amd64
+Version: 2.2.27-3ubuntu2
+"""
+
+UPDATES_PACKAGES = b"""Package: curl
+Architecture: amd64
+Version: 7.81.0-1ubuntu1.16
+
+Package: curl
+Architecture: amd64
+Version: 7.81.0-1ubuntu1.4
+"""
+
+MAIN_LIST = "archive.ubuntu.com_ubuntu_dists_jammy_main_binary-amd64_Packages"
+UPDATES_LIST = (
+    "archive.ubuntu.com_ubuntu_dists_jammy-updates_main_binary-amd64_Packages"
+)
+
+
+@pytest.fixture
+def lists_dir(tmp_path):
+    lists_dir = tmp_path / "lists"
+    lists_dir.mkdir()
+    (lists_dir / MAIN_LIST).write_bytes(MAIN_PACKAGES)
+    (lists_dir / f"{UPDATES_LIST}.gz").write_bytes(gzip.compress(UPDATES_PACKAGES))
+    (lists_dir / "archive.ubuntu.com_ubuntu_dists_jammy_InRelease").write_bytes(
+        b"Package: curl\nVersion: 99\n"
+    )
+    (lists_dir / "partial").mkdir()
+    return lists_dir
+
+
+def test_read_madison_lines(lists_dir):
+    assert read_madison_lines(["curl", "vim"], lists_dir) == {
+        "curl": [
+            f"curl | 7.81.0-1ubuntu1.16 | {UPDATES_LIST}.gz\n",
+            f"curl | 7.81.0-1ubuntu1.4 | {UPDATES_LIST}.gz\n",
+            f"curl | 7.81.0-1 | {MAIN_LIST}\n",
+        ]
+    }
+
+
+def test_read_madison_lines_xz(lists_dir):
+    (lists_dir / MAIN_LIST).unlink()
+    (lists_dir / f"{MAIN_LIST}.xz").write_bytes(lzma.compress(MAIN_PACKAGES))
+    assert read_madison_lines(["gpg"], lists_dir) == {
+        "gpg": [f"gpg | 2.2.27-3ubuntu2 | {MAIN_LIST}.xz\n"]
+    }
+
+
+def test_read_madison_lines_unsupported_compression(lists_dir):
+    (lists_dir / f"{MAIN_LIST}.lz4").write_bytes(b"lz4")
+    assert read_madison_lines(["curl"], lists_dir) is None
+
+
+def test_read_madison_lines_corrupt_file(lists_dir):
+    (lists_dir / f"{UPDATES_LIST}.gz").write_bytes(b"no gzip")
+    assert read_madison_lines(["curl"], lists_dir) is None
+
+
+def test_read_madison_lines_missing_lists_dir(tmp_path):
+    assert read_madison_lines(["curl"], tmp_path / "lists") is None
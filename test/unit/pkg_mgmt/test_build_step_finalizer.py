@@ -0,0 +1,47 @@
+from unittest.mock import (
+    MagicMock,
+    call,
+)
+
+import pytest
+
+from exasol.exaslpm.pkg_mgmt.context.build_step_finalizer import BuildStepFinalizer
+
+
+def test_run_deduplicates_actions():
+    actions = MagicMock()
+    finalizer = BuildStepFinalizer()
+    finalizer.register("ldconfig", actions.ldconfig)
+    finalizer.register("locale-gen", actions.locale_gen)
+    finalizer.register("ldconfig", actions.other_ldconfig)
+    finalizer.run()
+    assert actions.mock_calls == [call.ldconfig(), call.locale_gen()]
+
+
+def test_run_removes_actions():
+    action = MagicMock()
+    finalizer = BuildStepFinalizer()
+    finalizer.register("ldconfig", action)
+    finalizer.run()
+    finalizer.run()
+    assert action.call_count == 1
+    assert finalizer.pending == []
+
+
+def test_failed_action_stays_registered():
+    actions = MagicMock()
+    actions.ldconfig.side_effect = [RuntimeError("failed"), None]
+    finalizer = BuildStepFinalizer()
+    finalizer.register("locale-gen", actions.locale_gen)
+    finalizer.register("ldconfig", actions.ldconfig)
+    finalizer.register("update-locale", actions.update_locale)
+    with pytest.raises(RuntimeError):
+        finalizer.run()
+    assert finalizer.pending == ["ldconfig", "update-locale"]
+    finalizer.run()
+    assert actions.mock_calls == [
+        call.locale_gen(),
+        call.ldconfig(),
+        call.ldconfig(),
+        call.update_locale(),
+    ]
@@ -0,0 +1,118 @@
+from unittest.mock import (
+    MagicMock,
+    call,
+)
+
+import pytest
+
+from exasol.exaslpm.pkg_mgmt.context.build_tools_lifecycle import BuildToolsLifecycle
+
+BUILD_ESSENTIAL = ["build-essential", "pkg-config"]
+
+
+def test_use_outside_session_installs_and_removes():
+    actions = MagicMock()
+    build_tools = BuildToolsLifecycle()
+    with build_tools.use(BUILD_ESSENTIAL, actions.install, actions.remove):
+        assert build_tools.packages == BUILD_ESSENTIAL
+    with build_tools.use(BUILD_ESSENTIAL, actions.install, actions.remove):
+        pass
+    assert actions.mock_calls == [
+        call.install(BUILD_ESSENTIAL),
+        call.remove(BUILD_ESSENTIAL),
+        call.install(BUILD_ESSENTIAL),
+        call.remove(BUILD_ESSENTIAL),
+    ]
+    assert not build_tools.installed
+
+
+def test_nested_use_installs_once():
+    actions = MagicMock()
+    build_tools = BuildToolsLifecycle()
+    with build_tools.use(BUILD_ESSENTIAL, actions.install, actions.remove):
+        with build_tools.use(BUILD_ESSENTIAL, actions.install, actions.remove):
+            pass
+        assert actions.mock_calls == [call.install(BUILD_ESSENTIAL)]
+    assert actions.mock_calls == [
+        call.install(BUILD_ESSENTIAL),
+        call.remove(BUILD_ESSENTIAL),
+    ]
+
+
+def test_use_installs_only_missing_packages():
+    actions = MagicMock()
+    build_tools = BuildToolsLifecycle()
+    with build_tools.session():
+        with build_tools.use(BUILD_ESSENTIAL, actions.install, actions.remove):
+            pass
+        with build_tools.use(
+            ["build-essential", "gfortran", "gfortran"],
+            actions.install,
+            actions.remove,
+        ):
+            pass
+    assert actions.mock_calls == [
+        call.install(BUILD_ESSENTIAL),
+        call.install(["gfortran"]),
+        call.remove(["build-essential", "pkg-config", "gfortran"]),
+    ]
+
+
+def test_session_keeps_build_tools_until_removed():
+    actions = MagicMock()
+    build_tools = BuildToolsLifecycle()
+    with build_tools.session():
+        with build_tools.use(BUILD_ESSENTIAL, actions.install, actions.remove):
+            pass
+        with build_tools.use(BUILD_ESSENTIAL, actions.install, actions.remove):
+            pass
+        assert actions.mock_calls == [call.install(BUILD_ESSENTIAL)]
+        build_tools.remove_unused()
+        with build_tools.use(BUILD_ESSENTIAL, actions.install, actions.remove):
+            pass
+    assert actions.mock_calls == [
+        call.install(BUILD_ESSENTIAL),
+        call.remove(BUILD_ESSENTIAL),
+        call.install(BUILD_ESSENTIAL),
+        call.remove(BUILD_ESSENTIAL),
+    ]
+
+
+def test_remove_unused_keeps_used_build_tools():
+    actions = MagicMock()
+    build_tools = BuildToolsLifecycle()
+    with build_tools.session():
+        with build_tools.use(BUILD_ESSENTIAL, actions.install, actions.remove):
+            build_tools.remove_unused()
+            assert build_tools.installed
+    assert actions.mock_calls == [
+        call.install(BUILD_ESSENTIAL),
+        call.remove(BUILD_ESSENTIAL),
+    ]
+
+
+def test_session_removes_build_tools_on_failure():
+    actions = MagicMock()
+    build_tools = BuildToolsLifecycle()
+    with pytest.raises(RuntimeError):
+        with build_tools.session():
+            with build_tools.use(BUILD_ESSENTIAL, actions.install, actions.remove):
+                raise RuntimeError("failed")
+    assert actions.mock_calls == [
+        call.install(BUILD_ESSENTIAL),
+        call.remove(BUILD_ESSENTIAL),
+    ]
+    assert not build_tools.installed
+
+
+def test_failed_install_gets_removed():
+    actions = MagicMock()
+    actions.install.side_effect = RuntimeError("failed")
+    build_tools = BuildToolsLifecycle()
+    with pytest.raises(RuntimeError):
+        with build_tools.use(BUILD_ESSENTIAL, actions.install, actions.remove):
+            pass
+    assert actions.mock_calls == [
+        call.install(BUILD_ESSENTIAL),
+        call.remove(BUILD_ESSENTIAL),
+    ]
@@ -1,7 +1,10 @@
+import asyncio
 import contextlib
 import os
 import subprocess
 import sys
+import time
+from pathlib import Path
 from test.unit.pkg_mgmt.utils import _named_params
 from unittest.mock import (
     MagicMock,
@@ -14,6 +17,7 @@ from exasol.exaslpm.pkg_mgmt.context.cmd_executor import (
     CommandExecutor,
     CommandLogger,
     CommandResult,
+    _LineSplitter,
 )
 
 
@@ -32,6 +36,7 @@ def mock_command_result(logger: CommandLogger):
 @pytest.fixture
 def mock_popen(monkeypatch):
     mock_popen = MagicMock()
+    mock_popen.return_value.returncode = 10
     monkeypatch.setattr(subprocess, "Popen", mock_popen)
     return mock_popen
 
@@ -46,12 +51,9 @@ def test_command_executor(mock_popen, env_variables):
     result = executor.execute(["cmd1", "cmd2"], env=env_variables)
     ret_code = result.return_code()
     assert mock_popen.mock_calls == [
-        call(["cmd1", "cmd2"], stdout=-1, stderr=-1, text=True, env=env_variables),
-        call().stdout.__iter__(),
-        call().stderr.__iter__(),
-        call().wait(),
+        call(["cmd1", "cmd2"], stdout=-1, stderr=-1, env=env_variables),
     ]
-    assert ret_code == mock_popen.return_value.wait.return_value
+    assert ret_code == 10
 
 
 @contextlib.contextmanager
@@ -168,12 +170,9 @@ def test_command_executor_ld_library_path(
         result = executor.execute(["cmd1"], env=input_env_variables)
         ret_code = result.return_code()
         assert mock_popen.mock_calls == [
-            call(["cmd1"], stdout=-1, stderr=-1, text=True, env=expected_env),
-            call().stdout.__iter__(),
-            call().stderr.__iter__(),
-            call().wait(),
+            call(["cmd1"], stdout=-1, stderr=-1, env=expected_env),
         ]
-        assert ret_code == mock_popen.return_value.wait.return_value
+        assert ret_code == 10
 
 
 def test_command_results():
@@ -207,3 +206,193 @@ def test_protocol_logger():
         call("stderr line 2"),
         call("stderr line 3"),
     ]
+
+
+def test_pipe_command_result_consume_results():
+    executor = CommandExecutor(MagicMock(spec=CommandLogger))
+    result = executor.execute(
+        [
+            sys.executable,
+            "-c",
+            "import sys; "
+            "sys.stdout.write('line 1\\nline 2\\r\\nlast line without newline'); "
+            "sys.stderr.write('error \u00e4\\n'); "
+            "sys.exit(3)",
+        ]
+    )
+    stdout_consumer = MagicMock()
+    stderr_consumer = MagicMock()
+    ret_code = result.consume_results(stdout_consumer, stderr_consumer)
+    assert stdout_consumer.mock_calls == [
+        call("line 1\n"),
+        call("line 2\n"),
+        call("last line without newline"),
+    ]
+    assert stderr_consumer.mock_calls == [call("error \u00e4\n")]
+    assert ret_code == 3
+
+
+def test_pipe_command_result_print_results():
+    logger = MagicMock(spec=CommandLogger)
+    executor = CommandExecutor(logger)
+    result = executor.execute(
+        [sys.executable, "-c", "print('line 1'); print('line 2')"]
+    )
+    result.print_results()
+    messages = [c.args[0] for c in logger.info.mock_calls]
+    assert messages[0] == (
+        f"Executing: {sys.executable} -c print('line 1'); print('line 2')"
+    )
+    # The lines get logged in one call per read, which depends on the timing of the pipe
+    assert "".join(messages[1:-1]) == "line 1\nline 2\n"
+    assert messages[-1] == "Return Code: 0"
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 100])
+def test_line_splitter_chunk_boundaries(chunk_size):
+    data = "first \u00e4\u20ac\r\nsecond\rthird\n\nlast".encode()
+    lines = []
+    splitter = _LineSplitter(lines.extend)
+    for i in range(0, len(data), chunk_size):
+        splitter.feed(data[i : i + chunk_size])
+    splitter.feed(b"", final=True)
+    assert lines == ["first \u00e4\u20ac\n", "second\n", "third\n", "\n", "last"]
+
+
+class CollectingLogger:
+    def __init__(self):
+        self.calls = 0
+        self.info_msgs: list[str] = []
+        self.err_msgs: list[str] = []
+
+    def info(self, msg: str, **kwargs) -> None:
+        self.calls += 1
+        self.info_msgs.append(msg)
+
+    def warn(self, msg: str, **kwargs) -> None:
+        self.calls += 1
+
+    def err(self, msg: str, **kwargs) -> None:
+        self.calls += 1
+        self.err_msgs.append(msg)
+
+
+CHATTY_COMMAND = [
+    sys.executable,
+    "-c",
+    "import sys\n"
+    "for i in range(20):\n"
+    "    sys.stdout.write(''.join(f'stdout line {i} {j}\\n' for j in range(10000)))\n"
+    "    sys.stderr.write(''.join(f'stderr line {i} {j}\\n' for j in range(10000)))\n",
+]
+
+
+def _run_with_thread_per_pipe(logger: CollectingLogger) -> None:
+    """
+    Runs the chatty command as CommandExecutor did before PipeCommandResult:
+    text mode pipes, drained by one thread per pipe, one logger call per line.
+    """
+    process = subprocess.Popen(
+        CHATTY_COMMAND, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+    )
+    CommandResult(
+        process.wait, iter(process.stdout), iter(process.stderr), logger
+    ).print_results()
+
+
+def test_chatty_command_batches_logger_calls():
+    thread_per_pipe_logger = CollectingLogger()
+    _run_with_thread_per_pipe(thread_per_pipe_logger)
+    selector_logger = CollectingLogger()
+    CommandExecutor(selector_logger).execute(CHATTY_COMMAND).print_results()
+
+    assert "".join(selector_logger.info_msgs[1:-1]) == "".join(
+        thread_per_pipe_logger.info_msgs[:-1]
+    )
+    assert "".join(selector_logger.err_msgs) == "".join(thread_per_pipe_logger.err_msgs)
+    assert selector_logger.calls < thread_per_pipe_logger.calls / 100
+
+
+def _sleep_and_print_cmd(text: str) -> list[str]:
+    return [sys.executable, "-c", f"import time; time.sleep(0.5); print('{text}')"]
+
+
+def _wait_for_all_started_cmd(text: str, started_dir: Path, count: int) -> list[str]:
+    """
+    Marks the command as started and waits until all commands have started,
+    which only succeeds if they run concurrently.
+    """
+    script = (
+        "import pathlib, sys, time\n"
+        f"started = pathlib.Path({str(started_dir)!r})\n"
+        f"(started / {text!r}).touch()\n"
+        "deadline = time.monotonic() + 10\n"
+        f"while len(list(started.iterdir())) < {count}:\n"
+        "    if time.monotonic() > deadline:\n"
+        "        sys.exit(1)\n"
+        "    time.sleep(0.01)\n"
+        f"print({text!r})\n"
+    )
+    return [sys.executable, "-c", script]
+
+
+def test_run_many_runs_concurrently(tmp_path):
+    logger = CollectingLogger()
+    executor = CommandExecutor(logger)
+    return_codes = executor.run_many(
+        [
+            (_wait_for_all_started_cmd(f"command {i}", tmp_path, 4), None)
+            for i in range(4)
+        ],
+        max_parallel=4,
+    )
+    assert return_codes == [0, 0, 0, 0]
+    assert sorted(msg for msg in logger.info_msgs if msg.startswith("command")) == [
+        "command 0\n",
+        "command 1\n",
+        "command 2\n",
+        "command 3\n",
+    ]
+
+
+def test_run_many_limits_parallelism():
+    executor = CommandExecutor(CollectingLogger())
+    start = time.perf_counter()
+    executor.run_many(
+        [(_sleep_and_print_cmd(f"command {i}"), None) for i in range(2)],
+        max_parallel=1,
+    )
+    assert time.perf_counter() - start >= 1.0
+
+
+def test_run_many_return_codes_and_env():
+    logger = CollectingLogger()
+    executor = CommandExecutor(logger)
+    return_codes = executor.run_many(
+        [
+            ([sys.executable, "-c", "import sys; sys.exit(2)"], None),
+            (
+                [sys.executable, "-c", "import os; print(os.environ['SOME_VAR'])"],
+                {"SOME_VAR": "some value"},
+            ),
+        ]
+    )
+    assert return_codes == [2, 0]
+    assert "some value\n" in logger.info_msgs
+
+
+def test_execute_async_streams_output():
+    logger = CollectingLogger()
+    executor = CommandExecutor(logger)
+    ret_code = asyncio.run(
+        executor.execute_async(
+            [
+                sys.executable,
+                "-c",
+                "import sys; print('out'); print('err', file=sys.stderr)",
+            ]
+        )
+    )
+    assert ret_code == 0
+    assert logger.info_msgs[1:] == ["out\n", "Return Code: 0"]
+    assert logger.err_msgs == ["err\n"]
@@ -0,0 +1,134 @@
+import json
+import sys
+from unittest.mock import MagicMock
+
+from exasol.exaslpm.pkg_mgmt.context.cmd_executor import (
+    CommandExecutor,
+    CommandLogger,
+)
+from exasol.exaslpm.pkg_mgmt.context.command_recorder import (
+    CommandRecord,
+    CommandRecorder,
+)
+from exasol.exaslpm.pkg_mgmt.context.tracer import Tracer
+
+
+def _record(cmd: str, wall_time_seconds: float = 1.0) -> CommandRecord:
+    return CommandRecord(
+        cmd=[cmd],
+        return_code=0,
+        wall_time_seconds=wall_time_seconds,
+        stdout_bytes=10,
+        stderr_bytes=0,
+        user_cpu_seconds=0.5,
+        sys_cpu_seconds=0.25,
+        max_rss_kb=1000,
+    )
+
+
+def test_disabled_recorder_collects_nothing():
+    recorder = CommandRecorder()
+    recorder.record(_record("cmd"))
+    assert recorder.records == []
+
+
+def test_tags(tmp_path):
+    recorder = CommandRecorder(report_file=tmp_path / "report.json")
+    with recorder.tagged(build_step="step", phase="phase-1"):
+        with recorder.tagged(installer="apt"):
+            recorder.record(_record("cmd1"))
+        recorder.record(_record("cmd2"))
+    recorder.record(_record("cmd3"))
+    assert [r.tags for r in recorder.records] == [
+        {"build_step": "step", "phase": "phase-1", "installer": "apt"},
+        {"build_step": "step", "phase": "phase-1"},
+        {},
+    ]
+
+
+def test_report(tmp_path):
+    report_file = tmp_path / "report.json"
+    recorder = CommandRecorder(report_file=report_file)
+    with recorder.tagged(installer="apt"):
+        recorder.record(_record("cmd1", wall_time_seconds=1.0))
+        recorder.record(_record("cmd2", wall_time_seconds=2.0))
+    with recorder.tagged(installer="pip"):
+        recorder.record(_record("cmd3", wall_time_seconds=4.0))
+    recorder.write_report()
+    report = json.loads(report_file.read_text())
+    assert [c["cmd"] for c in report["commands"]] == [["cmd1"], ["cmd2"], ["cmd3"]]
+    assert report["totals_by_installer"] == {
+        "apt": {
+            "commands": 2,
+            "wall_time_seconds": 3.0,
+            "user_cpu_seconds": 1.0,
+            "sys_cpu_seconds": 0.5,
+        },
+        "pip": {
+            "commands": 1,
+            "wall_time_seconds": 4.0,
+            "user_cpu_seconds": 0.5,
+            "sys_cpu_seconds": 0.25,
+        },
+    }
+
+
+def test_stream_file(tmp_path):
+    stream_file = tmp_path / "stream.jsonl"
+    recorder = CommandRecorder(stream_file=stream_file)
+    recorder.record(_record("cmd1"))
+    recorder.record(_record("cmd2"))
+    lines = stream_file.read_text().splitlines()
+    assert [json.loads(line)["cmd"] for line in lines] == [["cmd1"], ["cmd2"]]
+
+
+def test_command_executor_records_resource_usage(tmp_path):
+    recorder = CommandRecorder(report_file=tmp_path / "report.json")
+    executor = CommandExecutor(MagicMock(spec=CommandLogger), recorder=recorder)
+    cmd = [
+        sys.executable,
+        "-c",
+        "import sys; data = bytearray(50 * 1024 * 1024); print('x' * 99); sys.exit(4)",
+    ]
+    with recorder.tagged(installer="test"):
+        result = executor.execute(cmd)
+        result.print_results()
+    assert result.return_code() == 4
+    [record] = recorder.records
+    assert record.cmd == cmd
+    assert record.return_code == 4
+    assert record.stdout_bytes == 100
+    assert record.stderr_bytes == 0
+    assert record.wall_time_seconds > 0
+    assert record.user_cpu_seconds is not None
+    assert record.sys_cpu_seconds is not None
+    assert record.max_rss_kb is not None and record.max_rss_kb > 50 * 1024
+    assert record.tags == {"installer": "test"}
+
+
+def test_run_many_records_commands(tmp_path):
+    recorder = CommandRecorder(report_file=tmp_path / "report.json")
+    executor = CommandExecutor(MagicMock(spec=CommandLogger), recorder=recorder)
+    executor.run_many([([sys.executable, "-c", "print('x')"], None)] * 2)
+    assert [(r.return_code, r.stdout_bytes) for r in recorder.records] == [
+        (0, 2),
+        (0, 2),
+    ]
+
+
+def test_command_executor_records_already_reaped_command(tmp_path):
+    recorder = CommandRecorder(report_file=tmp_path / "report.json")
+    tracer = Tracer(trace_file=tmp_path / "trace.json")
+    executor = CommandExecutor(
+        MagicMock(spec=CommandLogger), recorder=recorder, tracer=tracer
+    )
+    result = executor.execute([sys.executable, "-c", "print('x')"])
+    result._process.wait()
+    result.print_results()
+    assert result.return_code() == 0
+    [record] = recorder.records
+    assert record.return_code == 0
+    assert record.user_cpu_seconds is None
+    assert record.max_rss_kb is None
+    [span] = tracer.spans
+    assert span.attributes["return_code"] == 0
@@ -0,0 +1,107 @@
+import random
+import shutil
+import subprocess
+
+import pytest
+
+from exasol.exaslpm.pkg_mgmt.search.debian_version import (
+    DebianVersion,
+    compare_versions,
+    sort_versions,
+)
+
+
+@pytest.mark.parametrize(
+    "lower, higher",
+    [
+        ("1.0", "1.1"),
+        ("1.9", "1.10"),
+        ("1.0~rc1", "1.0"),
+        ("1.0~~", "1.0~"),
+        ("1.0", "1.0a"),
+        ("1.0a", "1.0+"),
+        ("1.0-1", "1.0-2"),
+        ("1.0-1ubuntu2.9", "1.0-1ubuntu2.10"),
+        ("9.9", "1:0.1"),
+        ("2.4.4-2ubuntu17", "2.4.4-2ubuntu17.4"),
+        ("7.68.0-1ubuntu2", "7.68.0-1ubuntu2.25"),
+    ],
+)
+def test_compare_versions(lower, higher):
+    assert compare_versions(lower, higher) < 0
+    assert compare_versions(higher, lower) > 0
+
+
+@pytest.mark.parametrize(
+    "a, b",
+    [("1.0", "1.0"), ("0:1.0", "1.0"), ("1.0-0", "1.0"), ("1.01", "1.1")],
+)
+def test_compare_equal_versions(a, b):
+    assert compare_versions(a, b) == 0
+
+
+def test_sort_versions():
+    versions = ["1.0", "1:0.1", "1.0~rc1", "1.0-1", "0.9+dfsg", "1.0a", "1.0-0ubuntu1"]
+    assert sort_versions(versions) == [
+        "0.9+dfsg",
+        "1.0~rc1",
+        "1.0",
+        "1.0-0ubuntu1",
+        "1.0-1",
+        "1.0a",
+        "1:0.1",
+    ]
+    assert sort_versions(versions, reverse=True)[0] == "1:0.1"
+
+
+def test_debian_version_equality():
+    assert DebianVersion("1.0") == DebianVersion("0:1.0-0")
+    assert len({DebianVersion("1.01"), DebianVersion("1.1")}) == 1
+    assert max(["7.68.0-1ubuntu2.9", "7.68.0-1ubuntu2.25"], key=DebianVersion) == (
+        "7.68.0-1ubuntu2.25"
+    )
+
+
+def _random_version(rng: random.Random) -> str:
+    def part(max_length: int) -> str:
+        return rng.choice("0123456789") + "".join(
+            rng.choice("0123456789.~+ab") for _ in range(rng.randint(0, max_length))
+        )
+
+    version = part(5)
+    if rng.random() < 0.3:
+        version = f"{rng.randint(0, 2)}:{version}"
+    if rng.random() < 0.5:
+        version = f"{version}-{part(4)}"
+    return version
+
+
+@pytest.mark.skipif(shutil.which("dpkg") is None, reason="requires dpkg")
+def test_compare_versions_like_dpkg():
+    rng = random.Random(42)
+    for _ in range(200):
+        a, b = _random_version(rng), _random_version(rng)
+        dpkg_lower = (
+            subprocess.run(["dpkg", "--compare-versions", a, "lt", b]).returncode == 0
+        )
+        dpkg_equal = (
+            subprocess.run(["dpkg", "--compare-versions", a, "eq", b]).returncode == 0
+        )
+        assert (compare_versions(a, b) < 0, compare_versions(a, b) == 0) == (
+            dpkg_lower,
+            dpkg_equal,
+        ), (a, b)
+
+
+def test_sort_many_versions():
+    rng = random.Random(42)
+    versions = [
+        f"{rng.randint(0, 2)}:{rng.randint(0, 30)}.{rng.randint(0, 99)}.{rng.randint(0, 20)}"
+        f"{rng.choice(['', '~rc1', '+dfsg'])}-{rng.randint(0, 5)}ubuntu{rng.randint(0, 9)}.{rng.randint(0, 30)}"
+        for _ in range(5000)
+    ]
+    sorted_versions = sort_versions(versions)
+    assert all(
+        compare_versions(lower, higher) <= 0
+        for lower, higher in zip(sorted_versions, sorted_versions[1:])
+    )
@@ -0,0 +1,68 @@
+import hashlib
+import json
+from pathlib import Path
+
+import pytest
+
+from exasol.exaslpm.pkg_mgmt.context.download_cache import DownloadCache
+
+
+def _store(cache: DownloadCache, tmp_path: Path, url: str, content: bytes) -> str:
+    source = tmp_path / "source"
+    source.write_bytes(content)
+    digest = hashlib.sha256(content).hexdigest()
+    cache.store(url, source, digest)
+    return digest
+
+
+@pytest.fixture
+def cache(tmp_path) -> DownloadCache:
+    return DownloadCache(tmp_path / "cache", max_size_in_bytes=100)
+
+
+def test_fetch_not_cached(cache, tmp_path):
+    assert not cache.fetch("http://example.com/a", tmp_path / "target")
+
+
+def test_fetch_cached(cache, tmp_path):
+    _store(cache, tmp_path, "http://example.com/a", b"content a")
+    target = tmp_path / "target"
+    assert cache.fetch("http://example.com/a", target)
+    assert target.read_bytes() == b"content a"
+
+
+def test_same_content_is_stored_once(cache, tmp_path):
+    digest = _store(cache, tmp_path, "http://example.com/a", b"content")
+    _store(cache, tmp_path, "http://mirror.example.com/a", b"content")
+    assert [p.name for p in (cache.cache_dir / "blobs").iterdir()] == [digest]
+
+
+def test_replaced_content_removes_previous_blob(cache, tmp_path):
+    _store(cache, tmp_path, "http://example.com/a", b"old")
+    digest = _store(cache, tmp_path, "http://example.com/a", b"new")
+    assert [p.name for p in (cache.cache_dir / "blobs").iterdir()] == [digest]
+
+
+def test_corrupt_blob_gets_removed(cache, tmp_path):
+    digest = _store(cache, tmp_path, "http://example.com/a", b"content a")
+    (cache.cache_dir / "blobs" / digest).write_bytes(b"corrupt")
+    assert not cache.fetch("http://example.com/a", tmp_path / "target")
+    assert not (cache.cache_dir / "blobs" / digest).exists()
+    index = json.loads((cache.cache_dir / "index.json").read_text())
+    assert index["urls"] == {}
+
+
+def test_least_recently_used_gets_evicted(cache, tmp_path):
+    digest_a = _store(cache, tmp_path, "http://example.com/a", b"a" * 40)
+    digest_b = _store(cache, tmp_path, "http://example.com/b", b"b" * 40)
+    assert cache.fetch("http://example.com/a", tmp_path / "target")
+    digest_c = _store(cache, tmp_path, "http://example.com/c", b"c" * 40)
+    blobs = {p.name for p in (cache.cache_dir / "blobs").iterdir()}
+    assert blobs == {digest_a, digest_c}
+    assert not cache.fetch("http://example.com/b", tmp_path / "target")
+    assert digest_b not in blobs
+
+
+def test_too_large_file_is_not_cached(cache, tmp_path):
+    _store(cache, tmp_path, "http://example.com/a", b"a" * 101)
+    assert not cache.fetch("http://example.com/a", tmp_path / "target")
@@ -0,0 +1,70 @@
+import os
+
+import pytest
+
+from exasol.exaslpm.pkg_mgmt.context.dpkg_status_index import DpkgStatusIndex
+
+DPKG_STATUS = """Package: libc6
+Status: install ok installed
+Priority: optional
+Architecture: amd64
+Version: 2.35-0ubuntu3.8
+Description: GNU C Library: Shared libraries
+ Contains the standard libraries that are used by nearly all programs on
+ the system.
+
+Package: vim
+Status: deinstall ok config-files
+Architecture: amd64
+Version: 2:8.2.3995-1ubuntu2
+
+Package: ca-certificates
+Status: hold ok installed
+Architecture: all
+Version: 20240203~22.04.1
+"""
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = DpkgStatusIndex(root=tmp_path)
+    index.status_file.parent.mkdir(parents=True)
+    index.status_file.write_text(DPKG_STATUS)
+    return index
+
+
+@pytest.mark.parametrize(
+    "name, expected_version",
+    [
+        ("libc6", "2.35-0ubuntu3.8"),
+        ("libc6:amd64", "2.35-0ubuntu3.8"),
+        ("ca-certificates", "20240203~22.04.1"),
+        ("vim", None),
+        ("curl", None),
+    ],
+)
+def test_installed_version(index, name, expected_version):
+    assert index.installed_version(name) == expected_version
+
+
+def test_missing_status_file(tmp_path):
+    assert DpkgStatusIndex(root=tmp_path).installed_version("libc6") is None
+
+
+def test_reloads_changed_status_file(index):
+    assert index.installed_version("curl") is None
+    index.status_file.write_text(
+        DPKG_STATUS + "\nPackage: curl\nStatus: install ok installed\nVersion: 7.81.0\n"
+    )
+    assert index.installed_version("curl") == "7.81.0"
+
+
+def test_parses_unchanged_status_file_once(index):
+    index.installed_version("libc6")
+    st = index.status_file.stat()
+    # Same size and modification time, so the index does not notice the change
+    index.status_file.write_text(
+        DPKG_STATUS.replace("2.35-0ubuntu3.8", "2.35-0ubuntu3.9")
+    )
+    os.utime(index.status_file, ns=(st.st_atime_ns, st.st_mtime_ns))
+    assert index.installed_version("libc6") == "2.35-0ubuntu3.8"
@@ -0,0 +1,324 @@
+import contextlib
+import hashlib
+import random
+import threading
+from collections.abc import Iterator
+from http.server import (
+    BaseHTTPRequestHandler,
+    ThreadingHTTPServer,
+)
+from unittest.mock import (
+    MagicMock,
+    call,
+)
+
+import pytest
+import requests
+
+from exasol.exaslpm.pkg_mgmt.context import file_downloader as file_downloader_mod
+from exasol.exaslpm.pkg_mgmt.context.download_cache import DownloadCache
+from exasol.exaslpm.pkg_mgmt.context.file_downloader import (
+    Download,
+    DownloadVerificationException,
+    FileDownloader,
+)
+from exasol.exaslpm.pkg_mgmt.context.tracer import Tracer
+
+CONTENT_CHUNKS = [b"downloaded ", b"content"]
+CONTENT = b"".join(CONTENT_CHUNKS)
+CONTENT_SHA256 = hashlib.sha256(CONTENT).hexdigest()
+
+LARGE_CONTENT = random.Random(42).randbytes(1024 * 1024)
+LARGE_CONTENT_SHA256 = hashlib.sha256(LARGE_CONTENT).hexdigest()
+
+
+@pytest.fixture
+def requests_get_mock(monkeypatch) -> MagicMock:
+    response = MagicMock()
+    response.__enter__.return_value = response
+    response.iter_content.return_value = CONTENT_CHUNKS
+    get_mock = MagicMock(return_value=response)
+    monkeypatch.setattr(file_downloader_mod.requests.Session, "get", get_mock)
+    return get_mock
+
+
+@pytest.fixture
+def cache(tmp_path) -> DownloadCache:
+    return DownloadCache(tmp_path / "cache", max_size_in_bytes=100)
+
+
+@pytest.mark.parametrize(
+    "kwargs, expected_pool_size",
+    [
+        ({}, 4),
+        ({"parallel_ranges": 2}, 8),
+        ({"concurrent_downloads": 16}, 16),
+        ({"concurrent_downloads": 16, "parallel_ranges": 2}, 32),
+    ],
+)
+def test_connection_pool_size(kwargs, expected_pool_size):
+    adapter = FileDownloader(**kwargs)._session.get_adapter("https://example.com")
+    assert adapter._pool_maxsize == expected_pool_size
+
+
+def test_download_is_streamed(requests_get_mock):
+    with FileDownloader().download_file_to_tmp("http://example.com/a") as p:
+        assert p.read_bytes() == CONTENT
+    assert requests_get_mock.mock_calls[0] == call(
+        "http://example.com/a", headers={}, timeout=30, stream=True
+    )
+
+
+def test_download_with_matching_sha256(requests_get_mock):
+    with FileDownloader().download_file_to_tmp(
+        "http://example.com/a", sha256=CONTENT_SHA256.upper()
+    ) as p:
+        assert p.read_bytes() == CONTENT
+
+
+def test_download_with_wrong_sha256(requests_get_mock):
+    with pytest.raises(DownloadVerificationException, match=CONTENT_SHA256):
+        with FileDownloader().download_file_to_tmp(
+            "http://example.com/a", sha256="0" * 64
+        ):
+            pass
+
+
+def test_download_with_wrong_sha256_is_not_cached(requests_get_mock, cache, tmp_path):
+    with pytest.raises(DownloadVerificationException):
+        with FileDownloader(cache=cache).download_file_to_tmp(
+            "http://example.com/a", sha256="0" * 64
+        ):
+            pass
+    assert cache.fetch("http://example.com/a", tmp_path / "target") is None
+
+
+def test_file_downloader_uses_cache(cache, requests_get_mock):
+    file_downloader = FileDownloader(cache=cache)
+    for _ in range(2):
+        with file_downloader.download_file_to_tmp(
+            "http://example.com/a", sha256=CONTENT_SHA256
+        ) as p:
+            assert p.read_bytes() == CONTENT
+    assert requests_get_mock.call_count == 1
+
+
+def test_stale_cache_entry_gets_downloaded_again(cache, requests_get_mock, tmp_path):
+    stale = tmp_path / "stale"
+    stale.write_bytes(b"old")
+    cache.store("http://example.com/a", stale, hashlib.sha256(b"old").hexdigest())
+    with FileDownloader(cache=cache).download_file_to_tmp(
+        "http://example.com/a", sha256=CONTENT_SHA256
+    ) as p:
+        assert p.read_bytes() == CONTENT
+    assert requests_get_mock.call_count == 1
+    assert cache.fetch("http://example.com/a", tmp_path / "target") == CONTENT_SHA256
+    assert (tmp_path / "target").read_bytes() == CONTENT
+
+
+def test_file_downloader_without_cache(cache, requests_get_mock):
+    file_downloader = FileDownloader(cache=cache)
+    for _ in range(2):
+        with file_downloader.download_file_to_tmp(
+            "http://example.com/a", cache=False
+        ) as p:
+            assert p.read_bytes() == CONTENT
+    assert requests_get_mock.call_count == 2
+
+
+class RangeRequestHandler(BaseHTTPRequestHandler):
+    """
+    Serves LARGE_CONTENT and supports HTTP Range requests.
+    The first `server.failures` GET requests send only half of the requested bytes
+    and then close the connection.
+    """
+
+    server: "RangeHTTPServer"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _requested_range(self) -> tuple[int, int] | None:
+        range_header = self.headers.get("Range")
+        if range_header is None:
+            return None
+        start, end = range_header.removeprefix("bytes=").split("-")
+        return int(start), int(end) if end else len(LARGE_CONTENT) - 1
+
+    def do_HEAD(self):
+        self.send_response(200)
+        if self.server.supports_ranges:
+            self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Content-Length", str(len(LARGE_CONTENT)))
+        self.end_headers()
+
+    def do_GET(self):
+        requested_range = (
+            self._requested_range() if self.server.supports_ranges else None
+        )
+        with self.server.lock:
+            self.server.requested_ranges.append(requested_range)
+            fail = self.server.failures > 0
+            self.server.failures -= 1
+        start, end = requested_range or (0, len(LARGE_CONTENT) - 1)
+        self.send_response(206 if requested_range else 200)
+        self.send_header("Content-Length", str(end - start + 1))
+        self.end_headers()
+        if fail:
+            self.wfile.write(LARGE_CONTENT[start : start + (end - start + 1) // 2])
+            self.wfile.flush()
+            self.close_connection = True
+            return
+        self.wfile.write(LARGE_CONTENT[start : end + 1])
+
+
+class RangeHTTPServer(ThreadingHTTPServer):
+    def __init__(self, supports_ranges: bool, failures: int):
+        super().__init__(("127.0.0.1", 0), RangeRequestHandler)
+        self.supports_ranges = supports_ranges
+        self.failures = failures
+        self.requested_ranges: list[tuple[int, int] | None] = []
+        self.lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/file"
+
+
+@contextlib.contextmanager
+def run_http_server(supports_ranges=True, failures=0) -> Iterator[RangeHTTPServer]:
+    server = RangeHTTPServer(supports_ranges, failures)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+
+
+def test_download_from_server():
+    with run_http_server() as server:
+        with FileDownloader().download_file_to_tmp(
+            server.url, sha256=LARGE_CONTENT_SHA256
+        ) as p:
+            assert p.read_bytes() == LARGE_CONTENT
+    assert server.requested_ranges == [None]
+
+
+def test_download_gets_resumed():
+    with run_http_server(failures=2) as server:
+        with FileDownloader().download_file_to_tmp(
+            server.url, sha256=LARGE_CONTENT_SHA256
+        ) as p:
+            assert p.read_bytes() == LARGE_CONTENT
+    size = len(LARGE_CONTENT)
+    assert server.requested_ranges == [
+        None,
+        (size // 2, size - 1),
+        (size // 2 + size // 4, size - 1),
+    ]
+
+
+def test_download_fails_after_max_retries():
+    with run_http_server(failures=3) as server:
+        with pytest.raises(requests.exceptions.ChunkedEncodingError):
+            with FileDownloader(max_retries=2).download_file_to_tmp(server.url):
+                pass
+    assert len(server.requested_ranges) == 3
+
+
+def test_download_parallel_ranges():
+    with run_http_server() as server:
+        file_downloader = FileDownloader(
+            parallel_ranges=4, parallel_ranges_min_size=len(LARGE_CONTENT)
+        )
+        with file_downloader.download_file_to_tmp(
+            server.url, sha256=LARGE_CONTENT_SHA256
+        ) as p:
+            assert p.read_bytes() == LARGE_CONTENT
+    assert sorted(server.requested_ranges) == [
+        (0, 262143),
+        (262144, 524287),
+        (524288, 786431),
+        (786432, 1048575),
+    ]
+
+
+def test_download_parallel_ranges_get_resumed():
+    with run_http_server(failures=2) as server:
+        file_downloader = FileDownloader(
+            parallel_ranges=4, parallel_ranges_min_size=len(LARGE_CONTENT)
+        )
+        with file_downloader.download_file_to_tmp(
+            server.url, sha256=LARGE_CONTENT_SHA256
+        ) as p:
+            assert p.read_bytes() == LARGE_CONTENT
+    assert len(server.requested_ranges) == 6
+
+
+def test_download_parallel_ranges_without_server_support():
+    with run_http_server(supports_ranges=False) as server:
+        file_downloader = FileDownloader(
+            parallel_ranges=4, parallel_ranges_min_size=len(LARGE_CONTENT)
+        )
+        with file_downloader.download_file_to_tmp(
+            server.url, sha256=LARGE_CONTENT_SHA256
+        ) as p:
+            assert p.read_bytes() == LARGE_CONTENT
+    assert server.requested_ranges == [None]
+
+
+def test_download_small_file_is_not_split():
+    with run_http_server() as server:
+        file_downloader = FileDownloader(
+            parallel_ranges=4, parallel_ranges_min_size=len(LARGE_CONTENT) + 1
+        )
+        with file_downloader.download_file_to_tmp(server.url) as p:
+            assert p.read_bytes() == LARGE_CONTENT
+    assert server.requested_ranges == [None]
+
+
+def test_prefetched_file_is_not_downloaded_again():
+    with run_http_server() as server:
+        file_downloader = FileDownloader()
+        with file_downloader.prefetch(
+            [Download(url=server.url, sha256=LARGE_CONTENT_SHA256)]
+        ):
+            with file_downloader.download_file_to_tmp(server.url) as p:
+                assert p.read_bytes() == LARGE_CONTENT
+    assert server.requested_ranges == [None]
+
+
+def test_failed_prefetch_falls_back_to_download():
+    with run_http_server() as server:
+        file_downloader = FileDownloader()
+        with file_downloader.prefetch([Download(url=server.url, sha256="0" * 64)]):
+            with file_downloader.download_file_to_tmp(server.url) as p:
+                assert p.read_bytes() == LARGE_CONTENT
+    assert server.requested_ranges == [None, None]
+
+
+def test_unused_prefetched_file_gets_discarded():
+    with run_http_server() as server:
+        file_downloader = FileDownloader()
+        with file_downloader.prefetch([Download(url=server.url)]):
+            pass
+        with file_downloader.download_file_to_tmp(server.url) as p:
+            assert p.read_bytes() == LARGE_CONTENT
+    assert server.requested_ranges in ([None], [None, None])
+
+
+def test_download_span(tmp_path):
+    tracer = Tracer(trace_file=tmp_path / "trace.json")
+    cache = DownloadCache(tmp_path / "cache", max_size_in_bytes=len(LARGE_CONTENT))
+    with run_http_server() as server:
+        file_downloader = FileDownloader(cache=cache, tracer=tracer)
+        for _ in range(2):
+            with file_downloader.download_file_to_tmp(server.url):
+                pass
+    assert [(span.name, span.attributes) for span in tracer.spans] == [
+        ("download", {"url": server.url, "cache_hit": False, "bytes": 1048576}),
+        ("download", {"url": server.url, "cache_hit": True, "bytes": 1048576}),
+    ]
@@ -9,6 +9,7 @@ from test.unit.test_data import (
 
 import pytest
 
+import exasol.exaslpm.pkg_mgmt.context.history_file_manager as history_file_manager_module
 from exasol.exaslpm.model.package_file_config import BuildStep
 from exasol.exaslpm.pkg_mgmt.context.history_file_manager import HistoryFileManager
 from exasol.exaslpm.pkg_mgmt.package_file_session import PackageFileSession
@@ -109,3 +110,105 @@ def test_consistency_raises_if_wrong_build_step_file_name(history_file_manager):
             match="Found inconsistency in history files: Build-Step in File '000_build_step_1' has unexpected name 'some_other_name'",
         ):
             hsm.check_consistency()
+
+
+def _fail_deserialize(model: str) -> BuildStep:
+    raise AssertionError("History file must not be parsed")
+
+
+def _fail_package_file_session(package_file):
+    raise AssertionError("History file must not be parsed")
+
+
+def test_index_is_written_next_to_history_path(history_file_manager):
+    with history_file_manager([TEST_BUILD_STEP]) as hsm:
+        assert hsm.index_path == hsm.history_path.parent / "history.index.json"
+        assert hsm.index_path.exists()
+        assert _resulting_files(hsm) == [f"000_{TEST_BUILD_STEP.name}"]
+
+
+def test_reads_build_steps_from_index(history_file_manager, monkeypatch):
+    with history_file_manager([TEST_BUILD_STEP, TEST_BUILD_STEP_2]) as hsm:
+        new_hsm = HistoryFileManager(history_path=hsm.history_path)
+        monkeypatch.setattr(
+            HistoryFileManager, "_deserialize_build_step", _fail_deserialize
+        )
+        assert new_hsm.get_all_previous_build_steps() == [
+            TEST_BUILD_STEP,
+            TEST_BUILD_STEP_2,
+        ]
+
+
+def test_rebuilds_corrupt_index(history_file_manager):
+    with history_file_manager([TEST_BUILD_STEP, TEST_BUILD_STEP_2]) as hsm:
+        hsm.index_path.write_text("{not json")
+        new_hsm = HistoryFileManager(history_path=hsm.history_path)
+        assert new_hsm.get_all_previous_build_steps() == [
+            TEST_BUILD_STEP,
+            TEST_BUILD_STEP_2,
+        ]
+        newest_hsm = HistoryFileManager(history_path=hsm.history_path)
+        assert newest_hsm._read_index(newest_hsm._fingerprint()) == {
+            f"000_{TEST_BUILD_STEP.name}": TEST_BUILD_STEP,
+            f"001_{TEST_BUILD_STEP_2.name}": TEST_BUILD_STEP_2,
+        }
+
+
+def test_rebuilds_stale_index(history_file_manager):
+    with history_file_manager([TEST_BUILD_STEP]) as hsm:
+        session = PackageFileSession(hsm.history_path / f"000_{TEST_BUILD_STEP.name}")
+        session.package_file_config.build_steps[0].comment = "changed outside"
+        session.commit_changes()
+
+        result = hsm.get_all_previous_build_steps()
+
+        expected = deepcopy(TEST_BUILD_STEP)
+        expected.comment = "changed outside"
+        assert result == [expected]
+
+
+def test_rebuilds_missing_index(history_file_manager):
+    with history_file_manager([TEST_BUILD_STEP, TEST_BUILD_STEP_2]) as hsm:
+        hsm.index_path.unlink()
+        new_hsm = HistoryFileManager(history_path=hsm.history_path)
+        assert new_hsm.get_all_previous_build_steps() == [
+            TEST_BUILD_STEP,
+            TEST_BUILD_STEP_2,
+        ]
+        assert new_hsm.index_path.exists()
+
+
+def test_check_consistency_uses_index(history_file_manager, monkeypatch):
+    with history_file_manager([TEST_BUILD_STEP, TEST_BUILD_STEP_2]) as hsm:
+        new_hsm = HistoryFileManager(history_path=hsm.history_path)
+        monkeypatch.setattr(
+            history_file_manager_module,
+            "PackageFileSession",
+            _fail_package_file_session,
+        )
+        new_hsm.check_consistency()
+
+
+def test_add_build_step_if_index_cannot_be_written(history_file_manager, monkeypatch):
+    def fail_write_index(*args):
+        raise OSError("read-only")
+
+    with history_file_manager([TEST_BUILD_STEP]) as hsm:
+        monkeypatch.setattr(hsm, "_write_index", fail_write_index)
+        hsm.add_build_step_to_history(TEST_BUILD_STEP_2)
+
+        assert hsm.get_all_previous_build_steps() == [
+            TEST_BUILD_STEP,
+            TEST_BUILD_STEP_2,
+        ]
+
+
+def test_add_conda_lock_file(history_file_manager):
+    with history_file_manager([TEST_BUILD_STEP]) as hsm:
+        lock_file = hsm.add_conda_lock_file("phase_1-0123.lock", "@EXPLICIT\n")
+
+        assert lock_file == hsm.history_path.parent / "conda_lock_files" / (
+            "phase_1-0123.lock"
+        )
+        assert lock_file.read_text() == "@EXPLICIT\n"
+        assert _resulting_files(hsm) == [f"000_{TEST_BUILD_STEP.name}"]
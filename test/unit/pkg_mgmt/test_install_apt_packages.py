@@ -1,3 +1,5 @@
+import dataclasses
+from pathlib import Path
 from unittest.mock import (
     ANY,
     MagicMock,
@@ -12,6 +14,7 @@ from exasol.exaslpm.model.package_file_config import (
 from exasol.exaslpm.pkg_mgmt.context.cmd_executor import (
     CommandFailedException,
 )
+from exasol.exaslpm.pkg_mgmt.context.install_options import InstallOptions
 from exasol.exaslpm.pkg_mgmt.install_apt_packages import *
 
 
@@ -31,6 +34,7 @@ def test_install_apt_packages(context_mock):
     ]
     aptPackages = AptPackages(packages=pkgs)
     install_apt_packages(aptPackages, context_mock)
+    context_mock.build_step_finalizer.run()
     assert context_mock.cmd_executor.mock_calls == [
         call.execute(["apt-get", "-y", "update"], env=None),
         call.execute().print_results(),
@@ -92,6 +96,7 @@ def test_install_apt_packages_with_wildcard(context_mock):
     ]
     aptPackages = AptPackages(packages=pkgs)
     install_apt_packages(aptPackages, context_mock)
+    context_mock.build_step_finalizer.run()
     assert context_mock.cmd_executor.execute.call_args_list == [
         call(["apt-get", "-y", "update"], env=None),
         call(["apt-cache", "-o", "quiet=0", "madison", "curl"]),
@@ -143,14 +148,7 @@ class FailCommandExecutor:
 def build_context_with_fail_command_executor(ctx: Context, fail_step: int):
     fail_command_executor = FailCommandExecutor(fail_step)
 
-    return Context(
-        cmd_logger=ctx.cmd_logger,
-        cmd_executor=fail_command_executor,
-        history_file_manager=ctx.history_file_manager,
-        file_access=ctx.file_access,
-        file_downloader=ctx.file_downloader,
-        temp_file_provider=ctx.temp_file_provider,
-    )
+    return dataclasses.replace(ctx, cmd_executor=fail_command_executor)
 
 
 @pytest.mark.parametrize(
@@ -175,5 +173,228 @@ def test_install_apt_packages_negative_cases(context_mock, fail_step, expected_e
 
     with pytest.raises(CommandFailedException):
         install_apt_packages(aptPackages, context)
+        context.build_step_finalizer.run()
 
     context.cmd_logger.err.assert_any_call(expected_error)
+
+
+def test_install_apt_packages_skips_redundant_update(context_mock):
+    apt_packages = AptPackages(packages=[AptPackage(name="curl", version="7.68.0")])
+    install_apt_packages(apt_packages, context_mock)
+    install_apt_packages(apt_packages, context_mock)
+    update_calls = [
+        c
+        for c in context_mock.cmd_executor.mock_calls
+        if c == call.execute(["apt-get", "-y", "update"], env=None)
+    ]
+    assert len(update_calls) == 1
+    assert (
+        call.info("Skipping apt-get update, package lists are up to date")
+        in context_mock.cmd_logger.mock_calls
+    )
+
+
+def test_install_apt_packages_updates_after_source_change(context_mock):
+    apt_packages = AptPackages(packages=[AptPackage(name="curl", version="7.68.0")])
+    install_apt_packages(apt_packages, context_mock)
+    sources_list_d = context_mock.apt_index_tracker.root / "etc/apt/sources.list.d"
+    sources_list_d.mkdir(parents=True)
+    (sources_list_d / "some_ppa.list").write_text("deb some_ppa")
+    install_apt_packages(apt_packages, context_mock)
+    update_calls = [
+        c
+        for c in context_mock.cmd_executor.mock_calls
+        if c == call.execute(["apt-get", "-y", "update"], env=None)
+    ]
+    assert len(update_calls) == 2
+
+
+DPKG_STATUS = """Package: curl
+Status: install ok installed
+Architecture: amd64
+Version: 7.68.0
+Description: command line tool
+ for transferring data
+
+Package: wget
+Status: deinstall ok config-files
+Version: 1.21.2
+"""
+
+
+@pytest.fixture
+def context_with_dpkg_status(context_mock):
+    status_file = context_mock.dpkg_status_index.status_file
+    status_file.parent.mkdir(parents=True)
+    status_file.write_text(DPKG_STATUS)
+    return context_mock
+
+
+@pytest.mark.parametrize(
+    "pkgs",
+    [
+        [AptPackage(name="curl", version="7.68.0")],
+        [AptPackage(name="curl", version="7.68.*")],
+        [AptPackage(name="curl", version="7.*.0")],
+        [AptPackage(name="curl")],
+    ],
+)
+def test_install_apt_packages_skips_installed(context_with_dpkg_status, pkgs):
+    assert (
+        install_apt_packages(AptPackages(packages=pkgs), context_with_dpkg_status) == 0
+    )
+    assert context_with_dpkg_status.cmd_executor.mock_calls == [
+        call.execute(["apt-mark", "manual", "curl"], env=None),
+        call.execute().print_results(),
+        call.execute().return_code(),
+    ]
+    assert context_with_dpkg_status.build_step_finalizer.pending == []
+    assert context_with_dpkg_status.cmd_logger.mock_calls == [
+        call.info("Skipping installed packages: ['curl']"),
+        call.info("Skipping apt-get install, all packages are installed"),
+    ]
+
+
+def test_install_apt_packages_installs_missing_packages(context_with_dpkg_status):
+    pkgs = [
+        AptPackage(name="curl", version="7.68.0"),
+        AptPackage(name="wget", version="1.21.2"),
+        AptPackage(name="git", version="2.34.1"),
+    ]
+    install_apt_packages(AptPackages(packages=pkgs), context_with_dpkg_status)
+    assert context_with_dpkg_status.cmd_executor.execute.call_args_list[:3] == [
+        call(["apt-mark", "manual", "curl"], env=None),
+        call(["apt-get", "-y", "update"], env=None),
+        call(
+            [
+                "apt-get",
+                "install",
+                "-V",
+                "-y",
+                "--no-install-recommends",
+                "wget=1.21.2",
+                "git=2.34.1",
+            ],
+            env=None,
+        ),
+    ]
+    assert (
+        call.info("Skipping installed packages: ['curl']")
+        in context_with_dpkg_status.cmd_logger.mock_calls
+    )
+
+
+def test_install_apt_packages_installs_other_version(context_with_dpkg_status):
+    pkgs = [AptPackage(name="curl", version="7.81.0")]
+    install_apt_packages(AptPackages(packages=pkgs), context_with_dpkg_status)
+    assert context_with_dpkg_status.cmd_executor.execute.call_args_list[1] == call(
+        ["apt-get", "install", "-V", "-y", "--no-install-recommends", "curl=7.81.0"],
+        env=None,
+    )
+
+
+def test_get_package_version_selects_highest_match(context_mock):
+    madison_dict = {
+        "curl": [
+            MadisonData("7.68.0-1ubuntu2.9", "focal-security"),
+            MadisonData("7.81.0-1ubuntu1.16", "jammy-updates"),
+            MadisonData("7.68.0-1ubuntu2.25", "focal-updates"),
+            MadisonData("7.68.0-1ubuntu2", "focal"),
+        ]
+    }
+    pkg = AptPackage(name="curl", version="7.68.*")
+    assert get_package_version(pkg, context_mock, madison_dict) == "7.68.0-1ubuntu2.25"
+
+
+PRINT_URIS_OUTPUT = [
+    "'http://archive.ubuntu.com/ubuntu/pool/main/c/curl/curl_7.68.0_amd64.deb' curl_7.68.0_amd64.deb 161148 SHA256:abc\n",
+    "'http://archive.ubuntu.com/ubuntu/pool/main/c/curl/libcurl4_7.68.0_amd64.deb' libcurl4_7.68.0_amd64.deb 234600 MD5Sum:def\n",
+]
+
+
+@pytest.fixture
+def context_with_parallel_downloads(context_mock):
+    run_cmd_result = context_mock.cmd_executor.execute.return_value
+    print_uris_result = MagicMock()
+
+    def consume_results_side_effect(stdout_cb, stderr_cb):
+        for line in PRINT_URIS_OUTPUT:
+            stdout_cb(line)
+        return 0
+
+    print_uris_result.consume_results.side_effect = consume_results_side_effect
+
+    def execute_side_effect(cmd, env=None):
+        if "--print-uris" in cmd:
+            return print_uris_result
+        return run_cmd_result
+
+    context_mock.cmd_executor.execute.side_effect = execute_side_effect
+    return dataclasses.replace(
+        context_mock, install_options=InstallOptions(apt_parallel_downloads=4)
+    )
+
+
+def test_install_apt_packages_parallel_downloads(context_with_parallel_downloads):
+    context = context_with_parallel_downloads
+    apt_packages = AptPackages(packages=[AptPackage(name="curl", version="7.68.0")])
+    install_apt_packages(apt_packages, context)
+    assert context.cmd_executor.execute.call_args_list[1:3] == [
+        call(
+            [
+                "apt-get",
+                "install",
+                "--print-uris",
+                "-qq",
+                "-y",
+                "--no-install-recommends",
+                "curl=7.68.0",
+            ],
+            env=None,
+        ),
+        call(
+            [
+                "apt-get",
+                "install",
+                "-V",
+                "-y",
+                "--no-install-recommends",
+                "curl=7.68.0",
+            ],
+            env=None,
+        ),
+    ]
+    assert sorted(
+        context.file_downloader.mock.mock_calls, key=lambda c: c.kwargs["url"]
+    ) == [
+        call(
+            url="http://archive.ubuntu.com/ubuntu/pool/main/c/curl/curl_7.68.0_amd64.deb",
+            timeout_in_seconds=30,
+            cache=False,
+            sha256="abc",
+        ),
+        call(
+            url="http://archive.ubuntu.com/ubuntu/pool/main/c/curl/libcurl4_7.68.0_amd64.deb",
+            timeout_in_seconds=30,
+            cache=False,
+            sha256=None,
+        ),
+    ]
+    assert sorted(context.file_access.copy_file.mock_calls) == [
+        call(
+            context.file_downloader.mock_path,
+            Path("/var/cache/apt/archives/curl_7.68.0_amd64.deb"),
+        ),
+        call(
+            context.file_downloader.mock_path,
+            Path("/var/cache/apt/archives/libcurl4_7.68.0_amd64.deb"),
+        ),
+    ]
+
+
+def test_install_apt_packages_failed_parallel_download(context_with_parallel_downloads):
+    context = context_with_parallel_downloads
+    context.file_access.copy_file.side_effect = [OSError("disk full"), None]
+    apt_packages = AptPackages(packages=[AptPackage(name="curl", version="7.68.0")])
+    assert install_apt_packages(apt_packages, context) == 0
+    assert len(context.cmd_logger.warn.mock_calls) == 1
@@ -55,6 +55,7 @@ def test_install_bazel(
         call(
             url="https://github.com/bazelbuild/bazel/releases/download/2.5.0/bazel-2.5.0-linux-x86_64",
             timeout_in_seconds=120,
+            sha256=None,
         )
     ]
 
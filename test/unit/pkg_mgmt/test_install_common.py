@@ -0,0 +1,36 @@
+from unittest.mock import call
+
+import pytest
+
+from exasol.exaslpm.pkg_mgmt.context.cmd_executor import CommandFailedException
+from exasol.exaslpm.pkg_mgmt.install_common import (
+    CommandExecInfo,
+    run_cmds_concurrently,
+)
+
+CMDS = [
+    CommandExecInfo(cmd=["cmd1"], err="cmd1 failed"),
+    CommandExecInfo(cmd=["cmd2"], err="cmd2 failed", env={"some": "value"}),
+    CommandExecInfo(cmd=["cmd3"], err="cmd3 failed"),
+]
+
+
+def test_run_cmds_concurrently(context_mock):
+    context_mock.cmd_executor.run_many.return_value = [0, 0, 0]
+    run_cmds_concurrently(CMDS, context_mock, max_parallel=2)
+    assert context_mock.cmd_executor.mock_calls == [
+        call.run_many(
+            [(["cmd1"], None), (["cmd2"], {"some": "value"}), (["cmd3"], None)],
+            max_parallel=2,
+        )
+    ]
+
+
+def test_run_cmds_concurrently_failed(context_mock):
+    context_mock.cmd_executor.run_many.return_value = [0, 1, 2]
+    with pytest.raises(CommandFailedException, match="cmd2 failed"):
+        run_cmds_concurrently(CMDS, context_mock)
+    assert context_mock.cmd_logger.err.mock_calls == [
+        call("cmd2 failed"),
+        call("cmd3 failed"),
+    ]
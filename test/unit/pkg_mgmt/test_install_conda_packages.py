@@ -1,6 +1,11 @@
+import platform
+import re
+from dataclasses import replace
 from io import StringIO
 from pathlib import Path
 from unittest.mock import (
+    ANY,
+    MagicMock,
     call,
 )
 
@@ -11,12 +16,15 @@ from exasol.exaslpm.model.package_file_config import (
     CondaBinary,
     CondaPackage,
     CondaPackages,
+    InstallStrategy,
     Micromamba,
     Phase,
     Tools,
 )
 from exasol.exaslpm.pkg_mgmt.constants import MICROMAMBA_PATH
+from exasol.exaslpm.pkg_mgmt.context.install_options import InstallOptions
 from exasol.exaslpm.pkg_mgmt.install_conda_packages import (
+    _lock_file_name,
     _write_conda_spec,
     install_conda_packages,
 )
@@ -97,6 +105,8 @@ def test_install_conda_packages(
     build_step = BuildStep(name="build-step-1", phases=[phase_one])
     search_cache = SearchCache(build_step, phase_one, context_with_conda_env)
     install_conda_packages(search_cache, phase_one, context_with_conda_env)
+    assert context_with_conda_env.build_step_finalizer.pending == ["ldconfig"]
+    context_with_conda_env.build_step_finalizer.run()
     expected_calls = [
         call.execute(
             [
@@ -145,3 +155,166 @@ def test_install_conda_packages_spec(context_with_conda_env):
     _write_conda_spec(output, pkgs)
 
     assert output.getvalue() == "main::numpy=1.2.3\nrequests=2.25.*=something\n"
+
+
+def test_install_conda_packages_delta(context_with_conda_env):
+    tmp_file_provider = context_with_conda_env.temp_file_provider
+    phase_previous = Phase(
+        name="phase-previous",
+        conda=CondaPackages(
+            packages=[CondaPackage(name="numpy", version="=1.2.3")],
+            channels=["conda-forge"],
+        ),
+    )
+    context_with_conda_env.history_file_manager.build_steps.append(
+        BuildStep(name="prev-conda-build-step", phases=[phase_previous])
+    )
+    phase_one = Phase(
+        name="phase-1",
+        conda=CondaPackages(
+            packages=[CondaPackage(name="pandas", version="=2.0.0")],
+            install_strategy=InstallStrategy.Delta,
+        ),
+    )
+    build_step = BuildStep(name="build-step-1", phases=[phase_one])
+    search_cache = SearchCache(build_step, phase_one, context_with_conda_env)
+    install_conda_packages(search_cache, phase_one, context_with_conda_env)
+
+    assert context_with_conda_env.cmd_executor.mock_calls[0] == call.execute(
+        [
+            str(MICROMAMBA_PATH),
+            "install",
+            "--yes",
+            "--file",
+            str(tmp_file_provider.path),
+            "--freeze-installed",
+            "-c",
+            "conda-forge",
+        ],
+        env={"MAMBA_ROOT_PREFIX": str(ROOT_PREFIX)},
+    )
+    assert tmp_file_provider.result == "pandas=2.0.0\n"
+
+
+LOCK_FILE_CONTENT = [
+    "@EXPLICIT\n",
+    "https://conda.anaconda.org/conda-forge/linux-64/numpy-1.2.3-0.conda#abc\n",
+]
+
+
+@pytest.fixture
+def context_with_lock_dir(context_with_conda_env, tmp_path):
+    export_cmd_result = MagicMock()
+
+    def consume_results_side_effect(stdout_cb, stderr_cb):
+        for line in LOCK_FILE_CONTENT:
+            stdout_cb(line)
+        return 0
+
+    export_cmd_result.consume_results.side_effect = consume_results_side_effect
+    run_cmd_result = context_with_conda_env.cmd_executor.execute.return_value
+
+    def execute_side_effect(cmd, env=None):
+        if cmd[1:] == ["list", "--explicit", "--md5"]:
+            return export_cmd_result
+        return run_cmd_result
+
+    context_with_conda_env.cmd_executor.execute.side_effect = execute_side_effect
+    return replace(
+        context_with_conda_env,
+        install_options=InstallOptions(conda_lock_dir=tmp_path / "lock"),
+    )
+
+
+def _lock_phase() -> Phase:
+    return Phase(
+        name="phase 1",
+        conda=CondaPackages(packages=[CondaPackage(name="numpy", version="=1.2.3")]),
+    )
+
+
+def test_install_conda_packages_stores_lock_file(context_with_lock_dir):
+    phase_one = _lock_phase()
+    build_step = BuildStep(name="build-step-1", phases=[phase_one])
+    search_cache = SearchCache(build_step, phase_one, context_with_lock_dir)
+    install_conda_packages(search_cache, phase_one, context_with_lock_dir)
+
+    executed_cmds = [
+        c.args[0] for c in context_with_lock_dir.cmd_executor.execute.call_args_list
+    ]
+    assert executed_cmds[-1] == [str(MICROMAMBA_PATH), "list", "--explicit", "--md5"]
+    history_calls = context_with_lock_dir.history_file_manager.mock.mock_calls
+    assert history_calls == [
+        call.add_conda_lock_file(ANY, "".join(LOCK_FILE_CONTENT)),
+    ]
+    lock_file_name = history_calls[0].args[0]
+    assert re.fullmatch(r"phase_1-[0-9a-f]{16}\.lock", lock_file_name)
+    assert context_with_lock_dir.file_access.copy_file.mock_calls == [
+        call(
+            Path("path/to/history/conda_lock_files") / lock_file_name,
+            context_with_lock_dir.install_options.conda_lock_dir / lock_file_name,
+        )
+    ]
+
+
+def test_install_conda_packages_from_lock_file(context_with_lock_dir):
+    phase_one = _lock_phase()
+    build_step = BuildStep(name="build-step-1", phases=[phase_one])
+    search_cache = SearchCache(build_step, phase_one, context_with_lock_dir)
+    install_conda_packages(search_cache, phase_one, context_with_lock_dir)
+    lock_file_name = context_with_lock_dir.history_file_manager.mock.mock_calls[0].args[
+        0
+    ]
+    lock_file = context_with_lock_dir.install_options.conda_lock_dir / lock_file_name
+    lock_file.parent.mkdir()
+    lock_file.write_text("".join(LOCK_FILE_CONTENT))
+    context_with_lock_dir.cmd_executor.execute.reset_mock()
+    context_with_lock_dir.history_file_manager.mock.reset_mock()
+
+    search_cache = SearchCache(build_step, phase_one, context_with_lock_dir)
+    install_conda_packages(search_cache, phase_one, context_with_lock_dir)
+    context_with_lock_dir.build_step_finalizer.run()
+
+    executed_cmds = [
+        c.args[0] for c in context_with_lock_dir.cmd_executor.execute.call_args_list
+    ]
+    assert executed_cmds == [
+        [str(MICROMAMBA_PATH), "install", "--yes", "--file", str(lock_file)],
+        [
+            str(MICROMAMBA_PATH),
+            "clean",
+            "--all",
+            "--yes",
+            "--index-cache",
+            "--tarballs",
+        ],
+        ["ldconfig"],
+    ]
+    assert context_with_lock_dir.history_file_manager.mock.mock_calls == []
+
+
+def test_lock_file_name_changes_with_packages():
+    phase_one = _lock_phase()
+    name = _lock_file_name(
+        phase_one, phase_one.conda.packages, [], InstallStrategy.Full
+    )
+    other_name = _lock_file_name(
+        phase_one,
+        [CondaPackage(name="numpy", version="=1.2.4")],
+        [],
+        InstallStrategy.Full,
+    )
+    assert name != other_name
+
+
+def test_lock_file_name_changes_with_architecture(monkeypatch):
+    phase_one = _lock_phase()
+    monkeypatch.setattr(platform, "machine", lambda: "x86_64")
+    name = _lock_file_name(
+        phase_one, phase_one.conda.packages, [], InstallStrategy.Full
+    )
+    monkeypatch.setattr(platform, "machine", lambda: "aarch64")
+    other_name = _lock_file_name(
+        phase_one, phase_one.conda.packages, [], InstallStrategy.Full
+    )
+    assert name != other_name
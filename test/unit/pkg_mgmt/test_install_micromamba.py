@@ -108,5 +108,6 @@ def test_install_micromamba(
         call(
             url="https://github.com/mamba-org/micromamba-releases/releases/download/2.5.0/micromamba-linux-64.tar.bz2",
             timeout_in_seconds=120,
+            sha256=None,
         )
     ]
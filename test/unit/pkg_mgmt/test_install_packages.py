@@ -1,4 +1,6 @@
 import contextlib
+import dataclasses
+import json
 from dataclasses import dataclass
 from pathlib import Path
 from unittest.mock import (
@@ -30,6 +32,17 @@ from exasol.exaslpm.model.package_file_config import (
     Tools,
 )
 from exasol.exaslpm.model.serialization import to_yaml_str
+from exasol.exaslpm.pkg_mgmt.context.cmd_executor import CommandFailedException
+from exasol.exaslpm.pkg_mgmt.context.command_recorder import (
+    CommandRecord,
+    CommandRecorder,
+)
+from exasol.exaslpm.pkg_mgmt.context.context import Context
+from exasol.exaslpm.pkg_mgmt.context.file_downloader import Download
+from exasol.exaslpm.pkg_mgmt.context.tracer import (
+    Span,
+    Tracer,
+)
 
 
 @pytest.fixture
@@ -481,3 +494,249 @@ def test_install_packages_multiple(
     ]
     assert mock_install_r_packages.mock_calls == [call(ANY, phases[8], context_mock)]
     assert mock_install_bazel.mock_calls == [call(phases[9], context_mock)]
+    assert context_mock.file_downloader.prefetch_mock.mock_calls == [
+        call(
+            [
+                Download(url="https://some.key.server/", cache=False),
+                Download(url="https://bootstrap.pypa.io/get-pip.py", cache=False),
+                Download(
+                    url="https://github.com/mamba-org/micromamba-releases/releases/download/2.5.0/micromamba-linux-64.tar.bz2",
+                    timeout_in_seconds=120,
+                ),
+                Download(
+                    url="https://github.com/bazelbuild/bazel/releases/download/2.5.0/bazel-2.5.0-linux-x86_64",
+                    timeout_in_seconds=120,
+                ),
+            ]
+        )
+    ]
+
+
+def _record_command(context: Context, cmd: str) -> None:
+    context.command_recorder.record(
+        CommandRecord(
+            cmd=[cmd],
+            return_code=0,
+            wall_time_seconds=1.0,
+            stdout_bytes=0,
+            stderr_bytes=0,
+        )
+    )
+
+
+def test_install_packages_command_report(
+    context_mock,
+    mock_install_apt_packages,
+    mock_install_pip_packages,
+    package_file,
+    tmp_path,
+):
+    report_file = tmp_path / "report.json"
+    context = dataclasses.replace(
+        context_mock, command_recorder=CommandRecorder(report_file=report_file)
+    )
+    mock_install_apt_packages.side_effect = lambda *args: _record_command(
+        context, "apt-get"
+    )
+    mock_install_pip_packages.side_effect = lambda *args: _record_command(
+        context, "pip"
+    )
+    package_file_config = _build_package_config(
+        [
+            _build_phase(phase_name="phase-1", enable_apt=True),
+            _build_phase(
+                phase_name="phase-2",
+                tools_settings=ToolsSettings(python_binary_path=True),
+            ),
+            _build_phase(phase_name="phase-3", enable_pip_packages=True),
+        ]
+    )
+    with package_file(package_file_config) as package_file_path:
+        install_packages.package_install(
+            package_file=package_file_path,
+            build_step_name="build-step-1",
+            context=context,
+        )
+    report = json.loads(report_file.read_text())
+    assert [(c["cmd"], c["tags"]) for c in report["commands"]] == [
+        (
+            ["apt-get"],
+            {
+                "build_step": "build-step-1",
+                "phase": "phase-1",
+                "installer": "apt_packages",
+            },
+        ),
+        (
+            ["pip"],
+            {
+                "build_step": "build-step-1",
+                "phase": "phase-3",
+                "installer": "pip_packages",
+            },
+        ),
+    ]
+
+
+def test_install_packages_command_report_on_failure(
+    context_mock, mock_install_apt_packages, package_file, tmp_path
+):
+    report_file = tmp_path / "report.json"
+    context = dataclasses.replace(
+        context_mock, command_recorder=CommandRecorder(report_file=report_file)
+    )
+    mock_install_apt_packages.side_effect = CommandFailedException("failed")
+    package_file_config = _build_package_config([_build_phase(enable_apt=True)])
+    with package_file(package_file_config) as package_file_path:
+        with pytest.raises(CommandFailedException):
+            install_packages.package_install(
+                package_file=package_file_path,
+                build_step_name="build-step-1",
+                context=context,
+            )
+    assert json.loads(report_file.read_text()) == {
+        "commands": [],
+        "totals_by_installer": {},
+    }
+
+
+def test_install_packages_runs_finalizer_once(
+    context_mock, mock_install_apt_packages, package_file
+):
+    ldconfig = MagicMock()
+
+    def register_ldconfig(apt_packages, context):
+        assert ldconfig.call_count == 0
+        context.build_step_finalizer.register("ldconfig", ldconfig)
+
+    mock_install_apt_packages.side_effect = register_ldconfig
+    package_file_config = _build_package_config(
+        [
+            _build_phase(phase_name="phase-1", enable_apt=True),
+            _build_phase(phase_name="phase-2", enable_apt=True),
+        ]
+    )
+    with package_file(package_file_config) as package_file_path:
+        install_packages.package_install(
+            package_file=package_file_path,
+            build_step_name="build-step-1",
+            context=context_mock,
+        )
+    assert mock_install_apt_packages.call_count == 2
+    assert ldconfig.call_count == 1
+
+
+def _build_tools_pip_phase(phase_name: str) -> Phase:
+    return Phase(
+        name=phase_name,
+        pip=PipPackages(
+            packages=[PipPackage(name="numpy", version="1.2.3")],
+            install_build_tools_ephemerally=True,
+        ),
+    )
+
+
+@pytest.fixture
+def build_tools_actions(mock_install_pip_packages, mock_install_apt_packages):
+    actions = MagicMock()
+
+    def use_build_tools(search_cache, phase, context):
+        actions.pip(phase.name)
+        with context.build_tools.use(["gcc"], actions.install, actions.remove):
+            pass
+
+    mock_install_pip_packages.side_effect = use_build_tools
+    mock_install_apt_packages.side_effect = lambda apt_packages, context: actions.apt()
+    return actions
+
+
+def test_install_packages_build_tools_shared_by_consecutive_phases(
+    context_mock, build_tools_actions, package_file
+):
+    package_file_config = _build_package_config(
+        [
+            _build_tools_pip_phase("phase-1"),
+            _build_tools_pip_phase("phase-2"),
+            _build_phase(phase_name="phase-3", enable_apt=True),
+            _build_tools_pip_phase("phase-4"),
+        ]
+    )
+    with package_file(package_file_config) as package_file_path:
+        install_packages.package_install(
+            package_file=package_file_path,
+            build_step_name="build-step-1",
+            context=context_mock,
+        )
+    assert build_tools_actions.mock_calls == [
+        call.pip("phase-1"),
+        call.install(["gcc"]),
+        call.pip("phase-2"),
+        call.remove(["gcc"]),
+        call.apt(),
+        call.pip("phase-4"),
+        call.install(["gcc"]),
+        call.remove(["gcc"]),
+    ]
+
+
+def test_install_packages_build_tools_removed_on_failure(
+    context_mock, build_tools_actions, package_file
+):
+    build_tools_actions.pip.side_effect = [None, CommandFailedException("failed")]
+    package_file_config = _build_package_config(
+        [_build_tools_pip_phase("phase-1"), _build_tools_pip_phase("phase-2")]
+    )
+    with package_file(package_file_config) as package_file_path:
+        with pytest.raises(CommandFailedException):
+            install_packages.package_install(
+                package_file=package_file_path,
+                build_step_name="build-step-1",
+                context=context_mock,
+            )
+    assert build_tools_actions.mock_calls == [
+        call.pip("phase-1"),
+        call.install(["gcc"]),
+        call.pip("phase-2"),
+        call.remove(["gcc"]),
+    ]
+
+
+def test_install_packages_trace(
+    context_mock, mock_install_apt_packages, package_file, tmp_path
+):
+    tracer = Tracer(trace_file=tmp_path / "trace.json")
+    context = dataclasses.replace(context_mock, tracer=tracer)
+    package_file_config = _build_package_config(
+        [
+            _build_phase(phase_name="phase-1", enable_apt=True),
+            _build_phase(
+                phase_name="phase-2",
+                tools_settings=ToolsSettings(python_binary_path=True),
+            ),
+        ]
+    )
+    with package_file(package_file_config) as package_file_path:
+        install_packages.package_install(
+            package_file=package_file_path,
+            build_step_name="build-step-1",
+            context=context,
+        )
+    spans = {span.span_id: span for span in tracer.spans}
+
+    def parent_name(span: Span) -> str | None:
+        return spans[span.parent_id].name if span.parent_id else None
+
+    assert [
+        (span.name, span.attributes, parent_name(span)) for span in tracer.spans
+    ] == [
+        ("install_apt_packages", {"packages": 1}, "process_phase"),
+        ("process_phase", {"phase": "phase-1"}, "package_install"),
+        ("process_phase", {"phase": "phase-2"}, "package_install"),
+        ("finalize_build_step", {}, "package_install"),
+        (
+            "package_install",
+            {"build_step": "build-step-1", "phases": 2},
+            None,
+        ),
+    ]
+    assert json.loads(tracer.trace_file.read_text())["traceEvents"]
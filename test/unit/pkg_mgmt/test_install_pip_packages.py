@@ -1,5 +1,13 @@
+import dataclasses
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import zipfile
 from pathlib import Path
 from unittest.mock import (
+    MagicMock,
     call,
 )
 
@@ -7,13 +15,22 @@ import pytest
 
 from exasol.exaslpm.model.package_file_config import (
     BuildStep,
+    BuildToolsProfile,
+    InstallStrategy,
     Phase,
     Pip,
+    PipInstaller,
     PipPackage,
     PipPackages,
     Tools,
 )
-from exasol.exaslpm.pkg_mgmt.install_pip_packages import install_pip_packages
+from exasol.exaslpm.pkg_mgmt.context.cmd_executor import CommandFailedException
+from exasol.exaslpm.pkg_mgmt.context.install_options import InstallOptions
+from exasol.exaslpm.pkg_mgmt.install_pip_packages import (
+    LIST_DISTRIBUTIONS_SCRIPT,
+    _pip_install_cmd,
+    install_pip_packages,
+)
 from exasol.exaslpm.pkg_mgmt.search.search_cache import SearchCache
 
 
@@ -145,3 +162,794 @@ def test_install_pip_packages(
     assert context_with_python_env.file_access.check_binary.mock_calls == [
         call(Path("/usr/bin/test-python"))
     ]
+
+
+def test_install_pip_packages_failed_removes_build_tools(context_with_python_env):
+    failed_result = MagicMock()
+    failed_result.return_code.return_value = 1
+    run_cmd_result = context_with_python_env.cmd_executor.execute.return_value
+
+    def execute_side_effect(cmd, env=None):
+        if cmd[1:4] == ["-m", "pip", "install"]:
+            return failed_result
+        return run_cmd_result
+
+    context_with_python_env.cmd_executor.execute.side_effect = execute_side_effect
+    phase_one = Phase(
+        name="phase-1",
+        pip=PipPackages(
+            packages=[PipPackage(name="numpy", version="== 1.2.3")],
+            install_build_tools_ephemerally=True,
+        ),
+    )
+    build_step = BuildStep(name="build-step-1", phases=[phase_one])
+    search_cache = SearchCache(build_step, phase_one, context_with_python_env)
+    with pytest.raises(CommandFailedException):
+        install_pip_packages(search_cache, phase_one, context_with_python_env)
+
+    executed_cmds = [
+        c.args[0] for c in context_with_python_env.cmd_executor.execute.call_args_list
+    ]
+    assert executed_cmds[-2:] == [
+        ["apt-get", "purge", "-y", "build-essential", "pkg-config"],
+        ["apt-get", "-y", "autoremove"],
+    ]
+    assert not context_with_python_env.build_tools.installed
+
+
+def test_install_pip_packages_build_tools_profile_with_ccache(context_with_python_env):
+    tmp_file_provider = context_with_python_env.temp_file_provider
+    context = dataclasses.replace(
+        context_with_python_env,
+        install_options=InstallOptions(ccache_dir=Path("/ccache")),
+    )
+    phase_one = Phase(
+        name="phase-1",
+        pip=PipPackages(
+            packages=[PipPackage(name="scipy", version="== 1.13.0")],
+            install_build_tools_ephemerally=True,
+            build_tools_profile=BuildToolsProfile.Scientific,
+            build_tools=["gfortran", "libhdf5-dev"],
+        ),
+    )
+    build_step = BuildStep(name="build-step-1", phases=[phase_one])
+    search_cache = SearchCache(build_step, phase_one, context)
+    install_pip_packages(search_cache, phase_one, context)
+
+    build_tools = [
+        "build-essential",
+        "pkg-config",
+        "gfortran",
+        "libopenblas-dev",
+        "liblapack-dev",
+        "libhdf5-dev",
+        "ccache",
+    ]
+    runtime_packages = ["libgfortran5", "libopenblas0", "liblapack3"]
+    assert context.cmd_executor.execute.call_args_list == [
+        call(["apt-get", "-y", "update"], env=None),
+        call(
+            [
+                "apt-get",
+                "install",
+                "-y",
+                "--no-install-recommends",
+                *build_tools,
+                *runtime_packages,
+            ],
+            env=None,
+        ),
+        call(
+            [
+                "env",
+                "CCACHE_DIR=/ccache",
+                "CC=ccache gcc",
+                "CXX=ccache g++",
+                "/usr/bin/test-python",
+                "-m",
+                "pip",
+                "install",
+                "-r",
+                str(tmp_file_provider.path),
+            ],
+            env=None,
+        ),
+        call(["apt-get", "purge", "-y", *build_tools], env=None),
+        call(["apt-get", "-y", "autoremove"], env=None),
+    ]
+
+
+def test_install_pip_packages_keeps_scientific_runtime_packages(
+    context_with_python_env,
+):
+    phase_one = Phase(
+        name="phase-1",
+        pip=PipPackages(
+            packages=[PipPackage(name="scipy", version="== 1.13.0")],
+            install_build_tools_ephemerally=True,
+            build_tools_profile=BuildToolsProfile.Scientific,
+        ),
+    )
+    build_step = BuildStep(name="build-step-1", phases=[phase_one])
+    search_cache = SearchCache(build_step, phase_one, context_with_python_env)
+    install_pip_packages(search_cache, phase_one, context_with_python_env)
+
+    executed_cmds = [
+        c.args[0] for c in context_with_python_env.cmd_executor.execute.call_args_list
+    ]
+    [install_cmd] = [cmd for cmd in executed_cmds if cmd[:2] == ["apt-get", "install"]]
+    [purge_cmd] = [cmd for cmd in executed_cmds if cmd[:2] == ["apt-get", "purge"]]
+    runtime_packages = {"libgfortran5", "libopenblas0", "liblapack3"}
+    assert runtime_packages <= set(install_cmd)
+    assert runtime_packages.isdisjoint(purge_cmd)
+
+
+@pytest.fixture
+def context_with_pip_history(context_with_python_env):
+    phase_previous_packages = Phase(
+        name="phase-previous-packages",
+        pip=PipPackages(
+            packages=[
+                PipPackage(name="numpy", version="== 1.2.3"),
+                PipPackage(name="exasol_db_api", url="https://exasol.org/db-api"),
+            ]
+        ),
+    )
+    context_with_python_env.history_file_manager.build_steps.append(
+        BuildStep(name="prev-pip-build-step", phases=[phase_previous_packages])
+    )
+    return context_with_python_env
+
+
+def _delta_phase(verify_installed_packages: bool = False) -> Phase:
+    return Phase(
+        name="phase-1",
+        pip=PipPackages(
+            packages=[PipPackage(name="requests", version="== 2.25.1")],
+            install_strategy=InstallStrategy.Delta,
+            verify_installed_packages=verify_installed_packages,
+        ),
+    )
+
+
+def test_install_pip_packages_delta(context_with_pip_history):
+    tmp_file_provider = context_with_pip_history.temp_file_provider
+    phase_one = _delta_phase()
+    build_step = BuildStep(name="build-step-1", phases=[phase_one])
+    search_cache = SearchCache(build_step, phase_one, context_with_pip_history)
+    install_pip_packages(search_cache, phase_one, context_with_pip_history)
+
+    assert context_with_pip_history.cmd_executor.mock_calls == [
+        call.execute(
+            [
+                "/usr/bin/test-python",
+                "-m",
+                "pip",
+                "install",
+                "-r",
+                str(tmp_file_provider.path),
+                "-c",
+                str(tmp_file_provider.path),
+            ],
+            env=None,
+        ),
+        call.execute().print_results(),
+        call.execute().return_code(),
+    ]
+    # The temp file provider mock shares one buffer for all temporary files:
+    # first the requirements, then the constraints.
+    # The URL package of the history is left out, pip rejects URLs in constraints.
+    assert tmp_file_provider.result == "requests == 2.25.1\nnumpy == 1.2.3\n"
+
+
+def test_install_pip_packages_delta_url_package_with_version(
+    context_with_python_env,
+):
+    tmp_file_provider = context_with_python_env.temp_file_provider
+    context_with_python_env.history_file_manager.build_steps.append(
+        BuildStep(
+            name="prev-pip-build-step",
+            phases=[
+                Phase(
+                    name="phase-previous-packages",
+                    pip=PipPackages(
+                        packages=[
+                            PipPackage(
+                                name="exasol_db_api",
+                                url="https://exasol.org/db-api",
+                                version="== 0.1.0",
+                            )
+                        ]
+                    ),
+                )
+            ],
+        )
+    )
+    phase_one = _delta_phase()
+    build_step = BuildStep(name="build-step-1", phases=[phase_one])
+    search_cache = SearchCache(build_step, phase_one, context_with_python_env)
+    install_pip_packages(search_cache, phase_one, context_with_python_env)
+
+    assert tmp_file_provider.result == "requests == 2.25.1\nexasol_db_api == 0.1.0\n"
+
+
+def test_install_pip_packages_delta_verify_installed(context_with_pip_history):
+    tmp_file_provider = context_with_pip_history.temp_file_provider
+    list_cmd_result = MagicMock()
+
+    def consume_results_side_effect(stdout_cb, stderr_cb):
+        stdout_cb("NumPy\n")
+        stdout_cb("pip\n")
+        return 0
+
+    list_cmd_result.consume_results.side_effect = consume_results_side_effect
+    run_cmd_result = context_with_pip_history.cmd_executor.execute.return_value
+
+    def execute_side_effect(cmd, env=None):
+        if cmd[1] == "-c":
+            return list_cmd_result
+        return run_cmd_result
+
+    context_with_pip_history.cmd_executor.execute.side_effect = execute_side_effect
+
+    phase_one = _delta_phase(verify_installed_packages=True)
+    build_step = BuildStep(name="build-step-1", phases=[phase_one])
+    search_cache = SearchCache(build_step, phase_one, context_with_pip_history)
+    install_pip_packages(search_cache, phase_one, context_with_pip_history)
+
+    assert context_with_pip_history.cmd_executor.execute.call_args_list[0] == call(
+        ["/usr/bin/test-python", "-c", LIST_DISTRIBUTIONS_SCRIPT], env=None
+    )
+    assert tmp_file_provider.result == (
+        "requests == 2.25.1\n"
+        "exasol_db_api @ https://exasol.org/db-api\n"
+        "numpy == 1.2.3\n"
+    )
+    assert context_with_pip_history.cmd_logger.warn.mock_calls == [
+        call(
+            "Previously installed pip packages are missing and will be installed again: ['exasol_db_api']"
+        )
+    ]
+
+
+def test_install_pip_packages_wheelhouse(context_with_pip_history):
+    tmp_file_provider = context_with_pip_history.temp_file_provider
+    context = dataclasses.replace(
+        context_with_pip_history,
+        install_options=InstallOptions(pip_wheelhouse_dir=Path("/wheelhouse")),
+    )
+    phase_one = _delta_phase()
+    build_step = BuildStep(name="build-step-1", phases=[phase_one])
+    search_cache = SearchCache(build_step, phase_one, context)
+    install_pip_packages(search_cache, phase_one, context)
+    context.build_step_finalizer.run()
+
+    assert context.cmd_executor.execute.call_args_list == [
+        call(
+            [
+                "/usr/bin/test-python",
+                "-m",
+                "pip",
+                "wheel",
+                "--wheel-dir",
+                "/wheelhouse",
+                "--find-links",
+                "/wheelhouse",
+                "-r",
+                str(tmp_file_provider.path),
+                "-c",
+                str(tmp_file_provider.path),
+            ],
+            env=None,
+        ),
+        call(
+            [
+                "/usr/bin/test-python",
+                "-m",
+                "pip",
+                "install",
+                "-r",
+                str(tmp_file_provider.path),
+                "-c",
+                str(tmp_file_provider.path),
+                "--no-index",
+                "--find-links",
+                "/wheelhouse",
+            ],
+            env=None,
+        ),
+        call(
+            [
+                "bash",
+                "-c",
+                'mountpoint -q "$1" || rm -rf "$1"',
+                "bash",
+                "/wheelhouse",
+            ],
+            env=None,
+        ),
+    ]
+
+
+def test_install_pip_packages_extras(context_with_pip_history):
+    tmp_file_provider = context_with_pip_history.temp_file_provider
+    phase_one = Phase(
+        name="phase-1",
+        pip=PipPackages(
+            packages=[
+                PipPackage(
+                    name="requests", version="== 2.25.1", extras=["socks", "security"]
+                ),
+                PipPackage(
+                    name="exasol-bucketfs",
+                    url="https://exasol.org/bucketfs",
+                    extras=["pandas"],
+                ),
+            ],
+        ),
+    )
+    build_step = BuildStep(name="build-step-1", phases=[phase_one])
+    search_cache = SearchCache(build_step, phase_one, context_with_pip_history)
+    install_pip_packages(search_cache, phase_one, context_with_pip_history)
+
+    assert tmp_file_provider.result == (
+        "numpy == 1.2.3\n"
+        "exasol_db_api @ https://exasol.org/db-api\n"
+        "requests[socks,security] == 2.25.1\n"
+        "exasol-bucketfs[pandas] @ https://exasol.org/bucketfs\n"
+    )
+
+
+def test_install_pip_packages_delta_constraints_without_extras(
+    context_with_python_env,
+):
+    tmp_file_provider = context_with_python_env.temp_file_provider
+    context_with_python_env.history_file_manager.build_steps.append(
+        BuildStep(
+            name="prev-pip-build-step",
+            phases=[
+                Phase(
+                    name="phase-previous-packages",
+                    pip=PipPackages(
+                        packages=[
+                            PipPackage(
+                                name="pandas", version="== 2.2.0", extras=["excel"]
+                            )
+                        ]
+                    ),
+                )
+            ],
+        )
+    )
+    phase_one = _delta_phase()
+    build_step = BuildStep(name="build-step-1", phases=[phase_one])
+    search_cache = SearchCache(build_step, phase_one, context_with_python_env)
+    install_pip_packages(search_cache, phase_one, context_with_python_env)
+
+    assert tmp_file_provider.result == "requests == 2.25.1\npandas == 2.2.0\n"
+
+
+def _uv_phase(install_strategy: InstallStrategy) -> Phase:
+    return Phase(
+        name="phase-1",
+        pip=PipPackages(
+            packages=[
+                PipPackage(name="requests", version="== 2.25.1", extras=["socks"]),
+            ],
+            install_strategy=install_strategy,
+            installer=PipInstaller.Uv,
+        ),
+    )
+
+
+def test_install_pip_packages_uv(context_with_pip_history):
+    tmp_file_provider = context_with_pip_history.temp_file_provider
+    phase_one = _uv_phase(InstallStrategy.Full)
+    build_step = BuildStep(name="build-step-1", phases=[phase_one])
+    search_cache = SearchCache(build_step, phase_one, context_with_pip_history)
+    install_pip_packages(search_cache, phase_one, context_with_pip_history)
+
+    assert context_with_pip_history.cmd_executor.execute.call_args_list == [
+        call(
+            [
+                "/usr/bin/test-python",
+                "-m",
+                "uv",
+                "pip",
+                "install",
+                "--python",
+                "/usr/bin/test-python",
+                "-r",
+                str(tmp_file_provider.path),
+            ],
+            env=None,
+        )
+    ]
+    assert tmp_file_provider.result == (
+        "numpy == 1.2.3\n"
+        "exasol_db_api @ https://exasol.org/db-api\n"
+        "requests[socks] == 2.25.1\n"
+    )
+
+
+def test_install_pip_packages_uv_break_system_packages(context_with_python_env):
+    tmp_file_provider = context_with_python_env.temp_file_provider
+    context_with_python_env.history_file_manager.build_steps[0].phases[1] = Phase(
+        name="phase-pip",
+        tools=Tools(pip=Pip(version="25.5", needs_break_system_packages=True)),
+    )
+    phase_one = _uv_phase(InstallStrategy.Full)
+    build_step = BuildStep(name="build-step-1", phases=[phase_one])
+    search_cache = SearchCache(build_step, phase_one, context_with_python_env)
+    install_pip_packages(search_cache, phase_one, context_with_python_env)
+
+    assert context_with_python_env.cmd_executor.execute.call_args_list == [
+        call(
+            [
+                "/usr/bin/test-python",
+                "-m",
+                "uv",
+                "pip",
+                "install",
+                "--python",
+                "/usr/bin/test-python",
+                "-r",
+                str(tmp_file_provider.path),
+                "--break-system-packages",
+            ],
+            env=None,
+        )
+    ]
+
+
+def test_install_pip_packages_uv_delta_from_wheelhouse(context_with_pip_history):
+    """
+    uv installs offline with the wheelhouse as the only index.
+    """
+    tmp_file_provider = context_with_pip_history.temp_file_provider
+    context = dataclasses.replace(
+        context_with_pip_history,
+        install_options=InstallOptions(pip_wheelhouse_dir=Path("/wheelhouse")),
+    )
+    phase_one = _uv_phase(InstallStrategy.Delta)
+    build_step = BuildStep(name="build-step-1", phases=[phase_one])
+    search_cache = SearchCache(build_step, phase_one, context)
+    install_pip_packages(search_cache, phase_one, context)
+
+    assert context.cmd_executor.execute.call_args_list[1] == call(
+        [
+            "/usr/bin/test-python",
+            "-m",
+            "uv",
+            "pip",
+            "install",
+            "--python",
+            "/usr/bin/test-python",
+            "-r",
+            str(tmp_file_provider.path),
+            "-c",
+            str(tmp_file_provider.path),
+            "--no-index",
+            "--find-links",
+            "/wheelhouse",
+        ],
+        env=None,
+    )
+
+
+def _write_wheel(wheel_dir: Path, name: str, version: str) -> None:
+    dist_info = f"{name}-{version}.dist-info"
+    files = {
+        f"{name}/__init__.py": f"VERSION = {version!r}\n",
+        f"{dist_info}/METADATA": f"Metadata-Version: 2.1\nName: {name}\nVersion: {version}\n",
+        f"{dist_info}/WHEEL": "Wheel-Version: 1.0\nGenerator: test\nRoot-Is-Purelib: true\nTag: py3-none-any\n",
+    }
+    record = "".join(f"{path},,\n" for path in files) + f"{dist_info}/RECORD,,\n"
+    with zipfile.ZipFile(wheel_dir / f"{name}-{version}-py3-none-any.whl", "w") as whl:
+        for path, content in {**files, f"{dist_info}/RECORD": record}.items():
+            whl.writestr(path, content)
+
+
+@pytest.mark.skipif(
+    importlib.util.find_spec("uv") is None, reason="uv is not installed"
+)
+def test_uv_installs_offline_from_wheel_directory(tmp_path):
+    wheel_dir = tmp_path / "wheels"
+    wheel_dir.mkdir()
+    _write_wheel(wheel_dir, "exaslpm_test_pkg", "0.1.0")
+    subprocess.run(
+        [sys.executable, "-m", "venv", "--without-pip", str(tmp_path / "venv")],
+        check=True,
+    )
+    requirements_file = tmp_path / "requirements.txt"
+    requirements_file.write_text("exaslpm-test-pkg == 0.1.0\n")
+    search_cache = MagicMock()
+    search_cache.python_binary_path = tmp_path / "venv" / "bin" / "python"
+    search_cache.pip.needs_break_system_packages = False
+
+    install_cmd = _pip_install_cmd(
+        search_cache, requirements_file, None, wheel_dir, installer=PipInstaller.Uv
+    )
+    assert install_cmd.cmd[-3:] == ["--no-index", "--find-links", str(wheel_dir)]
+    # The target interpreter runs uv from the site packages of the test interpreter
+    uv_spec = importlib.util.find_spec("uv")
+    assert uv_spec is not None and uv_spec.origin is not None
+    uv_site_packages = Path(uv_spec.origin).parent.parent
+    subprocess.run(
+        install_cmd.cmd,
+        check=True,
+        env={**os.environ, "PYTHONPATH": str(uv_site_packages)},
+    )
+
+    result = subprocess.run(
+        [
+            str(search_cache.python_binary_path),
+            "-c",
+            "import exaslpm_test_pkg; print(exaslpm_test_pkg.VERSION)",
+        ],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    assert result.stdout == "0.1.0\n"
+
+
+PIP_INSTALL_REPORT = {
+    "install": [
+        {
+            "download_info": {
+                "url": "https://files.pythonhosted.org/numpy-1.2.3.tar.gz",
+                "archive_info": {},
+            },
+            "is_direct": False,
+            "metadata": {"name": "numpy", "version": "1.2.3"},
+        },
+        {
+            "download_info": {
+                "url": "https://files.pythonhosted.org/requests-2.25.1-py3-none-any.whl",
+                "archive_info": {},
+            },
+            "is_direct": False,
+            "metadata": {"name": "requests", "version": "2.25.1"},
+        },
+        {
+            "download_info": {"url": "https://exasol.org/exasol-db-api"},
+            "is_direct": True,
+            "metadata": {"name": "exasol-db-api", "version": "0.1.0"},
+        },
+        {
+            "download_info": {
+                "url": "https://files.pythonhosted.org/scipy-1.13.0.tar.gz",
+                "archive_info": {},
+            },
+            "is_direct": False,
+            "metadata": {"name": "scipy", "version": "1.13.0"},
+        },
+    ]
+}
+
+PIP_INSTALL_REPORT_VCS_ITEM = {
+    "download_info": {
+        "url": "https://github.com/exasol/pyexasol",
+        "vcs_info": {"vcs": "git", "commit_id": "0123456789abcdef"},
+    },
+    "is_direct": True,
+    "metadata": {"name": "pyexasol", "version": "0.27.0"},
+}
+
+
+@pytest.fixture
+def pip_install_report() -> dict:
+    return PIP_INSTALL_REPORT
+
+
+@pytest.fixture
+def context_with_parallel_builds(
+    context_with_python_env, monkeypatch, pip_install_report
+):
+    monkeypatch.delenv("MAKEFLAGS", raising=False)
+    monkeypatch.setattr(os, "cpu_count", lambda: 16)
+    report_cmd_result = MagicMock()
+
+    def consume_results_side_effect(stdout_cb, stderr_cb):
+        stdout_cb(json.dumps(pip_install_report))
+        return 0
+
+    report_cmd_result.consume_results.side_effect = consume_results_side_effect
+    run_cmd_result = context_with_python_env.cmd_executor.execute.return_value
+
+    def execute_side_effect(cmd, env=None):
+        if "--report" in cmd:
+            return report_cmd_result
+        return run_cmd_result
+
+    context_with_python_env.cmd_executor.execute.side_effect = execute_side_effect
+    context_with_python_env.cmd_executor.run_many.return_value = [0, 0]
+    return dataclasses.replace(
+        context_with_python_env, install_options=InstallOptions(pip_parallel_builds=4)
+    )
+
+
+def _build_tools_phase() -> Phase:
+    return Phase(
+        name="phase-1",
+        pip=PipPackages(
+            packages=[
+                PipPackage(name="numpy", version="== 1.2.3"),
+                PipPackage(name="requests", version="== 2.25.1"),
+                PipPackage(
+                    name="exasol-db-api", url="https://exasol.org/exasol-db-api"
+                ),
+            ],
+            install_build_tools_ephemerally=True,
+        ),
+    )
+
+
+def test_install_pip_packages_parallel_builds(context_with_parallel_builds):
+    context = context_with_parallel_builds
+    tmp_file_path = str(context.temp_file_provider.path)
+    phase_one = _build_tools_phase()
+    build_step = BuildStep(name="build-step-1", phases=[phase_one])
+    search_cache = SearchCache(build_step, phase_one, context)
+    install_pip_packages(search_cache, phase_one, context)
+
+    wheel_dir = f"{tmp_file_path}-wheels"
+    executed_cmds = [c.args[0] for c in context.cmd_executor.execute.call_args_list]
+    assert executed_cmds[2:] == [
+        [
+            "/usr/bin/test-python",
+            "-m",
+            "pip",
+            "install",
+            "--dry-run",
+            "--quiet",
+            "--report",
+            "-",
+            "-r",
+            tmp_file_path,
+        ],
+        [
+            "/usr/bin/test-python",
+            "-m",
+            "pip",
+            "install",
+            "-r",
+            tmp_file_path,
+            "--find-links",
+            wheel_dir,
+        ],
+        ["apt-get", "purge", "-y", "build-essential", "pkg-config"],
+        ["apt-get", "-y", "autoremove"],
+    ]
+    assert context.cmd_executor.run_many.mock_calls == [
+        call(
+            [
+                (
+                    [
+                        "env",
+                        "MAKEFLAGS=-j4",
+                        "/usr/bin/test-python",
+                        "-m",
+                        "pip",
+                        "wheel",
+                        "--no-deps",
+                        "--wheel-dir",
+                        wheel_dir,
+                        requirement,
+                    ],
+                    None,
+                )
+                for requirement in [
+                    "numpy==1.2.3",
+                    "scipy==1.13.0",
+                ]
+            ],
+            max_parallel=4,
+        )
+    ]
+
+
+@pytest.mark.parametrize(
+    "pip_install_report",
+    [
+        # pip does not report numpy, because it is already installed
+        {
+            "install": [
+                item
+                for item in PIP_INSTALL_REPORT["install"]
+                if item["metadata"]["name"] != "numpy"
+            ]
+        }
+    ],
+)
+def test_install_pip_packages_parallel_builds_skips_installed_sdist(
+    context_with_parallel_builds,
+):
+    context = context_with_parallel_builds
+    phase_one = _build_tools_phase()
+    build_step = BuildStep(name="build-step-1", phases=[phase_one])
+    search_cache = SearchCache(build_step, phase_one, context)
+    install_pip_packages(search_cache, phase_one, context)
+
+    build_cmds = context.cmd_executor.run_many.call_args.args[0]
+    assert [cmd[-1] for cmd, _ in build_cmds] == ["scipy==1.13.0"]
+
+
+@pytest.mark.parametrize(
+    "pip_install_report",
+    [{"install": PIP_INSTALL_REPORT["install"] + [PIP_INSTALL_REPORT_VCS_ITEM]}],
+)
+def test_install_pip_packages_parallel_builds_skips_vcs_requirement(
+    context_with_parallel_builds,
+):
+    context = context_with_parallel_builds
+    phase_one = _build_tools_phase()
+    build_step = BuildStep(name="build-step-1", phases=[phase_one])
+    search_cache = SearchCache(build_step, phase_one, context)
+    install_pip_packages(search_cache, phase_one, context)
+
+    build_cmds = context.cmd_executor.run_many.call_args.args[0]
+    assert [cmd[-1] for cmd, _ in build_cmds] == ["numpy==1.2.3", "scipy==1.13.0"]
+
+
+def test_install_pip_packages_parallel_builds_with_makeflags(
+    context_with_parallel_builds, monkeypatch
+):
+    monkeypatch.setenv("MAKEFLAGS", "-j2")
+    context = context_with_parallel_builds
+    phase_one = _build_tools_phase()
+    build_step = BuildStep(name="build-step-1", phases=[phase_one])
+    search_cache = SearchCache(build_step, phase_one, context)
+    install_pip_packages(search_cache, phase_one, context)
+
+    build_cmds = context.cmd_executor.run_many.call_args.args[0]
+    assert [cmd[:4] for cmd, _ in build_cmds] == [
+        ["/usr/bin/test-python", "-m", "pip", "wheel"]
+    ] * 2
+
+
+def test_install_pip_packages_parallel_builds_with_ccache(context_with_parallel_builds):
+    context = dataclasses.replace(
+        context_with_parallel_builds,
+        install_options=InstallOptions(
+            pip_parallel_builds=4, ccache_dir=Path("/ccache")
+        ),
+    )
+    phase_one = _build_tools_phase()
+    build_step = BuildStep(name="build-step-1", phases=[phase_one])
+    search_cache = SearchCache(build_step, phase_one, context)
+    install_pip_packages(search_cache, phase_one, context)
+
+    build_cmds = context.cmd_executor.run_many.call_args.args[0]
+    assert [cmd[:6] for cmd, _ in build_cmds] == [
+        [
+            "env",
+            "CCACHE_DIR=/ccache",
+            "CC=ccache gcc",
+            "CXX=ccache g++",
+            "MAKEFLAGS=-j4",
+            "/usr/bin/test-python",
+        ]
+    ] * 2
+
+
+def test_install_pip_packages_parallel_builds_failed_report(
+    context_with_parallel_builds,
+):
+    context = context_with_parallel_builds
+    report_cmd_result = MagicMock()
+    report_cmd_result.consume_results.return_value = 1
+    run_cmd_result = MagicMock()
+    run_cmd_result.return_code.return_value = 0
+    context.cmd_executor.execute.side_effect = lambda cmd, env=None: (
+        report_cmd_result if "--report" in cmd else run_cmd_result
+    )
+    phase_one = _build_tools_phase()
+    build_step = BuildStep(name="build-step-1", phases=[phase_one])
+    search_cache = SearchCache(build_step, phase_one, context)
+    install_pip_packages(search_cache, phase_one, context)
+
+    assert context.cmd_executor.run_many.mock_calls == []
+    executed_cmds = [c.args[0] for c in context.cmd_executor.execute.call_args_list]
+    assert "--find-links" not in executed_cmds[3]
@@ -5,7 +5,10 @@ from unittest.mock import (
 
 from exasol.exaslpm.model.package_file_config import AptRepo
 from exasol.exaslpm.pkg_mgmt.install_apt_packages import *
-from exasol.exaslpm.pkg_mgmt.install_apt_repos import install_apt_repos
+from exasol.exaslpm.pkg_mgmt.install_apt_repos import (
+    apt_key_download,
+    install_apt_repos,
+)
 
 
 def test_empty_packages(context_mock):
@@ -57,3 +60,32 @@ def test_install_apt_repos(context_mock):
             Path("/etc") / "apt" / "sources.list.d" / "some_ppa.list",
         )
     ]
+
+
+def test_install_apt_repos_updates_package_lists(context_mock):
+    context_mock.apt_index_tracker.mark_updated()
+    aptPackages = AptPackages(
+        packages=[],
+        repos={
+            "some_ppa": AptRepo(
+                entry="deb some_ppa",
+                key_url="https://some.key.server",
+                out_file="some_ppa.list",
+            )
+        },
+    )
+
+    install_apt_repos(aptPackages, context_mock)
+    assert (
+        call.execute(["apt-get", "-y", "update"], env=None)
+        in context_mock.cmd_executor.mock_calls
+    )
+
+
+def test_apt_key_download_is_only_cached_with_sha256():
+    repo = AptRepo(
+        entry="deb some_ppa", key_url="https://some.key.server", out_file="some.list"
+    )
+    assert apt_key_download(repo).cache is False
+    repo.key_sha256 = "0" * 64
+    assert apt_key_download(repo).cache is True
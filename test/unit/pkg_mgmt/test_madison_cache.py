@@ -0,0 +1,78 @@
+import pytest
+
+from exasol.exaslpm.pkg_mgmt.context.madison_cache import (
+    APT_LISTS_SOURCE,
+    MadisonCache,
+)
+
+CURL_LINES = ["curl | 7.81.0-1 | http://archive.ubuntu.com/ubuntu jammy/main\n"]
+
+
+@pytest.fixture
+def root(tmp_path):
+    root = tmp_path / "root"
+    lists_dir = root / "var" / "lib" / "apt" / "lists"
+    lists_dir.mkdir(parents=True)
+    (lists_dir / "jammy_main_binary-amd64_Packages").write_text("Package: curl\n")
+    return root
+
+
+def test_get_put(root):
+    cache = MadisonCache(root=root)
+    assert cache.get(["curl"]) == {}
+    cache.put({"curl": CURL_LINES, "nonexistent": []})
+    assert cache.get(["curl", "nonexistent", "gpg"]) == {
+        "curl": CURL_LINES,
+        "nonexistent": [],
+    }
+
+
+def test_sources_are_separate(root):
+    cache = MadisonCache(root=root)
+    cache.put({"curl": CURL_LINES}, source=APT_LISTS_SOURCE)
+    assert cache.get(["curl"]) == {}
+    assert cache.get(["curl"], source=APT_LISTS_SOURCE) == {"curl": CURL_LINES}
+
+
+def test_changed_lists(root):
+    cache = MadisonCache(root=root)
+    cache.put({"curl": CURL_LINES})
+    (cache.lists_dir / "jammy-updates_main_binary-amd64_Packages").write_text("")
+    assert cache.get(["curl"]) == {}
+
+
+@pytest.mark.parametrize(
+    "config_file",
+    [
+        "etc/apt/preferences",
+        "etc/apt/preferences.d/pin-curl",
+        "etc/apt/sources.list.d/some_ppa.list",
+    ],
+)
+def test_changed_apt_config(root, config_file):
+    cache = MadisonCache(root=root)
+    cache.put({"curl": CURL_LINES})
+    path = root / config_file
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("Package: curl\nPin: version 7.68.*\nPin-Priority: 1001\n")
+    assert cache.get(["curl"]) == {}
+
+
+def test_missing_lists_dir(tmp_path):
+    cache = MadisonCache(root=tmp_path / "root")
+    cache.put({"curl": CURL_LINES})
+    assert cache.get(["curl"]) == {}
+
+
+def test_persisted_between_instances(root, tmp_path):
+    cache_file = tmp_path / "cache" / "madison.json"
+    MadisonCache(cache_file=cache_file, root=root).put({"curl": CURL_LINES})
+    assert MadisonCache(cache_file=cache_file, root=root).get(["curl"]) == {
+        "curl": CURL_LINES
+    }
+
+
+def test_corrupt_cache_file(root, tmp_path):
+    cache_file = tmp_path / "madison.json"
+    cache_file.write_text("{")
+    assert MadisonCache(cache_file=cache_file, root=root).get(["curl"]) == {}
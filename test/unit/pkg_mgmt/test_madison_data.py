@@ -1,6 +1,11 @@
+import re
+
 import pytest
 
-from exasol.exaslpm.pkg_mgmt.search.apt_madison_parser import MadisonData
+from exasol.exaslpm.pkg_mgmt.search.apt_madison_parser import (
+    MadisonData,
+    version_matcher,
+)
 
 
 @pytest.mark.parametrize(
@@ -12,6 +17,14 @@ from exasol.exaslpm.pkg_mgmt.search.apt_madison_parser import MadisonData
         ("2.4.2-2ubuntu17.4", "2.4.*", True),
         ("2.4.3-2ubuntu17.4", "2.*-2ubuntu17.4", True),
         ("2.4.3-2ubuntu17.4", "3.*", False),
+        ("2.4.3-2ubuntu17.4", "*ubuntu17.4", True),
+        ("2.4.3-2ubuntu17.5", "*ubuntu17.4", False),
+        ("2.4.3-2ubuntu17.4", "2.*.3-*", True),
+        ("2.4.3-2ubuntu17.4", "2.*.4-*", False),
+        ("2.4.3+dfsg-1", "2.4.3+dfsg*", True),
+        ("2.4.3-dfsg-1", "2.4.3+dfsg*", False),
+        ("2.4.3+dfsg-1", "2.4.?+dfsg-1", False),
+        ("2.4.3-2ubuntu17.4", "*", True),
     ],
 )
 def test_madison_is_match(text, pattern, expected):
@@ -28,3 +41,34 @@ def test_madison_is_match(text, pattern, expected):
 def test_madison_is_match_raises(text, pattern):
     with pytest.raises(ValueError):
         MadisonData.is_match(text, pattern)
+
+
+def _is_match_with_regex_per_call(text: str, pattern: str) -> bool:
+    """
+    Matches as MadisonData.is_match did before the matchers got cached:
+    the regex is built and looked up for each version.
+    """
+    regex_pattern = re.escape(pattern).replace(r"\*", ".*")
+    return bool(re.fullmatch(f"^{regex_pattern}$", text))
+
+
+def test_version_matcher_compiles_each_pattern_once():
+    versions = [
+        f"2.{minor}.{patch}-2ubuntu17.4" for minor in range(50) for patch in range(20)
+    ]
+    patterns = ["2.4.*", "*ubuntu17.4", "2.*.3-*"]
+
+    def match_all(is_match) -> list[bool]:
+        return [
+            is_match(version, pattern) for pattern in patterns for version in versions
+        ]
+
+    version_matcher.cache_clear()
+    assert match_all(MadisonData.is_match) == match_all(_is_match_with_regex_per_call)
+    cache_info = version_matcher.cache_info()
+    assert cache_info.misses == len(patterns)
+    assert cache_info.hits == len(patterns) * (len(versions) - 1)
+
+
+def test_version_matcher_is_cached():
+    assert version_matcher("2.4.*") is version_matcher("2.4.*")
@@ -1,10 +1,15 @@
-from unittest.mock import MagicMock
+import dataclasses
+from unittest.mock import (
+    MagicMock,
+    call,
+)
 
 import pytest
 
 from exasol.exaslpm.model.package_file_config import AptPackage
 from exasol.exaslpm.pkg_mgmt.context.cmd_executor import CommandFailedException
 from exasol.exaslpm.pkg_mgmt.context.context import Context
+from exasol.exaslpm.pkg_mgmt.context.install_options import InstallOptions
 from exasol.exaslpm.pkg_mgmt.search.apt_madison_parser import (
     MadisonExecutor,
     MadisonParser,
@@ -111,3 +116,91 @@ def test_parse_madison_output_with_whitespace(context_mock: Context):
         result["gpg"][0].tail
         == "http://archive.ubuntu.com/ubuntu noble-updates/main amd64 Packages"
     )
+
+
+GPG_LINE = "gpg | 2.4.4-2ubuntu17.4 | http://archive.ubuntu.com/ubuntu noble-updates/main amd64 Packages\n"
+VIM_LINE = "vim | 2:9.1.0016-1ubuntu7.9 | http://archive.ubuntu.com/ubuntu noble-updates/main amd64 Packages\n"
+
+
+@pytest.fixture
+def context_with_apt_lists(context_mock: Context):
+    lists_dir = context_mock.madison_cache.lists_dir
+    lists_dir.mkdir(parents=True)
+    (lists_dir / "noble-updates_main_binary-amd64_Packages").write_text(
+        "Package: vim\nVersion: 2:9.1.0016-1ubuntu7.9\n"
+    )
+
+    def execute_side_effect(cmd, env=None):
+        cmd_result = MagicMock()
+
+        def consume_results_side_effect(stdout_cb, stderr_cb):
+            for package in cmd[4:]:
+                if package == "gpg":
+                    stdout_cb(GPG_LINE)
+                elif package == "vim":
+                    stdout_cb(VIM_LINE)
+            return 0
+
+        cmd_result.consume_results.side_effect = consume_results_side_effect
+        return cmd_result
+
+    context_mock.cmd_executor.execute.side_effect = execute_side_effect
+    return context_mock
+
+
+def test_execute_madison_uses_cache(context_with_apt_lists: Context):
+    MadisonExecutor.execute_madison([AptPackage(name="gpg")], context_with_apt_lists)
+    result = MadisonExecutor.execute_madison(
+        [AptPackage(name="gpg"), AptPackage(name="vim")], context_with_apt_lists
+    )
+    assert result == f"{GPG_LINE} {VIM_LINE}"
+    assert context_with_apt_lists.cmd_executor.execute.call_args_list == [
+        call(["apt-cache", "-o", "quiet=0", "madison", "gpg"]),
+        call(["apt-cache", "-o", "quiet=0", "madison", "vim"]),
+    ]
+
+
+def test_execute_madison_reads_apt_lists(context_with_apt_lists: Context):
+    context = dataclasses.replace(
+        context_with_apt_lists,
+        install_options=InstallOptions(resolve_apt_wildcards_from_lists=True),
+    )
+    result = MadisonExecutor.execute_madison(
+        [AptPackage(name="gpg"), AptPackage(name="vim")], context
+    )
+    assert result == (
+        f"{GPG_LINE} vim | 2:9.1.0016-1ubuntu7.9 | noble-updates_main_binary-amd64_Packages\n"
+    )
+    assert context.cmd_executor.execute.call_args_list == [
+        call(["apt-cache", "-o", "quiet=0", "madison", "gpg"]),
+    ]
+
+
+def test_execute_madison_does_not_reuse_apt_lists_lines(
+    context_with_apt_lists: Context,
+):
+    lists_context = dataclasses.replace(
+        context_with_apt_lists,
+        install_options=InstallOptions(resolve_apt_wildcards_from_lists=True),
+    )
+    MadisonExecutor.execute_madison([AptPackage(name="vim")], lists_context)
+    result = MadisonExecutor.execute_madison(
+        [AptPackage(name="vim")], context_with_apt_lists
+    )
+    assert result == VIM_LINE
+    assert context_with_apt_lists.cmd_executor.execute.call_args_list == [
+        call(["apt-cache", "-o", "quiet=0", "madison", "vim"]),
+    ]
+
+
+def test_execute_madison_prefers_madison_lines_from_cache(
+    context_with_apt_lists: Context,
+):
+    MadisonExecutor.execute_madison([AptPackage(name="vim")], context_with_apt_lists)
+    lists_context = dataclasses.replace(
+        context_with_apt_lists,
+        install_options=InstallOptions(resolve_apt_wildcards_from_lists=True),
+    )
+    result = MadisonExecutor.execute_madison([AptPackage(name="vim")], lists_context)
+    assert result == VIM_LINE
+    assert lists_context.cmd_executor.execute.call_count == 1
@@ -135,5 +135,9 @@ def test_install_pip(
     ]
 
     assert context_mock.file_downloader.mock.mock_calls == [
-        call(url="https://bootstrap.pypa.io/get-pip.py", timeout_in_seconds=30),
+        call(
+            url="https://bootstrap.pypa.io/get-pip.py",
+            timeout_in_seconds=30,
+            cache=False,
+        ),
     ]
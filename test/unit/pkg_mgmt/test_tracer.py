@@ -0,0 +1,118 @@
+import json
+import sys
+from test.unit.test_data import TEST_BUILD_STEP
+from unittest.mock import MagicMock
+
+import pytest
+
+from exasol.exaslpm.pkg_mgmt.context.cmd_executor import (
+    CommandExecutor,
+    CommandLogger,
+)
+from exasol.exaslpm.pkg_mgmt.context.history_file_manager import HistoryFileManager
+from exasol.exaslpm.pkg_mgmt.context.tracer import (
+    TraceFormat,
+    Tracer,
+)
+
+
+@pytest.fixture
+def tracer(tmp_path) -> Tracer:
+    return Tracer(trace_file=tmp_path / "trace.json")
+
+
+def test_disabled_tracer_records_nothing():
+    tracer = Tracer()
+    with tracer.span("span"):
+        pass
+    assert tracer.spans == []
+
+
+def test_nested_spans(tracer):
+    with tracer.span("outer", build_step="step") as outer:
+        with tracer.span("inner") as inner:
+            inner.set_attributes(packages=3)
+        with tracer.span("second inner") as second_inner:
+            pass
+    assert [span.name for span in tracer.spans] == ["inner", "second inner", "outer"]
+    assert outer.parent_id is None
+    assert inner.parent_id == outer.span_id
+    assert second_inner.parent_id == outer.span_id
+    assert inner.attributes == {"packages": 3}
+    assert outer.start_ns <= inner.start_ns <= inner.end_ns <= outer.end_ns
+
+
+def test_failed_span(tracer):
+    with pytest.raises(ValueError):
+        with tracer.span("failing"):
+            raise ValueError()
+    assert tracer.spans[0].attributes == {"error": "ValueError"}
+
+
+def test_export_chrome(tracer):
+    with tracer.span("outer", build_step="step"):
+        with tracer.span("inner"):
+            pass
+    tracer.export()
+    trace = json.loads(tracer.trace_file.read_text())
+    events = {event["name"]: event for event in trace["traceEvents"]}
+    assert events.keys() == {"outer", "inner"}
+    assert events["outer"]["ph"] == "X"
+    assert events["outer"]["args"] == {"build_step": "step"}
+    assert events["outer"]["ts"] <= events["inner"]["ts"]
+    assert events["inner"]["dur"] <= events["outer"]["dur"]
+
+
+def test_export_otlp(tmp_path):
+    tracer = Tracer(trace_file=tmp_path / "trace.json", trace_format=TraceFormat.Otlp)
+    with tracer.span("outer", build_step="step", cache_hit=True, ratio=0.5):
+        with tracer.span("inner", packages=3):
+            pass
+    tracer.export()
+    trace = json.loads(tracer.trace_file.read_text())
+    [scope_spans] = trace["resourceSpans"][0]["scopeSpans"]
+    spans = {span["name"]: span for span in scope_spans["spans"]}
+    assert spans["inner"]["parentSpanId"] == spans["outer"]["spanId"]
+    assert "parentSpanId" not in spans["outer"]
+    assert spans["inner"]["traceId"] == spans["outer"]["traceId"] == tracer.trace_id
+    assert spans["outer"]["attributes"] == [
+        {"key": "build_step", "value": {"stringValue": "step"}},
+        {"key": "cache_hit", "value": {"boolValue": True}},
+        {"key": "ratio", "value": {"doubleValue": 0.5}},
+    ]
+    assert spans["inner"]["attributes"] == [
+        {"key": "packages", "value": {"intValue": "3"}}
+    ]
+
+
+def test_subprocess_span(tracer):
+    executor = CommandExecutor(MagicMock(spec=CommandLogger), tracer=tracer)
+    with tracer.span("installer") as installer:
+        executor.execute([sys.executable, "-c", "print('x')"]).print_results()
+    subprocess_span = tracer.spans[0]
+    assert subprocess_span.name == "subprocess"
+    assert subprocess_span.parent_id == installer.span_id
+    assert subprocess_span.attributes == {
+        "cmd": f"{sys.executable} -c print('x')",
+        "return_code": 0,
+        "stdout_bytes": 2,
+        "stderr_bytes": 0,
+    }
+
+
+def test_history_load_span(tracer, tmp_path):
+    history_file_manager = HistoryFileManager(
+        history_path=tmp_path / "history", tracer=tracer
+    )
+    history_file_manager.add_build_step_to_history(TEST_BUILD_STEP)
+    HistoryFileManager(
+        history_path=tmp_path / "history", tracer=tracer
+    ).get_all_previous_build_steps()
+    history_file_manager.get_all_previous_build_steps()
+    assert [
+        span.attributes for span in tracer.spans if span.name == "load_history"
+    ] == [
+        {"source": "history_files", "build_steps": 0},
+        {"source": "index", "build_steps": 1},
+        {"source": "memory", "build_steps": 1},
+    ]